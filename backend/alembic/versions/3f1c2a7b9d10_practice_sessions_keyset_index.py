@@ -0,0 +1,42 @@
+"""practice_sessions keyset pagination index
+
+Revision ID: 3f1c2a7b9d10
+Revises: 
+Create Date: 2026-10-16 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f1c2a7b9d10'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEX_NAME = "ix_practice_sessions_user_created_id"
+
+
+def upgrade() -> None:
+    # CONCURRENTLY on PostgreSQL so the table stays writable during the build
+    with op.get_context().autocommit_block():
+        op.create_index(
+            INDEX_NAME,
+            "practice_sessions",
+            ["user_id", sa.text("created_at DESC"), sa.text("id DESC")],
+            if_not_exists=True,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            INDEX_NAME,
+            table_name="practice_sessions",
+            if_exists=True,
+            postgresql_concurrently=True,
+        )
@@ -0,0 +1,51 @@
+"""user_stats rollup table
+
+Revision ID: 8b2e4d6f1a3c
+Revises: 3f1c2a7b9d10
+Create Date: 2026-10-16 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8b2e4d6f1a3c'
+down_revision: Union[str, None] = '3f1c2a7b9d10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "user_stats",
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), primary_key=True),
+        sa.Column("total_sessions", sa.Integer(), nullable=False),
+        sa.Column("scored_sessions", sa.Integer(), nullable=False),
+        sa.Column("score_sum", sa.Integer(), nullable=False),
+        sa.Column("best_score", sa.Integer(), nullable=True),
+        sa.Column("first_session", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("last_session", sa.DateTime(timezone=True), nullable=True),
+        if_not_exists=True,
+    )
+    # Backfill from existing history (same aggregation as app.db.stats.rebuild_user_stats).
+    # Skip users that already have a row: if the app booted (create_all) before this
+    # migration ran, those rows were seeded from history on their first write.
+    op.execute(
+        """
+        INSERT INTO user_stats
+            (user_id, total_sessions, scored_sessions, score_sum, best_score, first_session, last_session)
+        SELECT user_id, COUNT(id), COUNT(score), COALESCE(SUM(score), 0), MAX(score),
+               MIN(created_at), MAX(created_at)
+        FROM practice_sessions
+        WHERE user_id IS NOT NULL
+          AND user_id NOT IN (SELECT user_id FROM user_stats)
+        GROUP BY user_id
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("user_stats")
@@ -0,0 +1,42 @@
+"""practice_jobs table for asynchronous /speech/practice
+
+Revision ID: c4d7e9a2b5f8
+Revises: 8b2e4d6f1a3c
+Create Date: 2026-10-16 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4d7e9a2b5f8'
+down_revision: Union[str, None] = '8b2e4d6f1a3c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "practice_jobs",
+        sa.Column("id", sa.String(32), primary_key=True),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=True),
+        sa.Column("status", sa.String(16), nullable=False),
+        sa.Column("filename", sa.String(), nullable=False),
+        sa.Column("audio", sa.LargeBinary(), nullable=True),
+        sa.Column("result", sa.Text(), nullable=True),
+        sa.Column("error", sa.Text(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        if_not_exists=True,
+    )
+    op.create_index("ix_practice_jobs_user_id", "practice_jobs", ["user_id"], if_not_exists=True)
+    op.create_index("ix_practice_jobs_status", "practice_jobs", ["status"], if_not_exists=True)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_practice_jobs_status", table_name="practice_jobs")
+    op.drop_index("ix_practice_jobs_user_id", table_name="practice_jobs")
+    op.drop_table("practice_jobs")
@@ -0,0 +1,45 @@
+"""transcription_cache table for the persistent transcription cache tier
+
+Revision ID: e1a5f3c7d9b2
+Revises: c4d7e9a2b5f8
+Create Date: 2026-10-16 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e1a5f3c7d9b2'
+down_revision: Union[str, None] = 'c4d7e9a2b5f8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "transcription_cache",
+        sa.Column("key", sa.String(64), primary_key=True),
+        sa.Column("model", sa.String(), nullable=False),
+        sa.Column("text", sa.Text(), nullable=False),
+        sa.Column("language", sa.String(), nullable=True),
+        sa.Column("duration", sa.Float(), nullable=True),
+        sa.Column("segments", sa.Text(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("expires_at", sa.DateTime(timezone=True), nullable=False),
+        if_not_exists=True,
+    )
+    # A table created earlier by the app's create_all may predate the segments column
+    columns = {column["name"] for column in sa.inspect(op.get_bind()).get_columns("transcription_cache")}
+    if "segments" not in columns:
+        op.add_column("transcription_cache", sa.Column("segments", sa.Text(), nullable=True))
+    op.create_index(
+        "ix_transcription_cache_expires_at", "transcription_cache", ["expires_at"], if_not_exists=True
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_transcription_cache_expires_at", table_name="transcription_cache")
+    op.drop_table("transcription_cache")
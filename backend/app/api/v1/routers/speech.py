@@ -1,20 +1,53 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException, Depends, Header
+import asyncio
+import io
+import json
+import re
+
+from fastapi import APIRouter, FastAPI, Request, UploadFile, File, HTTPException, Depends, Header, Query, WebSocket, WebSocketDisconnect, status
+from fastapi.requests import HTTPConnection
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel
-from openai import OpenAI
-from sqlalchemy.orm import Session
-from typing import Optional
+from openai import AsyncOpenAI
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from typing import AsyncIterator, Callable, Literal, Optional
 
+from app.core.audio import PreprocessedAudio, UtteranceSegmenter, WavChunk, preprocess_upload, split_upload
+from app.core.auth import connection_token, parse_bearer_token, verify_request_token
+from app.core.concurrency import UpstreamUnavailable
 from app.core.config import settings
-from app.db.session import get_db
+from app.core.metrics import record_audio_seconds, record_chat_usage, track_upstream
+from app.core.jobs import JobQueue, QueueFull, TERMINAL_STATUSES, get_job
+from app.core.openai_client import get_app_openai_client, get_openai_client
+from app.core.prompts import PRACTICE_CONTEXT, Prompt, feedback_prompt, normalize_context, trim_to_token_budget
+from app.core.ratelimit import charge as charge_rate_limit, endpoint_cost
+from app.core.uploads import AudioUpload, UploadLimitRoute, receive_audio
+from app.core.transcription_cache import transcription_cache, make_key as make_transcription_key
+from app.core.feedback_cache import feedback_cache, make_key as make_feedback_key
+from app.core.singleflight import feedback_flights, transcription_flights
+from app.core.upstream import DeadlineExceeded, call_upstream, deadline
+from app.db.session import get_db, get_session_factory
 from app.db import models
+from app.db.stats import record_session
+from app.db.writer import session_writer
+from app.db.users import find_user
+
+router = APIRouter(route_class=UploadLimitRoute)
+
 
-router = APIRouter()
+class TranscriptionSegment(BaseModel):
+    start: float  # Seconds from the start of the uploaded recording
+    end: float
+    text: str
 
 
 class TranscriptionResponse(BaseModel):
     text: str
     language: str | None = None
     duration: float | None = None
+    segments: list[TranscriptionSegment] | None = None
+    # Set when pre-processing shrank the audio sent to Whisper
+    bytes_saved: int | None = None
+    seconds_saved: float | None = None
 
 
 class FeedbackRequest(BaseModel):
@@ -32,6 +65,20 @@ class FeedbackResponse(BaseModel):
     score: int  # 1-100
 
 
+class FeedbackBatchRequest(BaseModel):
+    items: list[FeedbackRequest]
+
+
+class FeedbackBatchItem(BaseModel):
+    status: Literal["ok", "error"]
+    result: FeedbackResponse | None = None
+    error: str | None = None
+
+
+class FeedbackBatchResponse(BaseModel):
+    results: list[FeedbackBatchItem]  # Same order as the request items
+
+
 class PracticeResponse(BaseModel):
     session_id: int
     transcription: str
@@ -40,187 +87,764 @@ class PracticeResponse(BaseModel):
     pronunciation_tips: list[str]
     grammar_notes: list[str]
     score: int
+    audio_bytes_saved: int | None = None
+    audio_seconds_saved: float | None = None
 
 
-def get_openai_client() -> OpenAI:
-    if not settings.openai_api_key:
-        raise HTTPException(status_code=500, detail="OpenAI API key not configured")
-    return OpenAI(api_key=settings.openai_api_key)
+class PracticeJobResponse(BaseModel):
+    job_id: str
+    status: Literal["pending", "running", "succeeded", "failed"]
+    result: PracticeResponse | None = None
+    error: str | None = None
 
 
-def get_optional_user(
+async def get_optional_user(
+    request: Request,
     authorization: str | None = Header(None),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ) -> Optional[models.User]:
     """Optionally extract user from token. Returns None if no valid auth."""
-    if not authorization:
-        return None
-    
-    parts = authorization.split()
-    if len(parts) != 2 or parts[0].lower() != "bearer":
+    return await find_token_user(request, parse_bearer_token(authorization), db)
+
+
+async def find_token_user(
+    connection: HTTPConnection,
+    token: str | None,
+    db: AsyncSession,
+) -> Optional[models.User]:
+    if not token:
         return None
     
-    token = parts[1]
     try:
-        from firebase_admin import auth as firebase_auth
-        decoded = firebase_auth.verify_id_token(token)
-        uid = decoded.get("uid")
-        user = db.query(models.User).filter(models.User.uid == uid).first()
-        return user
+        decoded = await verify_request_token(connection, token)
+        user = await find_user(db, decoded.get("uid"))
     except Exception:
-        return None
+        user = None
+    # End the lookup's read transaction: the connection must not sit idle in
+    # it while the endpoint waits on OpenAI
+    await db.rollback()
+    return user
+
+
+async def whisper_transcribe(client: AsyncOpenAI, filename: str, open_file: Callable, *, hedge: bool = True):
+    """Whisper call with retries and hedging; ``open_file()`` must give each attempt its own file."""
+    async def attempt():
+        with track_upstream("whisper"):
+            return await client.audio.transcriptions.create(
+                model=settings.whisper_model,
+                file=(filename, open_file()),
+                response_format="verbose_json"
+            )
+
+    transcription = await call_upstream("whisper", attempt, hedge=hedge)
+    record_audio_seconds(getattr(transcription, 'duration', None))
+    return transcription
+
+
+def transcription_segments(transcription, offset: float) -> list[TranscriptionSegment]:
+    """Whisper segments shifted by ``offset`` seconds."""
+    segments = getattr(transcription, 'segments', None)
+    if not isinstance(segments, list):
+        return []
+    return [
+        TranscriptionSegment(
+            start=round(offset + segment.start, 3),
+            end=round(offset + segment.end, 3),
+            text=segment.text.strip(),
+        )
+        for segment in segments
+    ]
+
+
+async def transcribe_chunks(client: AsyncOpenAI, chunks: list[WavChunk]) -> list:
+    """Transcribe chunks concurrently; a failed chunk is retried on its own."""
+    semaphore = asyncio.Semaphore(settings.transcription_chunk_concurrency)
+
+    async def run(index: int, chunk: WavChunk):
+        async with semaphore:
+            return await whisper_transcribe(client, f"chunk-{index}.wav", lambda: io.BytesIO(chunk.data))
+
+    tasks = [asyncio.create_task(run(index, chunk)) for index, chunk in enumerate(chunks)]
+    try:
+        return await asyncio.gather(*tasks)
+    finally:
+        # One chunk failed for good: the rest are wasted work
+        for task in tasks:
+            task.cancel()
+
+
+def stitch_transcriptions(transcriptions: list, chunks: list[WavChunk], offset: float) -> TranscriptionResponse:
+    """Merge per-chunk transcriptions into one response with recording-relative timestamps."""
+    texts = [transcription.text.strip() for transcription in transcriptions]
+    languages = [getattr(transcription, 'language', None) for transcription in transcriptions]
+    segments = [
+        segment
+        for transcription, chunk in zip(transcriptions, chunks)
+        for segment in transcription_segments(transcription, offset + chunk.offset_seconds)
+    ]
+    return TranscriptionResponse(
+        text=" ".join(text for text in texts if text),
+        language=next((language for language in languages if language), None),
+        duration=round(sum(chunk.duration_seconds for chunk in chunks), 3),
+        segments=segments or None,
+    )
+
+
+async def transcribe_audio_file(
+    client: AsyncOpenAI,
+    audio: AudioUpload,
+) -> tuple[TranscriptionResponse, PreprocessedAudio | None]:
+    """Pre-process and transcribe an upload, chunking long WAV recordings.
+
+    Long WAV recordings are split at silences and the chunks transcribed in
+    parallel; segment timestamps always refer to the uploaded recording.
+    """
+    upload, preprocessed = audio, None
+    if settings.audio_preprocessing_enabled:
+        upload, preprocessed = await preprocess_upload(audio)
+    offset = preprocessed.trimmed_start_seconds if preprocessed is not None else 0.0
+    try:
+        chunks = await split_upload(upload) if settings.transcription_chunking_enabled else None
+        if chunks:
+            transcriptions = await transcribe_chunks(client, chunks)
+            return stitch_transcriptions(transcriptions, chunks, offset), preprocessed
+
+        if settings.hedging_enabled and upload.size <= settings.upload_spool_max_memory:
+            data = await upload.read()
+            transcription = await whisper_transcribe(client, upload.filename, lambda: io.BytesIO(data))
+        else:
+            # Attempts share (and rewind) the spooled file, so they must not overlap
+            transcription = await whisper_transcribe(client, upload.filename, lambda: upload.file, hedge=False)
+        result = TranscriptionResponse(
+            text=transcription.text,
+            language=getattr(transcription, 'language', None),
+            duration=getattr(transcription, 'duration', None),
+            segments=transcription_segments(transcription, offset) or None,
+        )
+        return result, preprocessed
+    finally:
+        if upload is not audio:
+            await upload.close()
+
+
+def transcription_budget(audio: AudioUpload, share: float = 1.0) -> float:
+    """Seconds allowed to transcribe ``audio``.
+
+    ``share`` of ``REQUEST_DEADLINE_SECONDS``, plus
+    ``TRANSCRIPTION_DEADLINE_SECONDS_PER_MB`` for every MB uploaded: Whisper
+    time grows with the recording, and compressed uploads are never chunked.
+    """
+    extra = audio.size / 1_000_000 * settings.transcription_deadline_seconds_per_mb
+    return settings.request_deadline_seconds * share + extra
+
+
+async def transcribe_upload(
+    client: AsyncOpenAI,
+    audio: AudioUpload,
+) -> TranscriptionResponse:
+    """Transcribe an upload with Whisper, serving repeated uploads from cache.
+
+    Identical uploads arriving while a transcription is in flight share it.
+    """
+    key = make_transcription_key(audio.sha256)
+    if settings.transcription_cache_enabled:
+        cached = await transcription_cache.get(key)
+        if cached is not None:
+            return TranscriptionResponse(**cached)
+
+    shared, preprocessed = await transcription_flights.do(
+        key, lambda: transcribe_audio_file(client, audio)
+    )
+    result = shared.model_copy()
+
+    # Cached under the original content hash, so repeats skip pre-processing too
+    if settings.transcription_cache_enabled:
+        await transcription_cache.set(key, result.model_dump(include={"text", "language", "duration", "segments"}))
+    if preprocessed is not None:
+        result.bytes_saved = preprocessed.bytes_saved
+        result.seconds_saved = preprocessed.seconds_saved
+    return result
+
+
+def prepare_feedback(text: str, target_language: str, context: str | None) -> tuple[str, Prompt, str]:
+    """Learner text trimmed to the token budget, its compiled prompt and cache key."""
+    text = trim_to_token_budget(text)
+    prompt = feedback_prompt(target_language, context)
+    key = make_feedback_key(text, target_language, normalize_context(context), prompt.version)
+    return text, prompt, key
+
+
+async def generate_feedback(
+    client: AsyncOpenAI,
+    text: str,
+    target_language: str,
+    context: str | None = None,
+) -> dict:
+    """Run the feedback chat completion, reusing cached results for repeated text.
+
+    Identical requests arriving while a completion is in flight share it.
+    """
+    text, prompt, key = prepare_feedback(text, target_language, context)
+    if settings.feedback_cache_enabled:
+        cached = await feedback_cache.get(key)
+        if cached is not None:
+            return cached
+
+    async def attempt():
+        with track_upstream("chat"):
+            return await client.chat.completions.create(
+                model=settings.gpt_model,
+                messages=[
+                    {"role": "system", "content": prompt.system},
+                    {"role": "user", "content": text}
+                ],
+                response_format={"type": "json_object"}
+            )
+
+    async def complete() -> dict:
+        response = await call_upstream("chat", attempt)
+        record_chat_usage(getattr(response, 'usage', None))
+        result = json.loads(response.choices[0].message.content)
+        if settings.feedback_cache_enabled:
+            await feedback_cache.set(key, result)
+        return result
+
+    return dict(await feedback_flights.do(key, complete))
 
 
 @router.post("/transcribe", response_model=TranscriptionResponse)
 async def transcribe_audio(
-    file: UploadFile = File(...),
-    client: OpenAI = Depends(get_openai_client),
+    request: Request,
+    file: UploadFile | None = File(None),
+    client: AsyncOpenAI = Depends(get_openai_client),
 ):
-    """Transcribe audio using OpenAI Whisper API."""
-    if not file.filename:
-        raise HTTPException(status_code=400, detail="No file uploaded")
-    
-    # Validate file type
-    allowed_types = ["audio/mpeg", "audio/wav", "audio/webm", "audio/mp4", "audio/m4a", "audio/ogg"]
-    if file.content_type and file.content_type not in allowed_types:
-        raise HTTPException(
-            status_code=400, 
-            detail=f"Unsupported audio format. Allowed: mp3, wav, webm, mp4, m4a, ogg"
-        )
+    """Transcribe audio using OpenAI Whisper API.
     
+    Send the recording as a multipart ``file`` field, or as a raw ``audio/*``
+    request body (optionally naming it with ``?filename=``).
+    """
+    audio = await receive_audio(request, file)
     try:
-        contents = await file.read()
-        
-        # Create a file-like object for the API
-        transcription = client.audio.transcriptions.create(
-            model=settings.whisper_model,
-            file=(file.filename, contents),
-            response_format="verbose_json"
-        )
+        # Validate file type
+        allowed_types = ["audio/mpeg", "audio/wav", "audio/webm", "audio/mp4", "audio/m4a", "audio/ogg"]
+        if audio.content_type and audio.content_type not in allowed_types:
+            raise HTTPException(
+                status_code=400, 
+                detail=f"Unsupported audio format. Allowed: mp3, wav, webm, mp4, m4a, ogg"
+            )
         
-        return TranscriptionResponse(
-            text=transcription.text,
-            language=getattr(transcription, 'language', None),
-            duration=getattr(transcription, 'duration', None)
-        )
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Transcription failed: {str(e)}")
+        try:
+            with deadline(transcription_budget(audio)):
+                return await transcribe_upload(client, audio)
+        except UpstreamUnavailable as e:
+            raise HTTPException(
+                status_code=503,
+                detail=f"Transcription unavailable: {str(e)}",
+                headers={"Retry-After": str(e.retry_after)},
+            )
+        except DeadlineExceeded as e:
+            raise HTTPException(status_code=504, detail=f"Transcription timed out: {str(e)}")
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Transcription failed: {str(e)}")
+    finally:
+        await audio.close()
+
+
+def build_feedback_response(text: str, result: dict) -> FeedbackResponse:
+    return FeedbackResponse(
+        original_text=text,
+        corrected_text=result.get("corrected_text", text),
+        feedback=result.get("feedback", ""),
+        pronunciation_tips=result.get("pronunciation_tips", []),
+        grammar_notes=result.get("grammar_notes", []),
+        score=result.get("score", 50)
+    )
 
 
 @router.post("/feedback", response_model=FeedbackResponse)
 async def get_speech_feedback(
     request: FeedbackRequest,
-    client: OpenAI = Depends(get_openai_client),
+    client: AsyncOpenAI = Depends(get_openai_client),
 ):
     """Analyze speech/text and provide language learning feedback."""
-    
-    system_prompt = f"""You are an expert language tutor for {request.target_language}. 
-Analyze the following text from a language learner and provide constructive feedback.
+    try:
+        result = await generate_feedback(
+            client,
+            request.text,
+            request.target_language,
+            request.context,
+        )
+        return build_feedback_response(request.text, result)
+    except UpstreamUnavailable as e:
+        raise HTTPException(
+            status_code=503,
+            detail=f"Feedback generation unavailable: {str(e)}",
+            headers={"Retry-After": str(e.retry_after)},
+        )
+    except DeadlineExceeded as e:
+        raise HTTPException(status_code=504, detail=f"Feedback generation timed out: {str(e)}")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Feedback generation failed: {str(e)}")
 
-Respond in JSON format with these fields:
-- corrected_text: The grammatically correct version
-- feedback: A friendly, encouraging summary of their performance (2-3 sentences)
-- pronunciation_tips: List of specific pronunciation advice (max 3 items)
-- grammar_notes: List of grammar corrections with explanations (max 3 items)  
-- score: An overall score from 1-100
 
-Context: {request.context or 'general conversation'}
-Be encouraging and focus on the most impactful improvements."""
+# Top-level string fields sent as soon as their closing quote has streamed in
+STREAMED_FIELDS = ("corrected_text", "feedback")
+_STREAMED_FIELD_RE = re.compile(
+    r'"(' + "|".join(STREAMED_FIELDS) + r')"\s*:\s*("(?:[^"\\]|\\.)*")'
+)
 
-    try:
-        response = client.chat.completions.create(
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+async def stream_feedback_events(
+    client: AsyncOpenAI,
+    request: FeedbackRequest,
+) -> AsyncIterator[str]:
+    """Yield SSE events for a streamed feedback completion.
+
+    Events: ``token`` (raw deltas), one event per field in ``STREAMED_FIELDS``
+    as soon as it is complete, then ``done`` carrying the full
+    ``FeedbackResponse`` (or ``error``).
+    """
+    text, prompt, key = prepare_feedback(request.text, request.target_language, request.context)
+    if settings.feedback_cache_enabled:
+        cached = await feedback_cache.get(key)
+        if cached is not None:
+            for field in STREAMED_FIELDS:
+                if field in cached:
+                    yield _sse(field, {field: cached[field]})
+            yield _sse("done", build_feedback_response(request.text, cached).model_dump())
+            return
+
+    async def open_stream():
+        return await client.chat.completions.create(
             model=settings.gpt_model,
             messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": request.text}
+                {"role": "system", "content": prompt.system},
+                {"role": "user", "content": text}
             ],
-            response_format={"type": "json_object"}
-        )
-        
-        import json
-        result = json.loads(response.choices[0].message.content)
-        
-        return FeedbackResponse(
-            original_text=request.text,
-            corrected_text=result.get("corrected_text", request.text),
-            feedback=result.get("feedback", ""),
-            pronunciation_tips=result.get("pronunciation_tips", []),
-            grammar_notes=result.get("grammar_notes", []),
-            score=result.get("score", 50)
+            response_format={"type": "json_object"},
+            stream=True,
+            stream_options={"include_usage": True},
         )
+
+    try:
+        with track_upstream("chat"):
+            # Retried until the stream opens; tokens already sent cannot be taken back
+            stream = await call_upstream("chat", open_stream, hedge=False)
+
+            content = ""
+            sent: set[str] = set()
+            async for chunk in stream:
+                if getattr(chunk, 'usage', None) is not None:
+                    record_chat_usage(chunk.usage)
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if not delta:
+                    continue
+                content += delta
+                yield _sse("token", {"delta": delta})
+
+                if len(sent) < len(STREAMED_FIELDS):
+                    for match in _STREAMED_FIELD_RE.finditer(content):
+                        field = match.group(1)
+                        if field not in sent:
+                            sent.add(field)
+                            yield _sse(field, {field: json.loads(match.group(2))})
+
+        result = json.loads(content)
+        response = build_feedback_response(request.text, result)
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Feedback generation failed: {str(e)}")
+        yield _sse("error", {"detail": f"Feedback generation failed: {str(e)}"})
+        return
+
+    if settings.feedback_cache_enabled:
+        await feedback_cache.set(key, result)
+    yield _sse("done", response.model_dump())
+
+
+@router.post("/feedback/stream")
+async def stream_speech_feedback(
+    request: FeedbackRequest,
+    client: AsyncOpenAI = Depends(get_openai_client),
+):
+    """Stream feedback as Server-Sent Events to cut time-to-first-byte."""
+    return StreamingResponse(
+        stream_feedback_events(client, request),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.post("/feedback/batch", response_model=FeedbackBatchResponse)
+async def get_batch_feedback(
+    request: Request,
+    batch: FeedbackBatchRequest,
+    client: AsyncOpenAI = Depends(get_openai_client),
+):
+    """Feedback for many sentences in one call.
+
+    Identical items (after text normalization) are generated once, at most
+    ``FEEDBACK_BATCH_CONCURRENCY`` completions run at a time, and a failing
+    item is reported in place instead of failing the whole batch. Each item
+    is rate limited like a ``/feedback`` call.
+    """
+    if not batch.items:
+        raise HTTPException(status_code=400, detail="No items provided")
+    if len(batch.items) > settings.feedback_batch_max_items:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Too many items (max {settings.feedback_batch_max_items})"
+        )
+    # The middleware charged the first item before the body was read
+    await charge_rate_limit(request, (len(batch.items) - 1) * endpoint_cost("POST", "/speech/feedback"))
+
+    semaphore = asyncio.Semaphore(settings.feedback_batch_concurrency)
+
+    async def run(item: FeedbackRequest) -> dict:
+        async with semaphore:
+            return await generate_feedback(
+                client,
+                item.text,
+                item.target_language,
+                item.context,
+            )
+
+    keys = []
+    pending: dict[str, asyncio.Task] = {}
+    for item in batch.items:
+        _, _, key = prepare_feedback(item.text, item.target_language, item.context)
+        keys.append(key)
+        if key not in pending:
+            pending[key] = asyncio.create_task(run(item))
+
+    await asyncio.wait(pending.values())
+
+    results = []
+    for item, key in zip(batch.items, keys):
+        task = pending[key]
+        if task.exception() is not None:
+            results.append(FeedbackBatchItem(
+                status="error",
+                error=f"Feedback generation failed: {str(task.exception())}",
+            ))
+        else:
+            results.append(FeedbackBatchItem(
+                status="ok",
+                result=build_feedback_response(item.text, task.result()),
+            ))
+    return FeedbackBatchResponse(results=results)
+
+
+async def run_practice(
+    client: AsyncOpenAI,
+    db: AsyncSession,
+    audio: AudioUpload,
+    user_id: int | None,
+) -> PracticeResponse:
+    """Transcribe, get feedback and save the practice session.
+
+    Both upstream steps share one ``REQUEST_DEADLINE_SECONDS`` budget:
+    transcription gets ``PRACTICE_TRANSCRIPTION_BUDGET_SHARE`` of it, plus
+    the per-MB allowance for long uploads, and feedback whatever is left.
+    """
+    transcription_seconds = transcription_budget(audio, settings.practice_transcription_budget_share)
+    feedback_seconds = settings.request_deadline_seconds * (1 - settings.practice_transcription_budget_share)
+    with deadline(transcription_seconds + feedback_seconds):
+        # First transcribe
+        with deadline(transcription_seconds):
+            transcription = await transcribe_upload(client, audio)
+        
+        # Then get feedback
+        return await finish_practice(client, db, transcription, user_id)
+
+
+async def finish_practice(
+    client: AsyncOpenAI,
+    db: AsyncSession,
+    transcription: TranscriptionResponse,
+    user_id: int | None,
+) -> PracticeResponse:
+    """Get feedback on a practice transcription and save the session."""
+    transcribed_text = transcription.text
+    feedback_result = await generate_feedback(
+        client,
+        transcribed_text,
+        settings.target_language,
+        PRACTICE_CONTEXT,
+    )
+    
+    # Save practice session to database (linked to user if authenticated)
+    values = dict(
+        user_id=user_id,
+        transcription=transcribed_text,
+        corrected_text=feedback_result.get("corrected_text", transcribed_text),
+        feedback=feedback_result.get("feedback", ""),
+        score=feedback_result.get("score", 50),
+    )
+    if settings.session_write_behind_enabled:
+        session_id = await session_writer.insert(values)
+    else:
+        session = models.PracticeSession(**values)
+        # Before the insert, so a first rollup row is seeded from older sessions only
+        if session.user_id is not None:
+            await record_session(db, session.user_id, session.score)
+        db.add(session)
+        await db.commit()
+        session_id = session.id  # Assigned by the INSERT; no refresh needed
+    
+    return PracticeResponse(
+        session_id=session_id,
+        transcription=transcribed_text,
+        corrected_text=feedback_result.get("corrected_text"),
+        feedback=feedback_result.get("feedback"),
+        pronunciation_tips=feedback_result.get("pronunciation_tips", []),
+        grammar_notes=feedback_result.get("grammar_notes", []),
+        score=feedback_result.get("score", 50),
+        audio_bytes_saved=transcription.bytes_saved,
+        audio_seconds_saved=transcription.seconds_saved,
+    )
+
+
+async def run_practice_job(app: FastAPI, db: AsyncSession, job: models.PracticeJob) -> dict:
+    client = get_app_openai_client(app)
+    audio = await AudioUpload.from_bytes(job.filename, job.audio)
+    try:
+        response = await run_practice(client, db, audio, job.user_id)
+    finally:
+        await audio.close()
+    return response.model_dump()
+
+
+practice_jobs = JobQueue(
+    handler=run_practice_job,
+    workers=settings.practice_jobs_workers,
+    max_pending=settings.practice_jobs_max_pending,
+)
+
+
+def build_job_response(job: models.PracticeJob) -> PracticeJobResponse:
+    return PracticeJobResponse(
+        job_id=job.id,
+        status=job.status,
+        result=PracticeResponse.model_validate_json(job.result) if job.result else None,
+        error=f"Practice session failed: {job.error}" if job.error else None,
+    )
 
 
 @router.post("/practice", response_model=PracticeResponse)
 async def create_practice_session(
-    file: UploadFile = File(...),
-    db: Session = Depends(get_db),
-    client: OpenAI = Depends(get_openai_client),
+    request: Request,
+    file: UploadFile | None = File(None),
+    run_async: bool = Query(False, alias="async"),
+    db: AsyncSession = Depends(get_db),
+    client: AsyncOpenAI = Depends(get_openai_client),
     user: Optional[models.User] = Depends(get_optional_user),
 ):
     """Complete practice flow: transcribe audio and get feedback in one call.
     
     If authenticated, the session is linked to the user's account.
+    With ``?async=1`` the work is queued and a 202 with a job id is returned
+    right away; poll ``/speech/jobs/{job_id}`` or stream its ``/events``.
+    Like ``/transcribe``, a raw ``audio/*`` body is accepted instead of multipart.
     """
-    
-    # First transcribe
-    if not file.filename:
-        raise HTTPException(status_code=400, detail="No file uploaded")
-    
+    audio = await receive_audio(request, file)
     try:
-        contents = await file.read()
-        transcription = client.audio.transcriptions.create(
-            model=settings.whisper_model,
-            file=(file.filename, contents),
-            response_format="verbose_json"
-        )
+        if run_async:
+            # Jobs must survive a restart, so the audio is persisted with them
+            contents = await audio.read()
+            try:
+                job = await practice_jobs.submit(db, user.id if user else None, audio.filename, contents)
+            except QueueFull:
+                raise HTTPException(status_code=503, detail="Practice job queue is full, try again later")
+            return JSONResponse(
+                status_code=202,
+                content=build_job_response(job).model_dump(),
+                headers={"Location": str(request.url_for("get_practice_job", job_id=job.id))},
+            )
         
-        transcribed_text = transcription.text
-        
-        # Then get feedback
-        system_prompt = f"""You are an expert language tutor for {settings.target_language}. 
-Analyze the following transcribed speech from a language learner.
+        try:
+            return await run_practice(client, db, audio, user.id if user else None)
+        except UpstreamUnavailable as e:
+            raise HTTPException(
+                status_code=503,
+                detail=f"Practice session unavailable: {str(e)}",
+                headers={"Retry-After": str(e.retry_after)},
+            )
+        except DeadlineExceeded as e:
+            raise HTTPException(status_code=504, detail=f"Practice session timed out: {str(e)}")
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Practice session failed: {str(e)}")
+    finally:
+        await audio.close()
 
-Respond in JSON format with:
-- corrected_text: The grammatically correct version
-- feedback: Encouraging summary (2-3 sentences)
-- pronunciation_tips: List of advice (max 3)
-- grammar_notes: List of corrections (max 3)
-- score: Score from 1-100"""
 
-        response = client.chat.completions.create(
-            model=settings.gpt_model,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": transcribed_text}
-            ],
-            response_format={"type": "json_object"}
-        )
-        
-        import json
-        feedback_result = json.loads(response.choices[0].message.content)
-        
-        # Save practice session to database (linked to user if authenticated)
-        session = models.PracticeSession(
-            user_id=user.id if user else None,
-            transcription=transcribed_text,
-            corrected_text=feedback_result.get("corrected_text", transcribed_text),
-            feedback=feedback_result.get("feedback", ""),
-            score=feedback_result.get("score", 50),
+async def _close_with_error(websocket: WebSocket, status_code: int, detail: str, code: int, **extra) -> None:
+    """Send an ``error`` message carrying the HTTP-equivalent status, then close."""
+    try:
+        await websocket.send_json({"type": "error", "status": status_code, "detail": detail, **extra})
+        await websocket.close(code)
+    except (WebSocketDisconnect, RuntimeError):
+        pass  # Client already gone
+
+
+@router.websocket("/practice/ws")
+async def practice_websocket(
+    websocket: WebSocket,
+    sample_rate: int = Query(16000, ge=8000, le=48000),
+    sessions: async_sessionmaker[AsyncSession] = Depends(get_session_factory),
+):
+    """Live practice: stream audio while the learner is still speaking.
+
+    Send 16-bit little-endian mono PCM at ``sample_rate`` as binary messages,
+    then ``{"type": "end"}`` once the learner stops. Each utterance is
+    transcribed as soon as a pause ends it (and echoed as a ``transcript``
+    message), so after ``end`` only the last utterance and the feedback call
+    remain. The ``result`` message carries the same ``PracticeResponse`` as
+    ``/practice``, and the same session is saved; failures send ``error`` with
+    the matching HTTP status. Browsers authenticate with ``?token=``.
+    """
+    await websocket.accept()
+    segmenter = UtteranceSegmenter(sample_rate)
+    semaphore = asyncio.Semaphore(settings.transcription_chunk_concurrency)
+    chunks: list[WavChunk] = []
+    tasks: list[asyncio.Task] = []
+
+    async def transcribe(index: int, chunk: WavChunk):
+        with deadline():
+            async with semaphore:
+                transcription = await whisper_transcribe(
+                    client, f"utterance-{index}.wav", lambda: io.BytesIO(chunk.data)
+                )
+        await websocket.send_json({"type": "transcript", "index": index, "text": transcription.text.strip()})
+        return transcription
+
+    def submit(new_chunks: list[WavChunk]) -> None:
+        for chunk in new_chunks:
+            tasks.append(asyncio.create_task(transcribe(len(chunks), chunk)))
+            chunks.append(chunk)
+
+    try:
+        client = get_app_openai_client(websocket.app)
+        # Short-lived sessions of its own: a socket can stay open for minutes
+        async with sessions() as db:
+            user = await find_token_user(websocket, connection_token(websocket), db)
+
+        while True:
+            try:
+                message = await asyncio.wait_for(websocket.receive(), settings.practice_ws_idle_timeout)
+            except TimeoutError:
+                await _close_with_error(websocket, 408, "No audio received", status.WS_1008_POLICY_VIOLATION)
+                return
+            if message["type"] == "websocket.disconnect":
+                return
+            if message.get("bytes") is not None:
+                if segmenter.received_bytes + len(message["bytes"]) > settings.max_upload_bytes:
+                    await _close_with_error(websocket, 413, "Recording too large", status.WS_1009_MESSAGE_TOO_BIG)
+                    return
+                # VAD over the pending audio is CPU-bound; keep it off the event loop
+                submit(await asyncio.to_thread(segmenter.feed, message["bytes"]))
+            elif message.get("text") is not None:
+                try:
+                    kind = json.loads(message["text"]).get("type")
+                except (ValueError, AttributeError):
+                    kind = None
+                if kind == "end":
+                    break
+
+        # The final chunk is in: only the last utterance and feedback are left
+        with deadline():
+            with deadline(share=settings.practice_transcription_budget_share):
+                submit(segmenter.flush())
+                if not tasks:
+                    await _close_with_error(websocket, 400, "No speech detected", status.WS_1008_POLICY_VIOLATION)
+                    return
+                transcriptions = await asyncio.gather(*tasks)
+            transcription = stitch_transcriptions(transcriptions, chunks, 0.0)
+            transcription.bytes_saved = segmenter.received_bytes - sum(len(chunk.data) for chunk in chunks)
+            transcription.seconds_saved = round(segmenter.received_seconds - transcription.duration, 3)
+            async with sessions() as db:
+                response = await finish_practice(client, db, transcription, user.id if user else None)
+
+        await websocket.send_json({"type": "result", "result": response.model_dump()})
+        await websocket.close()
+    except WebSocketDisconnect:
+        pass
+    except UpstreamUnavailable as e:
+        await _close_with_error(
+            websocket,
+            503,
+            f"Practice session unavailable: {str(e)}",
+            status.WS_1013_TRY_AGAIN_LATER,
+            retry_after=e.retry_after,
         )
-        db.add(session)
-        db.commit()
-        db.refresh(session)
-        
-        return PracticeResponse(
-            session_id=session.id,
-            transcription=transcribed_text,
-            corrected_text=feedback_result.get("corrected_text"),
-            feedback=feedback_result.get("feedback"),
-            pronunciation_tips=feedback_result.get("pronunciation_tips", []),
-            grammar_notes=feedback_result.get("grammar_notes", []),
-            score=feedback_result.get("score", 50)
+    except DeadlineExceeded as e:
+        await _close_with_error(
+            websocket, 504, f"Practice session timed out: {str(e)}", status.WS_1011_INTERNAL_ERROR
         )
+    except HTTPException as e:
+        await _close_with_error(websocket, e.status_code, e.detail, status.WS_1011_INTERNAL_ERROR)
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Practice session failed: {str(e)}")
+        await _close_with_error(
+            websocket, 500, f"Practice session failed: {str(e)}", status.WS_1011_INTERNAL_ERROR
+        )
+    finally:
+        # Disconnected or failed: pending transcriptions are wasted work
+        for task in tasks:
+            task.cancel()
+
+
+async def _get_visible_job(
+    db: AsyncSession,
+    job_id: str,
+    user: Optional[models.User],
+) -> models.PracticeJob:
+    job = await get_job(db, job_id)
+    # Jobs created by a signed-in user are only visible to that user
+    if job is None or (job.user_id is not None and (user is None or user.id != job.user_id)):
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@router.get("/jobs/{job_id}", response_model=PracticeJobResponse)
+async def get_practice_job(
+    job_id: str,
+    db: AsyncSession = Depends(get_db),
+    user: Optional[models.User] = Depends(get_optional_user),
+):
+    """Current status of a background practice job, with its result when done."""
+    return build_job_response(await _get_visible_job(db, job_id, user))
+
+
+@router.get("/jobs/{job_id}/events")
+async def stream_practice_job(
+    job_id: str,
+    db: AsyncSession = Depends(get_db),
+    sessions: async_sessionmaker[AsyncSession] = Depends(get_session_factory),
+    user: Optional[models.User] = Depends(get_optional_user),
+):
+    """Stream job status changes as Server-Sent Events until it finishes."""
+    await _get_visible_job(db, job_id, user)
+    await db.rollback()  # Do not keep the lookup's transaction open while streaming
+
+    async def events() -> AsyncIterator[str]:
+        last_status = None
+        while True:
+            # A fresh session per poll, so no transaction stays open between polls
+            async with sessions() as stream_db:
+                job = await get_job(stream_db, job_id)
+            if job.status != last_status:
+                last_status = job.status
+                yield _sse("status", build_job_response(job).model_dump())
+            if job.status in TERMINAL_STATUSES:
+                return
+            await asyncio.sleep(settings.practice_jobs_poll_interval)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,30 +1,33 @@
-from fastapi import APIRouter, Depends, Header, HTTPException, status, Query
-from firebase_admin import auth as firebase_auth
-from sqlalchemy.orm import Session
-from sqlalchemy import func
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, status, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
 
+from app.core.auth import parse_bearer_token, verify_request_token
 from app.db.session import get_db
 from app.db import models
-from app.schemas.user import UserRead, PracticeSessionRead, UserStatsRead
+from app.db.pagination import InvalidCursor, before_cursor, encode_cursor
+from app.db.stats import get_or_rebuild_user_stats
+from app.db.users import resolve_user
+from app.schemas.user import UserRead, PracticeSessionRead, PracticeSessionPage, UserStatsRead
 
 router = APIRouter()
 
 
-def get_current_user_from_token(
+async def get_current_user_from_token(
+    request: Request,
     authorization: str | None = Header(None), 
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ) -> models.User:
     """Dependency to extract and validate the current user from Firebase token."""
     if not authorization:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Missing Authorization header")
 
-    parts = authorization.split()
-    if len(parts) != 2 or parts[0].lower() != "bearer":
+    token = parse_bearer_token(authorization)
+    if not token:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid Authorization header format")
 
-    token = parts[1]
     try:
-        decoded = firebase_auth.verify_id_token(token)
+        decoded = await verify_request_token(request, token)
     except Exception:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
 
@@ -32,14 +35,7 @@ def get_current_user_from_token(
     email = decoded.get("email")
     name = decoded.get("name") or decoded.get("display_name")
 
-    user = db.query(models.User).filter(models.User.uid == uid).first()
-    if not user:
-        user = models.User(uid=uid, email=email, name=name)
-        db.add(user)
-        db.commit()
-        db.refresh(user)
-
-    return user
+    return await resolve_user(db, uid, email, name)
 
 
 @router.get("/me", response_model=UserRead)
@@ -48,42 +44,60 @@ async def get_current_user(user: models.User = Depends(get_current_user_from_tok
     return user
 
 
-@router.get("/me/sessions", response_model=list[PracticeSessionRead])
+@router.get("/me/sessions", response_model=list[PracticeSessionRead] | PracticeSessionPage)
 async def get_user_sessions(
     user: models.User = Depends(get_current_user_from_token),
-    db: Session = Depends(get_db),
-    limit: int = Query(default=20, le=100),
+    db: AsyncSession = Depends(get_db),
+    limit: int = Query(default=20, ge=1, le=100),
     offset: int = Query(default=0, ge=0),
+    cursor: str | None = Query(default=None),
 ):
-    """Get the current user's practice session history."""
-    sessions = (
-        db.query(models.PracticeSession)
-        .filter(models.PracticeSession.user_id == user.id)
-        .order_by(models.PracticeSession.created_at.desc())
-        .offset(offset)
-        .limit(limit)
-        .all()
-    )
-    return sessions
+    """Get the current user's practice session history.
+
+    Passing ``cursor`` switches to keyset pagination: send ``cursor=`` (empty)
+    for the first page, then the returned ``next_cursor`` until it is null.
+    Without it, the legacy offset mode returns a plain list.
+    """
+    order = (models.PracticeSession.created_at.desc(), models.PracticeSession.id.desc())
+    query = select(models.PracticeSession).where(models.PracticeSession.user_id == user.id)
+
+    if cursor is None:
+        result = await db.execute(query.order_by(*order).offset(offset).limit(limit))
+        return result.scalars().all()
+
+    if cursor:
+        try:
+            query = query.where(before_cursor(
+                db,
+                models.PracticeSession.created_at,
+                models.PracticeSession.id,
+                cursor,
+            ))
+        except InvalidCursor as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    # Fetch one extra row to know whether another page exists
+    result = await db.execute(query.order_by(*order).limit(limit + 1))
+    sessions = result.scalars().all()
+    next_cursor = None
+    if len(sessions) > limit:
+        sessions = sessions[:limit]
+        last = sessions[-1]
+        next_cursor = encode_cursor(last.created_at, last.id)
+    return PracticeSessionPage(items=sessions, next_cursor=next_cursor)
 
 
 @router.get("/me/stats", response_model=UserStatsRead)
 async def get_user_stats(
     user: models.User = Depends(get_current_user_from_token),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """Get aggregated statistics for the current user's practice sessions."""
-    stats = db.query(
-        func.count(models.PracticeSession.id).label("total_sessions"),
-        func.avg(models.PracticeSession.score).label("average_score"),
-        func.max(models.PracticeSession.score).label("best_score"),
-        func.min(models.PracticeSession.created_at).label("first_session"),
-        func.max(models.PracticeSession.created_at).label("last_session"),
-    ).filter(models.PracticeSession.user_id == user.id).first()
+    stats = await get_or_rebuild_user_stats(db, user.id)
     
     return UserStatsRead(
-        total_sessions=stats.total_sessions or 0,
-        average_score=round(stats.average_score or 0),
+        total_sessions=stats.total_sessions,
+        average_score=round(stats.score_sum / stats.scored_sessions) if stats.scored_sessions else 0,
         best_score=stats.best_score or 0,
         first_session=stats.first_session,
         last_session=stats.last_session,
@@ -0,0 +1,331 @@
+"""Audio pre-processing before transcription.
+
+PCM WAV uploads are decoded, trimmed of leading/trailing silence with a
+frame-energy VAD, downmixed to mono and resampled to 16 kHz before they are
+sent to Whisper, which cuts both upload time and billed audio seconds.
+Long recordings can also be split at silences for parallel transcription,
+and live PCM streams cut into utterances as the learner pauses.
+Everything is vectorized with numpy; other formats pass through untouched.
+"""
+import asyncio
+import io
+import os
+import wave
+from dataclasses import dataclass
+
+import numpy as np
+
+from app.core.config import settings
+from app.core.uploads import AudioUpload
+
+# Taps of the windowed-sinc low-pass applied before downsampling
+RESAMPLE_FILTER_TAPS = 63
+
+
+@dataclass
+class PreprocessedAudio:
+    data: bytes
+    original_bytes: int
+    original_seconds: float
+    processed_seconds: float
+    trimmed_start_seconds: float  # Offset of the processed audio in the original
+
+    @property
+    def bytes_saved(self) -> int:
+        return self.original_bytes - len(self.data)
+
+    @property
+    def seconds_saved(self) -> float:
+        return round(self.original_seconds - self.processed_seconds, 3)
+
+
+def is_wav(header: bytes) -> bool:
+    return len(header) >= 12 and header[:4] == b"RIFF" and header[8:12] == b"WAVE"
+
+
+def decode_wav(data: bytes) -> tuple[np.ndarray, int]:
+    """Decode integer PCM WAV into float32 samples shaped (frames, channels)."""
+    with wave.open(io.BytesIO(data)) as wav:
+        channels = wav.getnchannels()
+        width = wav.getsampwidth()
+        rate = wav.getframerate()
+        raw = wav.readframes(wav.getnframes())
+
+    if width == 1:
+        samples = (np.frombuffer(raw, dtype=np.uint8).astype(np.float32) - 128.0) / 128.0
+    elif width == 2:
+        samples = np.frombuffer(raw, dtype="<i2").astype(np.float32) / 32768.0
+    elif width == 3:
+        bytes3 = np.frombuffer(raw, dtype=np.uint8).reshape(-1, 3).astype(np.int32)
+        ints = bytes3[:, 0] | (bytes3[:, 1] << 8) | (bytes3[:, 2] << 16)
+        ints = np.where(ints & 0x800000, ints - 0x1000000, ints)
+        samples = ints.astype(np.float32) / 8388608.0
+    elif width == 4:
+        samples = np.frombuffer(raw, dtype="<i4").astype(np.float32) / 2147483648.0
+    else:
+        raise ValueError(f"Unsupported sample width: {width}")
+
+    return samples.reshape(-1, channels), rate
+
+
+def encode_wav(mono: np.ndarray, rate: int) -> bytes:
+    """Encode mono float samples as 16-bit PCM WAV."""
+    pcm = (np.clip(mono, -1.0, 1.0) * 32767.0).astype("<i2")
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(rate)
+        wav.writeframes(pcm.tobytes())
+    return buffer.getvalue()
+
+
+def frame_energy_db(mono: np.ndarray, rate: int) -> tuple[np.ndarray, int]:
+    """RMS energy in dBFS of consecutive ``AUDIO_VAD_FRAME_MS`` frames, and the frame length."""
+    frame = max(1, int(rate * settings.audio_vad_frame_ms / 1000))
+    n_frames = len(mono) // frame
+    frames = mono[: n_frames * frame].reshape(n_frames, frame)
+    rms = np.sqrt(np.mean(frames * frames, axis=1))
+    return 20.0 * np.log10(rms + 1e-10), frame
+
+
+def voiced_frames(db: np.ndarray) -> np.ndarray:
+    """Indices of voiced frames.
+
+    A frame is voiced when its RMS energy is within
+    ``AUDIO_SILENCE_THRESHOLD_DB`` of the loudest frame and above the absolute
+    ``AUDIO_SPEECH_FLOOR_DB``, so steady room noise alone is never speech.
+    """
+    return np.flatnonzero(db > max(db.max() + settings.audio_silence_threshold_db, settings.audio_speech_floor_db))
+
+
+def voiced_bounds(mono: np.ndarray, rate: int) -> tuple[int, int] | None:
+    """Sample range from the first to the last voiced frame, padded.
+
+    Returns None when no frame is voiced.
+    """
+    db, frame = frame_energy_db(mono, rate)
+    if len(db) == 0:
+        return None
+
+    voiced = voiced_frames(db)
+    if voiced.size == 0:
+        return None
+
+    padding = int(rate * settings.audio_silence_padding_ms / 1000)
+    start = max(0, voiced[0] * frame - padding)
+    end = min(len(mono), (voiced[-1] + 1) * frame + padding)
+    return start, end
+
+
+def silence_cut_points(mono: np.ndarray, rate: int, chunk_seconds: float) -> list[int]:
+    """Sample offsets splitting the audio into chunks of about ``chunk_seconds``.
+
+    Each cut lands on the quietest stretch (energy smoothed over ~200ms)
+    within 20% of the target length, so chunks break between words.
+    """
+    db, frame = frame_energy_db(mono, rate)
+    per_chunk = max(1, int(chunk_seconds * rate / frame))
+    window = max(1, per_chunk // 5)
+    smooth = max(1, int(0.2 * rate / frame))
+    energy = np.convolve(db, np.ones(smooth) / smooth, mode="same")
+
+    cuts = []
+    position = 0
+    while len(db) - position > per_chunk + window:
+        low = position + per_chunk - window
+        position = low + int(np.argmin(energy[low:low + 2 * window]))
+        cuts.append(position * frame)
+    return cuts
+
+
+@dataclass
+class WavChunk:
+    offset_seconds: float
+    duration_seconds: float
+    data: bytes
+
+
+def split_wav(data: bytes) -> list[WavChunk] | None:
+    """Split a long PCM WAV recording at silences into mono WAV chunks.
+
+    Returns None when the input is not decodable PCM WAV or is shorter than
+    ``TRANSCRIPTION_CHUNK_MIN_SECONDS``.
+    """
+    try:
+        samples, rate = decode_wav(data)
+    except (wave.Error, ValueError, EOFError):
+        return None
+    if len(samples) < settings.transcription_chunk_min_seconds * rate:
+        return None
+
+    mono = samples.mean(axis=1) if samples.shape[1] > 1 else samples[:, 0]
+    bounds = [0, *silence_cut_points(mono, rate, settings.transcription_chunk_seconds), len(mono)]
+    return [
+        WavChunk(
+            offset_seconds=start / rate,
+            duration_seconds=(end - start) / rate,
+            data=encode_wav(mono[start:end], rate),
+        )
+        for start, end in zip(bounds, bounds[1:])
+    ]
+
+
+def resample(mono: np.ndarray, src_rate: int, dst_rate: int) -> np.ndarray:
+    """Resample with a windowed-sinc low-pass (when downsampling) and linear interpolation."""
+    if src_rate == dst_rate or len(mono) == 0:
+        return mono
+
+    if dst_rate < src_rate:
+        cutoff = dst_rate / src_rate / 2  # Normalized to the source rate
+        n = np.arange(RESAMPLE_FILTER_TAPS) - (RESAMPLE_FILTER_TAPS - 1) / 2
+        kernel = 2 * cutoff * np.sinc(2 * cutoff * n) * np.hamming(RESAMPLE_FILTER_TAPS)
+        mono = np.convolve(mono, kernel / kernel.sum(), mode="same")
+
+    duration = len(mono) / src_rate
+    n_out = int(round(duration * dst_rate))
+    positions = np.arange(n_out) * (src_rate / dst_rate)
+    return np.interp(positions, np.arange(len(mono)), mono).astype(np.float32)
+
+
+class UtteranceSegmenter:
+    """Cut a live 16-bit little-endian mono PCM stream into utterances.
+
+    Audio is buffered until ``PRACTICE_WS_PAUSE_MS`` of silence follows voiced
+    frames (the same energy VAD as ``voiced_frames``). The utterance is then
+    trimmed, resampled to at most ``AUDIO_TARGET_SAMPLE_RATE`` and returned as
+    a WAV chunk whose offset refers to the start of the stream. Speech running
+    past ``PRACTICE_WS_MAX_UTTERANCE_SECONDS`` is cut at its quietest point.
+    """
+
+    def __init__(self, rate: int):
+        self.rate = rate
+        self.received_bytes = 0
+        self._remainder = b""  # Odd byte of a sample split across messages
+        self._pending = np.zeros(0, dtype=np.float32)
+        self._offset = 0  # Samples of the stream before the pending audio
+
+    @property
+    def received_seconds(self) -> float:
+        return (self._offset + len(self._pending)) / self.rate
+
+    def feed(self, pcm: bytes) -> list[WavChunk]:
+        """Add audio; returns the utterances it completed."""
+        self.received_bytes += len(pcm)
+        data = self._remainder + pcm
+        usable = len(data) - len(data) % 2
+        self._remainder = data[usable:]
+        samples = np.frombuffer(data[:usable], dtype="<i2").astype(np.float32) / 32768.0
+        self._pending = np.concatenate([self._pending, samples])
+
+        chunks = []
+        while (cut := self._find_cut()) is not None:
+            if (chunk := self._take(cut)) is not None:
+                chunks.append(chunk)
+        return chunks
+
+    def flush(self) -> list[WavChunk]:
+        """End of stream: the last utterance, if anything was said."""
+        chunk = self._take(len(self._pending))
+        return [chunk] if chunk is not None else []
+
+    def _find_cut(self) -> int | None:
+        db, frame = frame_energy_db(self._pending, self.rate)
+        if len(db) == 0:
+            return None
+        pause = max(1, settings.practice_ws_pause_ms // settings.audio_vad_frame_ms)
+
+        voiced = voiced_frames(db)
+        if voiced.size == 0:
+            # Nothing said yet: drop the silence instead of buffering it
+            return (len(db) - pause) * frame if len(db) > 2 * pause else None
+        if len(db) - voiced[-1] - 1 >= pause:
+            return (voiced[-1] + 1 + pause // 2) * frame
+
+        max_seconds = settings.practice_ws_max_utterance_seconds
+        if len(self._pending) > max_seconds * self.rate:
+            cuts = silence_cut_points(self._pending, self.rate, max_seconds * 0.8)
+            return cuts[0] if cuts else int(max_seconds * self.rate)
+        return None
+
+    def _take(self, cut: int) -> WavChunk | None:
+        mono, self._pending = self._pending[:cut], self._pending[cut:]
+        offset = self._offset
+        self._offset += cut
+
+        bounds = voiced_bounds(mono, self.rate)
+        if bounds is None:
+            return None
+        start, end = bounds
+        rate = min(self.rate, settings.audio_target_sample_rate)
+        processed = resample(mono[start:end], self.rate, rate)
+        return WavChunk(
+            offset_seconds=(offset + start) / self.rate,
+            duration_seconds=len(processed) / rate,
+            data=encode_wav(processed, rate),
+        )
+
+
+def preprocess_wav(data: bytes) -> PreprocessedAudio | None:
+    """Trim, downmix and resample a PCM WAV recording.
+
+    Returns None for input this stage does not handle (non-PCM WAV, empty or
+    all-silent audio) or when the result would not be smaller.
+    """
+    try:
+        samples, rate = decode_wav(data)
+    except (wave.Error, ValueError, EOFError):
+        return None
+    if len(samples) == 0:
+        return None
+
+    mono = samples.mean(axis=1) if samples.shape[1] > 1 else samples[:, 0]
+    bounds = voiced_bounds(mono, rate)
+    if bounds is None:
+        return None
+    start, end = bounds
+
+    target_rate = settings.audio_target_sample_rate
+    processed = resample(mono[start:end], rate, target_rate)
+    encoded = encode_wav(processed, target_rate)
+    if len(encoded) >= len(data):
+        return None
+
+    return PreprocessedAudio(
+        data=encoded,
+        original_bytes=len(data),
+        original_seconds=len(mono) / rate,
+        processed_seconds=len(processed) / target_rate,
+        trimmed_start_seconds=start / rate,
+    )
+
+
+async def preprocess_upload(audio: AudioUpload) -> tuple[AudioUpload, PreprocessedAudio | None]:
+    """Return the upload to send to Whisper and the pre-processing stats.
+
+    Non-WAV uploads, and WAV input the stage cannot improve, are returned
+    unchanged with None. Otherwise the caller owns (and must close) the new
+    upload.
+    """
+    if not is_wav(audio.file.read(12)):
+        return audio, None
+
+    data = await audio.read()
+    # Decoding and filtering are CPU-bound; keep them off the event loop
+    preprocessed = await asyncio.to_thread(preprocess_wav, data)
+    if preprocessed is None:
+        return audio, None
+
+    stem = os.path.splitext(audio.filename or "audio")[0]
+    processed = await AudioUpload.from_bytes(f"{stem}.wav", preprocessed.data)
+    return processed, preprocessed
+
+
+async def split_upload(audio: AudioUpload) -> list[WavChunk] | None:
+    """Split a long WAV upload for parallel transcription (None if not applicable)."""
+    if not is_wav(audio.file.read(12)):
+        return None
+
+    data = await audio.read()
+    chunks = await asyncio.to_thread(split_wav, data)
+    return chunks if chunks and len(chunks) > 1 else None
@@ -0,0 +1,136 @@
+"""Firebase ID-token verification shared by the auth dependencies.
+
+Decoded claims are cached by token hash until the token expires, so a client
+calling several endpoints back-to-back pays for signature verification once.
+Google's signing certificates are refreshed in the background so a request
+never has to wait on fetching them.
+"""
+import asyncio
+import hashlib
+import time
+
+import firebase_admin
+from fastapi.requests import HTTPConnection
+from firebase_admin import auth as firebase_auth
+
+from app.core.cache import LRUCache
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.core.metrics import track_upstream
+
+logger = get_logger(__name__)
+
+claims_cache = LRUCache(max_entries=settings.auth_cache_max_entries)
+
+
+def parse_bearer_token(authorization: str | None) -> str | None:
+    """Extract the token from a ``Bearer <token>`` header value."""
+    if not authorization:
+        return None
+    parts = authorization.split()
+    if len(parts) != 2 or parts[0].lower() != "bearer":
+        return None
+    return parts[1]
+
+
+def connection_token(connection: HTTPConnection) -> str | None:
+    """Bearer token of a request, or ``?token=`` on a WebSocket (browsers cannot set its headers)."""
+    token = parse_bearer_token(connection.headers.get("authorization"))
+    if token is None and connection.scope["type"] == "websocket":
+        token = connection.query_params.get("token") or None
+    return token
+
+
+def _cache_key(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def _cached_claims(token: str) -> dict | None:
+    if settings.auth_revocation_check == "always":
+        return None
+    return claims_cache.get(_cache_key(token))
+
+
+def _verify_and_cache(token: str) -> dict:
+    policy = settings.auth_revocation_check
+    with track_upstream("firebase_verify"):
+        claims = firebase_auth.verify_id_token(token, check_revoked=policy != "never")
+    if policy == "always":
+        return claims
+
+    ttl = claims.get("exp", 0) - time.time()
+    if policy == "interval":
+        ttl = min(ttl, settings.auth_revocation_check_interval)
+    if ttl > 0:
+        claims_cache.set(_cache_key(token), claims, ttl_seconds=ttl)
+    return claims
+
+
+async def verify_token_async(token: str) -> dict:
+    """Verify a Firebase ID token, returning its decoded claims.
+
+    Revocation checks follow ``AUTH_REVOCATION_CHECK``:
+    ``never`` caches claims until ``exp``; ``interval`` re-verifies with a
+    revocation check every ``AUTH_REVOCATION_CHECK_INTERVAL`` seconds;
+    ``always`` checks revocation on every call and bypasses the cache.
+    Cache misses verify off the event loop. Raises whatever
+    ``verify_id_token`` raises for invalid tokens.
+    """
+    claims = _cached_claims(token)
+    if claims is not None:
+        return claims
+    return await asyncio.to_thread(_verify_and_cache, token)
+
+
+async def verify_request_token(request: HTTPConnection, token: str) -> dict:
+    """``verify_token_async`` remembered on the request.
+
+    The rate limiter and the auth dependencies both need the claims, and
+    uncacheable tokens (``AUTH_REVOCATION_CHECK=always``, expired) must not
+    be verified twice.
+    """
+    remembered = getattr(request.state, "auth_claims", None)
+    if remembered is not None and remembered[0] == token:
+        return remembered[1]
+    claims = await verify_token_async(token)
+    request.state.auth_claims = (token, claims)
+    return claims
+
+
+def _refresh_certificates() -> None:
+    """Re-fetch the ID-token signing certs into firebase-admin's HTTP cache."""
+    from firebase_admin import _token_gen
+
+    client = firebase_auth._get_client(firebase_admin.get_app())
+    # Bypass the cached copy so the stored response (and its max-age) is renewed
+    client._token_verifier.request(
+        _token_gen.ID_TOKEN_CERT_URI,
+        headers={"Cache-Control": "no-cache"},
+    )
+
+
+async def refresh_certificates_forever(interval: float) -> None:
+    while True:
+        if firebase_admin._apps:
+            try:
+                await asyncio.to_thread(_refresh_certificates)
+            except Exception:
+                logger.warning("Failed to refresh Firebase public certificates", exc_info=True)
+        await asyncio.sleep(interval)
+
+
+def start_certificate_refresher() -> asyncio.Task | None:
+    """Start the background refresher (disabled when the interval is 0)."""
+    if settings.auth_cert_refresh_interval <= 0:
+        return None
+    return asyncio.create_task(refresh_certificates_forever(settings.auth_cert_refresh_interval))
+
+
+async def stop_certificate_refresher(task: asyncio.Task | None) -> None:
+    if task is None:
+        return
+    task.cancel()
+    try:
+        await task
+    except asyncio.CancelledError:
+        pass
@@ -0,0 +1,145 @@
+"""Caching primitives and pluggable async cache backends."""
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable
+
+
+class LRUCache:
+    """Thread-safe, size-bounded LRU cache with per-entry TTL."""
+
+    def __init__(self, max_entries: int, ttl_seconds: float | None = None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._data: OrderedDict[Hashable, tuple[float | None, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Any | None:
+        """Return the cached value, or None if missing or expired."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, value = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._data[key]
+                self.evictions += 1
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl_seconds: float | None = None) -> None:
+        """Store a value, evicting the least recently used entries when full."""
+        ttl = ttl_seconds if ttl_seconds is not None else self.ttl_seconds
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key: Hashable) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> dict:
+        """Hit/miss/eviction counters for monitoring."""
+        return {
+            "entries": len(self._data),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+class MemoryCacheBackend:
+    """Async cache backend over a process-local LRU.
+
+    Used on its own in development and tests, and as the stand-in for the
+    shared store when no ``CACHE_URL`` is configured.
+    """
+
+    tier = "memory"
+
+    def __init__(self, max_entries: int, ttl_seconds: float | None = None):
+        self.lru = LRUCache(max_entries=max_entries, ttl_seconds=ttl_seconds)
+
+    async def get(self, key: str) -> Any | None:
+        return self.lru.get(key)
+
+    async def set(self, key: str, value: Any, ttl_seconds: float | None = None) -> None:
+        self.lru.set(key, value, ttl_seconds)
+
+    async def delete(self, key: str) -> None:
+        self.lru.delete(key)
+
+    async def clear(self, prefix: str = "") -> None:
+        self.lru.clear()
+
+    def stats(self) -> dict:
+        return self.lru.stats()
+
+
+class RedisCacheBackend:
+    """Async cache backend shared between workers through Redis.
+
+    Values are stored as JSON. Requires the optional ``redis`` package.
+    """
+
+    tier = "redis"
+
+    def __init__(self, url: str, ttl_seconds: float | None = None):
+        import redis.asyncio as redis
+
+        self.client = redis.from_url(url)
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+
+    async def get(self, key: str) -> Any | None:
+        raw = await self.client.get(key)
+        if raw is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(raw)
+
+    async def set(self, key: str, value: Any, ttl_seconds: float | None = None) -> None:
+        ttl = ttl_seconds if ttl_seconds is not None else self.ttl_seconds
+        await self.client.set(key, json.dumps(value), ex=int(ttl) if ttl else None)
+
+    async def delete(self, key: str) -> None:
+        await self.client.delete(key)
+
+    async def clear(self, prefix: str = "") -> None:
+        async for key in self.client.scan_iter(match=f"{prefix}*"):
+            await self.client.delete(key)
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses}
+
+
+def create_cache_backend(
+    url: str | None,
+    max_entries: int,
+    ttl_seconds: float | None = None,
+) -> "MemoryCacheBackend | RedisCacheBackend":
+    """Pick a backend from a URL: ``redis://...`` for the shared store, else memory."""
+    if url and url.startswith(("redis://", "rediss://")):
+        return RedisCacheBackend(url, ttl_seconds=ttl_seconds)
+    return MemoryCacheBackend(max_entries=max_entries, ttl_seconds=ttl_seconds)
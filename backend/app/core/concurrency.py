@@ -0,0 +1,194 @@
+"""Adaptive concurrency limits and circuit breakers for upstream AI calls.
+
+Each upstream (``whisper``, ``chat``) gets an AIMD limiter: the number of
+concurrent calls grows by about one per round trip while calls succeed at
+normal latency, and shrinks by ``UPSTREAM_CONCURRENCY_BACKOFF`` on 429s, 5xx,
+connection errors or latency above ``UPSTREAM_LATENCY_TOLERANCE`` times the
+running average. Whisper's latency grows with the recording, so only errors
+count as overload there. Calls over the limit wait (bounded by the request
+deadline).
+
+Behind it, a circuit breaker opens after ``CIRCUIT_FAILURE_THRESHOLD``
+consecutive failures and rejects calls with ``UpstreamUnavailable`` for
+``CIRCUIT_OPEN_SECONDS``; then a single probe call decides whether it closes.
+"""
+import asyncio
+import math
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+from app.core.config import settings
+from app.core.metrics import UPSTREAM_REJECTED
+
+# Weight of each successful call in the running latency average
+LATENCY_EWMA_ALPHA = 0.05
+# Upstreams whose latency depends on the input size, so a slow call is no sign of overload
+SIZE_BOUND_UPSTREAMS = {"whisper"}
+
+
+class UpstreamUnavailable(Exception):
+    """The circuit for an upstream is open; retry after ``retry_after`` seconds."""
+
+    def __init__(self, upstream: str, retry_after: int):
+        super().__init__(f"{upstream} is temporarily unavailable")
+        self.upstream = upstream
+        self.retry_after = retry_after
+
+
+class AdaptiveLimiter:
+    """AIMD concurrency limit for one upstream."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.latency_signal = name not in SIZE_BOUND_UPSTREAMS
+        self.limit = float(settings.upstream_concurrency_initial)
+        self.in_flight = 0
+        self.latency: float | None = None  # Running average of successful calls
+        self._waiters: deque[asyncio.Future] = deque()
+        self._last_decrease = 0.0
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator["Outcome"]:
+        """Hold one concurrency slot; set ``outcome.overloaded`` / ``outcome.ok`` before leaving."""
+        await self._acquire()
+        outcome = Outcome()
+        try:
+            yield outcome
+        finally:
+            self._release(outcome)
+
+    async def _acquire(self) -> None:
+        if self.in_flight < int(self.limit) and not self._waiters:
+            self.in_flight += 1
+            return
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # Granted a slot just as we were cancelled: hand it on
+                self.in_flight -= 1
+                self._wake()
+            elif waiter in self._waiters:
+                self._waiters.remove(waiter)
+            raise
+
+    def _wake(self) -> None:
+        while self._waiters and self.in_flight < int(self.limit):
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self.in_flight += 1
+                waiter.set_result(None)
+
+    def _release(self, outcome: "Outcome") -> None:
+        self.in_flight -= 1
+        seconds = time.monotonic() - outcome.started
+        slow = (
+            self.latency_signal
+            and self.latency is not None
+            and seconds > settings.upstream_latency_tolerance * self.latency
+        )
+
+        if outcome.overloaded or slow:
+            # One decrease per round trip: calls that started before the last
+            # decrease saw the old limit and say nothing new
+            if outcome.started >= self._last_decrease:
+                self.limit = max(
+                    settings.upstream_concurrency_min, self.limit * settings.upstream_concurrency_backoff
+                )
+                self._last_decrease = time.monotonic()
+        elif outcome.ok:
+            self.limit = min(settings.upstream_concurrency_max, self.limit + 1 / self.limit)
+
+        if outcome.ok:
+            self.latency = seconds if self.latency is None else self.latency + LATENCY_EWMA_ALPHA * (seconds - self.latency)
+        self._wake()
+
+
+class Outcome:
+    """How a call that held a limiter slot ended."""
+
+    def __init__(self):
+        self.started = time.monotonic()
+        self.ok = False
+        self.overloaded = False
+
+
+class CircuitBreaker:
+    """Closed / open / half-open breaker counting consecutive upstream failures."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.failures = 0
+        self.opened_at: float | None = None
+        self.probing = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at < settings.circuit_open_seconds:
+            return "open"
+        return "half_open"
+
+    def retry_after(self) -> int:
+        if self.opened_at is None:
+            return 1
+        return max(1, math.ceil(self.opened_at + settings.circuit_open_seconds - time.monotonic()))
+
+    def allow(self) -> bool:
+        """Let a call through, or raise ``UpstreamUnavailable``. Returns whether it is the probe."""
+        state = self.state
+        if state == "closed":
+            return False
+        if state == "half_open" and not self.probing:
+            self.probing = True
+            return True
+        UPSTREAM_REJECTED.labels(self.name).inc()
+        raise UpstreamUnavailable(self.name, self.retry_after())
+
+    def record(self, ok: bool | None, probe: bool) -> None:
+        """Count a call's result; ``None`` means it told us nothing (e.g. a losing hedge)."""
+        if probe:
+            self.probing = False
+        if ok is None:
+            return
+        if ok:
+            self.failures = 0
+            self.opened_at = None
+            return
+        self.failures += 1
+        if probe or (self.opened_at is None and self.failures >= settings.circuit_failure_threshold):
+            self.opened_at = time.monotonic()
+
+
+limiters: dict[str, AdaptiveLimiter] = {}
+breakers: dict[str, CircuitBreaker] = {}
+
+
+def get_limiter(upstream: str) -> AdaptiveLimiter:
+    if upstream not in limiters:
+        limiters[upstream] = AdaptiveLimiter(upstream)
+    return limiters[upstream]
+
+
+def get_breaker(upstream: str) -> CircuitBreaker:
+    if upstream not in breakers:
+        breakers[upstream] = CircuitBreaker(upstream)
+    return breakers[upstream]
+
+
+def upstream_status() -> dict:
+    """Limiter and breaker state per upstream, for ``/health`` and metrics."""
+    return {
+        name: {
+            "circuit": get_breaker(name).state,
+            "concurrency_limit": int(limiter.limit),
+            "in_flight": limiter.in_flight,
+            "waiting": len(limiter._waiters),
+        }
+        for name, limiter in limiters.items()
+    }
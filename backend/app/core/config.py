@@ -24,20 +24,109 @@ class Settings(BaseSettings):
     # Authentication
     firebase_credentials_path: str | None = Field(None, validation_alias="FIREBASE_CREDENTIALS_PATH")
     firebase_credentials_json: str | None = Field(None, validation_alias="FIREBASE_CREDENTIALS_JSON")
+    auth_cache_max_entries: int = Field(10000, validation_alias="AUTH_CACHE_MAX_ENTRIES")
+    auth_revocation_check: Literal["never", "interval", "always"] = Field(
+        "never", validation_alias="AUTH_REVOCATION_CHECK"
+    )
+    auth_revocation_check_interval: int = Field(300, validation_alias="AUTH_REVOCATION_CHECK_INTERVAL")
+    user_cache_max_entries: int = Field(10000, validation_alias="USER_CACHE_MAX_ENTRIES")
+    auth_cert_refresh_interval: int = Field(1800, validation_alias="AUTH_CERT_REFRESH_INTERVAL")  # 0 disables
     
     # OpenAI / AI settings
     openai_api_key: str | None = Field(None, validation_alias="OPENAI_API_KEY")
     whisper_model: str = Field("whisper-1", validation_alias="WHISPER_MODEL")
     gpt_model: str = Field("gpt-4o-mini", validation_alias="GPT_MODEL")
     target_language: str = Field("en", validation_alias="TARGET_LANGUAGE")
+    openai_timeout: float = Field(60.0, validation_alias="OPENAI_TIMEOUT")  # Seconds per upstream call
+    openai_connect_timeout: float = Field(5.0, validation_alias="OPENAI_CONNECT_TIMEOUT")
+    openai_max_connections: int = Field(100, validation_alias="OPENAI_MAX_CONNECTIONS")
+    openai_max_keepalive_connections: int = Field(20, validation_alias="OPENAI_MAX_KEEPALIVE_CONNECTIONS")
+    openai_keepalive_expiry: float = Field(30.0, validation_alias="OPENAI_KEEPALIVE_EXPIRY")
+    openai_max_retries: int = Field(0, validation_alias="OPENAI_MAX_RETRIES")  # SDK-level; app.core.upstream retries
+    feedback_batch_max_items: int = Field(50, validation_alias="FEEDBACK_BATCH_MAX_ITEMS")
+    feedback_batch_concurrency: int = Field(8, validation_alias="FEEDBACK_BATCH_CONCURRENCY")
+    feedback_max_input_tokens: int = Field(1500, validation_alias="FEEDBACK_MAX_INPUT_TOKENS")  # Learner text is trimmed to this; 0 disables
+    
+    # Audio uploads: hard size cap, and bytes kept in memory before spooling to disk
+    max_upload_bytes: int = Field(25 * 1024 * 1024, validation_alias="MAX_UPLOAD_BYTES")
+    upload_spool_max_memory: int = Field(1024 * 1024, validation_alias="UPLOAD_SPOOL_MAX_MEMORY")
+    
+    # Audio pre-processing of PCM WAV before Whisper: silence trim, mono, resample
+    audio_preprocessing_enabled: bool = Field(True, validation_alias="AUDIO_PREPROCESSING_ENABLED")
+    audio_target_sample_rate: int = Field(16000, validation_alias="AUDIO_TARGET_SAMPLE_RATE")
+    audio_silence_threshold_db: float = Field(-40.0, validation_alias="AUDIO_SILENCE_THRESHOLD_DB")  # Relative to the loudest frame
+    audio_speech_floor_db: float = Field(-50.0, validation_alias="AUDIO_SPEECH_FLOOR_DB")  # dBFS; quieter frames are never speech
+    audio_silence_padding_ms: int = Field(200, validation_alias="AUDIO_SILENCE_PADDING_MS")
+    audio_vad_frame_ms: int = Field(20, validation_alias="AUDIO_VAD_FRAME_MS")
+    
+    # Long WAV recordings are split at silences and the chunks transcribed concurrently
+    transcription_chunking_enabled: bool = Field(True, validation_alias="TRANSCRIPTION_CHUNKING_ENABLED")
+    transcription_chunk_min_seconds: float = Field(90.0, validation_alias="TRANSCRIPTION_CHUNK_MIN_SECONDS")
+    transcription_chunk_seconds: float = Field(45.0, validation_alias="TRANSCRIPTION_CHUNK_SECONDS")
+    transcription_chunk_concurrency: int = Field(4, validation_alias="TRANSCRIPTION_CHUNK_CONCURRENCY")
+    
+    # Live practice over WebSocket: streamed PCM is cut into utterances at pauses
+    practice_ws_pause_ms: int = Field(600, validation_alias="PRACTICE_WS_PAUSE_MS")  # Silence that ends an utterance
+    practice_ws_max_utterance_seconds: float = Field(30.0, validation_alias="PRACTICE_WS_MAX_UTTERANCE_SECONDS")
+    practice_ws_idle_timeout: float = Field(30.0, validation_alias="PRACTICE_WS_IDLE_TIMEOUT")  # Seconds without a message
+    
+    # Upstream AI calls: per-request deadline, jittered retries, optional hedging
+    request_deadline_seconds: float = Field(45.0, validation_alias="REQUEST_DEADLINE_SECONDS")
+    practice_transcription_budget_share: float = Field(0.6, validation_alias="PRACTICE_TRANSCRIPTION_BUDGET_SHARE")  # Rest goes to feedback
+    transcription_deadline_seconds_per_mb: float = Field(15.0, validation_alias="TRANSCRIPTION_DEADLINE_SECONDS_PER_MB")  # Added for long uploads
+    upstream_max_retries: int = Field(2, validation_alias="UPSTREAM_MAX_RETRIES")
+    upstream_retry_base_delay: float = Field(0.25, validation_alias="UPSTREAM_RETRY_BASE_DELAY")  # Seconds, doubled per retry
+    upstream_retry_max_delay: float = Field(4.0, validation_alias="UPSTREAM_RETRY_MAX_DELAY")
+    hedging_enabled: bool = Field(False, validation_alias="HEDGING_ENABLED")
+    hedge_quantile: float = Field(0.95, validation_alias="HEDGE_QUANTILE")  # Hedge after this latency quantile
+    hedge_min_samples: int = Field(20, validation_alias="HEDGE_MIN_SAMPLES")  # No hedging until this many calls observed
+    
+    # Adaptive (AIMD) concurrency limit and circuit breaker per upstream
+    upstream_concurrency_initial: int = Field(20, validation_alias="UPSTREAM_CONCURRENCY_INITIAL")
+    upstream_concurrency_min: int = Field(2, validation_alias="UPSTREAM_CONCURRENCY_MIN")
+    upstream_concurrency_max: int = Field(200, validation_alias="UPSTREAM_CONCURRENCY_MAX")
+    upstream_concurrency_backoff: float = Field(0.9, validation_alias="UPSTREAM_CONCURRENCY_BACKOFF")  # Limit multiplier on overload
+    upstream_latency_tolerance: float = Field(2.0, validation_alias="UPSTREAM_LATENCY_TOLERANCE")  # x average latency counts as overload
+    circuit_failure_threshold: int = Field(5, validation_alias="CIRCUIT_FAILURE_THRESHOLD")  # Consecutive failures to open
+    circuit_open_seconds: float = Field(30.0, validation_alias="CIRCUIT_OPEN_SECONDS")
+    
+    # Background practice jobs (POST /speech/practice?async=1)
+    practice_jobs_workers: int = Field(4, validation_alias="PRACTICE_JOBS_WORKERS")
+    practice_jobs_max_pending: int = Field(100, validation_alias="PRACTICE_JOBS_MAX_PENDING")
+    practice_jobs_stale_seconds: int = Field(600, validation_alias="PRACTICE_JOBS_STALE_SECONDS")
+    practice_jobs_poll_interval: float = Field(0.5, validation_alias="PRACTICE_JOBS_POLL_INTERVAL")  # SSE status polling
+    
+    # Write-behind batching of practice session inserts (one INSERT ... RETURNING per batch)
+    session_write_behind_enabled: bool = Field(False, validation_alias="SESSION_WRITE_BEHIND_ENABLED")
+    session_write_batch_size: int = Field(100, validation_alias="SESSION_WRITE_BATCH_SIZE")
+    session_write_flush_ms: float = Field(10.0, validation_alias="SESSION_WRITE_FLUSH_MS")  # Max wait to fill a batch
+    session_write_max_pending: int = Field(10000, validation_alias="SESSION_WRITE_MAX_PENDING")
+    
+    # Transcription cache (in-memory LRU + database tier)
+    transcription_cache_enabled: bool = Field(True, validation_alias="TRANSCRIPTION_CACHE_ENABLED")
+    transcription_cache_max_entries: int = Field(512, validation_alias="TRANSCRIPTION_CACHE_MAX_ENTRIES")
+    transcription_cache_max_rows: int = Field(50000, validation_alias="TRANSCRIPTION_CACHE_MAX_ROWS")
+    transcription_cache_ttl_seconds: int = Field(7 * 24 * 3600, validation_alias="TRANSCRIPTION_CACHE_TTL_SECONDS")
+    
+    # Feedback cache; CACHE_URL=redis://... shares it between workers
+    cache_url: str | None = Field(None, validation_alias="CACHE_URL")
+    feedback_cache_enabled: bool = Field(True, validation_alias="FEEDBACK_CACHE_ENABLED")
+    feedback_cache_max_entries: int = Field(2048, validation_alias="FEEDBACK_CACHE_MAX_ENTRIES")
+    feedback_cache_ttl_seconds: int = Field(24 * 3600, validation_alias="FEEDBACK_CACHE_TTL_SECONDS")
     
     # Security
     cors_origins: str = Field("*", validation_alias="CORS_ORIGINS")  # Comma-separated
-    rate_limit: str = Field("100/minute", validation_alias="RATE_LIMIT")
+    rate_limit_enabled: bool = Field(True, validation_alias="RATE_LIMIT_ENABLED")
+    rate_limit: str = Field("300/minute", validation_alias="RATE_LIMIT")  # Tokens per client; /practice costs 20
+    rate_limit_max_keys: int = Field(100000, validation_alias="RATE_LIMIT_MAX_KEYS")  # Process-local buckets kept
     
     # Monitoring
     sentry_dsn: str | None = Field(None, validation_alias="SENTRY_DSN")
     log_level: str = Field("INFO", validation_alias="LOG_LEVEL")
+    log_queue_size: int = Field(10000, validation_alias="LOG_QUEUE_SIZE")  # Records beyond this are dropped
+    log_request_sample_rate: float = Field(1.0, validation_alias="LOG_REQUEST_SAMPLE_RATE")  # Fraction of successful requests logged
+    log_slow_request_ms: float = Field(1000.0, validation_alias="LOG_SLOW_REQUEST_MS")  # Always logged at or above this
+    metrics_enabled: bool = Field(True, validation_alias="METRICS_ENABLED")  # Prometheus /metrics
     
     @property
     def is_production(self) -> bool:
@@ -58,6 +147,18 @@ class Settings(BaseSettings):
             url = url.replace("postgres://", "postgresql://", 1)
         return url
     
+    @property
+    def async_database_url(self) -> str:
+        """Database URL for the async engine (asyncpg / aiosqlite drivers)."""
+        url = self.actual_database_url
+        if url.startswith("postgresql://"):
+            url = url.replace("postgresql://", "postgresql+asyncpg://", 1)
+            # asyncpg takes ssl=... instead of libpq's sslmode=...
+            url = url.replace("sslmode=", "ssl=")
+        elif url.startswith("sqlite://"):
+            url = url.replace("sqlite://", "sqlite+aiosqlite://", 1)
+        return url
+    
     def get_firebase_credentials(self) -> dict | None:
         """Get Firebase credentials from JSON string or file path."""
         if self.firebase_credentials_json:
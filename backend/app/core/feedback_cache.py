@@ -0,0 +1,81 @@
+"""Cache of chat-completion feedback keyed on normalized learner text.
+
+Keys cover the model, the prompt version (``app.core.prompts``), the target
+language and the context, so changing ``GPT_MODEL`` or editing a prompt
+naturally stops matching old entries. ``invalidate()`` drops everything explicitly.
+"""
+import hashlib
+import json
+import unicodedata
+
+from app.core.cache import create_cache_backend
+from app.core.config import settings
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+KEY_PREFIX = "feedback:"
+# Bump to orphan every cached entry after a change in how results are parsed
+CACHE_VERSION = "1"
+
+
+def normalize_text(text: str) -> str:
+    """Canonical form of learner text: NFKC and collapsed whitespace.
+
+    Case and punctuation are kept, since correcting them is part of the feedback.
+    """
+    return " ".join(unicodedata.normalize("NFKC", text).split())
+
+
+def make_key(
+    text: str,
+    target_language: str,
+    context: str | None,
+    prompt_version: str,
+    model: str | None = None,
+) -> str:
+    payload = json.dumps([
+        CACHE_VERSION,
+        model or settings.gpt_model,
+        target_language,
+        context or "",
+        prompt_version,
+        normalize_text(text),
+    ])
+    return KEY_PREFIX + hashlib.sha256(payload.encode()).hexdigest()
+
+
+class FeedbackCache:
+    """Feedback results over a pluggable backend (process LRU or shared store)."""
+
+    def __init__(self, backend):
+        self.backend = backend
+
+    async def get(self, key: str) -> dict | None:
+        try:
+            return await self.backend.get(key)
+        except Exception:
+            logger.warning("Feedback cache read failed", exc_info=True)
+            return None
+
+    async def set(self, key: str, result: dict) -> None:
+        try:
+            await self.backend.set(key, result)
+        except Exception:
+            logger.warning("Feedback cache write failed", exc_info=True)
+
+    async def invalidate(self) -> None:
+        """Drop all cached feedback, e.g. after a prompt rollout."""
+        await self.backend.clear(prefix=KEY_PREFIX)
+
+    def stats(self) -> dict:
+        return {"tier": self.backend.tier, **self.backend.stats()}
+
+
+feedback_cache = FeedbackCache(
+    create_cache_backend(
+        settings.cache_url,
+        max_entries=settings.feedback_cache_max_entries,
+        ttl_seconds=settings.feedback_cache_ttl_seconds,
+    )
+)
@@ -0,0 +1,164 @@
+"""Bounded in-process worker pool for database-backed background jobs.
+
+Jobs live in the ``practice_jobs`` table, so work accepted before a restart
+is picked up again when the next process starts. Each process claims a job
+atomically (``pending`` -> ``running``) before running it, which keeps
+several workers from processing the same job.
+"""
+import asyncio
+import json
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable
+
+from fastapi import FastAPI
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.db import models
+from app.db.session import AsyncSessionLocal
+
+logger = get_logger(__name__)
+
+PENDING = "pending"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+TERMINAL_STATUSES = (SUCCEEDED, FAILED)
+
+# handler(app, db, job) -> JSON-serializable result
+JobHandler = Callable[[FastAPI, AsyncSession, models.PracticeJob], Awaitable[dict]]
+
+
+class QueueFull(Exception):
+    pass
+
+
+class JobQueue:
+    def __init__(self, handler: JobHandler, workers: int, max_pending: int):
+        self.handler = handler
+        self.workers = workers
+        self.max_pending = max_pending
+        self.session_factory = AsyncSessionLocal
+        self._queue: asyncio.Queue[str] | None = None
+        self._reserved = 0  # Slots held by submissions still committing
+        self._tasks: list[asyncio.Task] = []
+        self._app: FastAPI | None = None
+
+    async def start(self, app: FastAPI) -> None:
+        """Spawn the workers and re-queue jobs left over from a previous run."""
+        self._app = app
+        self._queue = asyncio.Queue(maxsize=self.max_pending)
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+        stale_before = datetime.now(timezone.utc) - timedelta(seconds=settings.practice_jobs_stale_seconds)
+        async with self.session_factory() as db:
+            # Running jobs not touched for a while belong to a process that died
+            await db.execute(
+                update(models.PracticeJob)
+                .where(
+                    models.PracticeJob.status == RUNNING,
+                    models.PracticeJob.updated_at < stale_before,
+                )
+                .values(status=PENDING)
+            )
+            await db.commit()
+            result = await db.execute(
+                select(models.PracticeJob.id)
+                .where(models.PracticeJob.status == PENDING)
+                .order_by(models.PracticeJob.created_at)
+                .limit(self.max_pending)
+            )
+            for job_id in result.scalars():
+                self._queue.put_nowait(job_id)
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._queue = None
+
+    async def submit(self, db: AsyncSession, user_id: int | None, filename: str, audio: bytes) -> models.PracticeJob:
+        """Persist a new job and queue it. Raises QueueFull when at capacity."""
+        # Reserve the slot before the first await, so concurrent submissions
+        # cannot all pass the check and overflow the queue after committing
+        if self._queue is None or self._queue.qsize() + self._reserved >= self.max_pending:
+            raise QueueFull()
+        self._reserved += 1
+        try:
+            job = models.PracticeJob(
+                id=uuid.uuid4().hex,
+                user_id=user_id,
+                status=PENDING,
+                filename=filename,
+                audio=audio,
+            )
+            db.add(job)
+            await db.commit()
+        finally:
+            self._reserved -= 1
+        if self._queue is not None:  # Otherwise stopped meanwhile: picked up on the next start
+            self._queue.put_nowait(job.id)
+        return job
+
+    async def _claim(self, db: AsyncSession, job_id: str) -> bool:
+        result = await db.execute(
+            update(models.PracticeJob)
+            .where(models.PracticeJob.id == job_id, models.PracticeJob.status == PENDING)
+            .values(status=RUNNING, updated_at=datetime.now(timezone.utc))
+        )
+        await db.commit()
+        return result.rowcount == 1
+
+    async def _finish(self, db: AsyncSession, job_id: str, **values) -> None:
+        await db.execute(
+            update(models.PracticeJob)
+            .where(models.PracticeJob.id == job_id)
+            .values(audio=None, updated_at=datetime.now(timezone.utc), **values)
+        )
+        await db.commit()
+
+    async def _worker(self) -> None:
+        while True:
+            job_id = await self._queue.get()
+            try:
+                await self._run(job_id)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception(f"Job {job_id} crashed")
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job_id: str) -> None:
+        async with self.session_factory() as db:
+            if not await self._claim(db, job_id):
+                return  # Already taken by another process
+
+            job = await db.get(models.PracticeJob, job_id)
+            await db.commit()  # No transaction left open while the handler waits on OpenAI
+            try:
+                result = await self.handler(self._app, db, job)
+            except asyncio.CancelledError:
+                # Shutting down: hand the job back to the next process
+                await db.rollback()
+                await db.execute(
+                    update(models.PracticeJob)
+                    .where(models.PracticeJob.id == job_id)
+                    .values(status=PENDING)
+                )
+                await db.commit()
+                raise
+            except Exception as e:
+                await db.rollback()
+                await self._finish(db, job_id, status=FAILED, error=str(e))
+                return
+
+            await self._finish(db, job_id, status=SUCCEEDED, result=json.dumps(result))
+
+
+async def get_job(db: AsyncSession, job_id: str) -> models.PracticeJob | None:
+    return await db.get(models.PracticeJob, job_id)
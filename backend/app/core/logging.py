@@ -1,6 +1,16 @@
-"""Logging configuration for production."""
+"""Logging configuration for production.
+
+Handlers run behind a ``QueueHandler``/``QueueListener`` pair: the event loop
+only enqueues records, while formatting and the blocking stdout write happen
+on the listener thread. The queue is bounded; records that do not fit are
+dropped and counted instead of stalling requests.
+"""
+import atexit
 import logging
+import logging.handlers
+import queue
 import sys
+from typing import TextIO
 
 try:
     from pythonjsonlogger.json import JsonFormatter
@@ -8,10 +18,34 @@ except ImportError:
     from pythonjsonlogger.jsonlogger import JsonFormatter
 
 from app.core.config import settings
+from app.core.metrics import LOG_RECORDS_DROPPED
+
+_listener: logging.handlers.QueueListener | None = None
+
+
+class BoundedQueueHandler(logging.handlers.QueueHandler):
+    """Non-blocking queue handler that drops (and counts) records when the queue is full."""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # The listener runs in this process, so skip QueueHandler's eager
+        # formatting (meant for pickling) and leave it to the listener thread
+        return record
 
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+            LOG_RECORDS_DROPPED.inc()
 
-def setup_logging() -> None:
-    """Configure structured JSON logging for production."""
+
+def setup_logging(stream: TextIO | None = None) -> None:
+    """Configure structured JSON logging for production (to stdout by default)."""
+    global _listener
     
     # Get log level from settings
     log_level = getattr(logging, settings.log_level.upper(), logging.INFO)
@@ -37,10 +71,14 @@ def setup_logging() -> None:
     # Remove existing handlers
     root_logger.handlers.clear()
     
-    # Add stream handler
-    handler = logging.StreamHandler(sys.stdout)
+    # Stream handler runs on the listener thread, behind a bounded queue
+    handler = logging.StreamHandler(stream or sys.stdout)
     handler.setFormatter(formatter)
-    root_logger.addHandler(handler)
+    stop_logging()
+    log_queue = queue.Queue(maxsize=settings.log_queue_size)
+    _listener = logging.handlers.QueueListener(log_queue, handler, respect_handler_level=True)
+    _listener.start()
+    root_logger.addHandler(BoundedQueueHandler(log_queue))
     
     # Reduce noise from third-party libraries
     logging.getLogger("uvicorn.access").setLevel(logging.WARNING)
@@ -49,6 +87,17 @@ def setup_logging() -> None:
     logging.getLogger("openai").setLevel(logging.WARNING)
     
 
+def stop_logging() -> None:
+    """Flush queued records and stop the listener thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+atexit.register(stop_logging)
+
+
 def get_logger(name: str) -> logging.Logger:
     """Get a logger instance with the given name."""
     return logging.getLogger(name)
@@ -0,0 +1,239 @@
+"""Prometheus metrics for routes, upstream calls (OpenAI, Firebase) and the database.
+
+Labels are kept low-cardinality: routes are labelled by their path template
+(``/api/v1/speech/jobs/{job_id}``), never the raw URL, and upstream calls by
+a fixed name. Metrics are per process; scrape each worker.
+"""
+import time
+from contextlib import contextmanager
+from typing import Iterator
+
+from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, generate_latest
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+from prometheus_client.registry import Collector
+
+registry = CollectorRegistry()
+
+HTTP_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+# Upstream AI calls take seconds, not milliseconds
+UPSTREAM_BUCKETS = (0.1, 0.25, 0.5, 1, 2, 3, 5, 8, 13, 20, 30, 60)
+DB_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5)
+
+HTTP_REQUESTS = Counter(
+    "http_requests", "HTTP requests by route and status.",
+    ["method", "route", "status"], registry=registry,
+)
+HTTP_DURATION = Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route.",
+    ["method", "route"], buckets=HTTP_BUCKETS, registry=registry,
+)
+HTTP_IN_FLIGHT = Gauge(
+    "http_requests_in_flight", "HTTP requests currently being served.", registry=registry,
+)
+
+UPSTREAM_DURATION = Histogram(
+    "upstream_request_duration_seconds", "Latency of calls to whisper, chat and firebase_verify.",
+    ["upstream", "outcome"], buckets=UPSTREAM_BUCKETS, registry=registry,
+)
+UPSTREAM_IN_FLIGHT = Gauge(
+    "upstream_requests_in_flight", "Upstream calls currently waiting for a response.",
+    ["upstream"], registry=registry,
+)
+OPENAI_TOKENS = Counter(
+    "openai_tokens", "Chat completion tokens used.",
+    ["kind"], registry=registry,
+)
+WHISPER_AUDIO_SECONDS = Counter(
+    "whisper_audio_seconds", "Seconds of audio sent to Whisper.", registry=registry,
+)
+UPSTREAM_RETRIES = Counter(
+    "upstream_retries", "Upstream calls retried after a retryable error.",
+    ["upstream"], registry=registry,
+)
+UPSTREAM_HEDGES = Counter(
+    "upstream_hedges", "Hedged upstream requests fired, and how many beat the original.",
+    ["upstream", "outcome"], registry=registry,
+)
+UPSTREAM_DEADLINE_EXCEEDED = Counter(
+    "upstream_deadline_exceeded", "Upstream calls abandoned because the request deadline ran out.",
+    ["upstream"], registry=registry,
+)
+UPSTREAM_REJECTED = Counter(
+    "upstream_rejected", "Upstream calls rejected without trying because the circuit was open.",
+    ["upstream"], registry=registry,
+)
+
+DB_QUERY_DURATION = Histogram(
+    "db_query_duration_seconds", "Database statement execution time.",
+    ["operation"], buckets=DB_BUCKETS, registry=registry,
+)
+DB_WRITE_BATCH_SIZE = Histogram(
+    "db_write_batch_size", "Practice sessions written per write-behind batch.",
+    buckets=(1, 2, 5, 10, 20, 50, 100, 200, 500), registry=registry,
+)
+DB_POOL_WAIT = Histogram(
+    "db_pool_checkout_wait_seconds", "Time spent waiting for a pooled database connection.",
+    buckets=DB_BUCKETS, registry=registry,
+)
+
+LOG_RECORDS_DROPPED = Counter(
+    "log_records_dropped", "Log records dropped because the logging queue was full.", registry=registry,
+)
+RATE_LIMITED = Counter(
+    "rate_limited_requests", "Requests rejected with 429, by key type (user or ip).",
+    ["key"], registry=registry,
+)
+REQUEST_LOGS_SAMPLED_OUT = Counter(
+    "request_logs_sampled_out", "Successful request log lines skipped by sampling.", registry=registry,
+)
+
+DB_OPERATIONS = {"select", "insert", "update", "delete"}
+CIRCUIT_STATES = {"closed": 0, "half_open": 1, "open": 2}
+
+
+@contextmanager
+def track_upstream(upstream: str) -> Iterator[None]:
+    """Time an upstream call and count it as in flight while it runs."""
+    gauge = UPSTREAM_IN_FLIGHT.labels(upstream)
+    gauge.inc()
+    start = time.perf_counter()
+    outcome = "error"
+    try:
+        yield
+        outcome = "ok"
+    finally:
+        UPSTREAM_DURATION.labels(upstream, outcome).observe(time.perf_counter() - start)
+        gauge.dec()
+
+
+def record_chat_usage(usage) -> None:
+    """Count prompt and completion tokens from a chat completion ``usage`` object."""
+    for kind in ("prompt", "completion"):
+        tokens = getattr(usage, f"{kind}_tokens", None)
+        if isinstance(tokens, int):
+            OPENAI_TOKENS.labels(kind).inc(tokens)
+
+
+def record_audio_seconds(duration) -> None:
+    if isinstance(duration, (int, float)) and duration > 0:
+        WHISPER_AUDIO_SECONDS.inc(duration)
+
+
+def db_operation(statement: str) -> str:
+    operation = statement.lstrip().split(None, 1)[0].lower() if statement.strip() else ""
+    return operation if operation in DB_OPERATIONS else "other"
+
+
+def instrument_engine(sync_engine) -> None:
+    """Record statement durations for an engine (the ``sync_engine`` of an async one)."""
+    from sqlalchemy import event
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        start = conn.info["query_start"].pop()
+        DB_QUERY_DURATION.labels(db_operation(statement)).observe(time.perf_counter() - start)
+
+
+class StatsCollector(Collector):
+    """Exports state kept by other components (caches, single-flight, upstream limits, DB pool) at scrape time."""
+
+    def collect(self):
+        from app.core.concurrency import upstream_status
+        from app.core.feedback_cache import feedback_cache
+        from app.core.singleflight import feedback_flights, transcription_flights
+        from app.core.transcription_cache import transcription_cache
+        from app.db.session import async_engine
+
+        hits = CounterMetricFamily("cache_hits", "Cache lookups answered, by tier.", labels=["cache", "tier"])
+        misses = CounterMetricFamily("cache_misses", "Cache lookups that missed every tier.", labels=["cache"])
+        evictions = CounterMetricFamily(
+            "cache_evictions", "Entries dropped from the in-memory tier (full or expired).", labels=["cache"]
+        )
+        entries = GaugeMetricFamily("cache_entries", "Entries held in the in-memory tier.", labels=["cache"])
+        transcriptions = transcription_cache.stats()
+        hits.add_metric(["transcription", "memory"], transcriptions["memory_hits"])
+        hits.add_metric(["transcription", "db"], transcriptions["db_hits"])
+        misses.add_metric(["transcription"], transcriptions["misses"])
+        evictions.add_metric(["transcription"], transcriptions["evictions"])
+        entries.add_metric(["transcription"], transcriptions["memory_entries"])
+        feedback = feedback_cache.stats()
+        hits.add_metric(["feedback", feedback["tier"]], feedback["hits"])
+        misses.add_metric(["feedback"], feedback["misses"])
+        if "evictions" in feedback:  # Only the process-local backend has a memory tier
+            evictions.add_metric(["feedback"], feedback["evictions"])
+            entries.add_metric(["feedback"], feedback["entries"])
+        yield hits
+        yield misses
+        yield evictions
+        yield entries
+
+        calls = CounterMetricFamily(
+            "singleflight_calls", "Upstream calls started by single-flight groups.", labels=["upstream"]
+        )
+        coalesced = CounterMetricFamily(
+            "singleflight_coalesced", "Requests that joined an identical in-flight call.", labels=["upstream"]
+        )
+        for flights in (transcription_flights, feedback_flights):
+            stats = flights.stats()
+            calls.add_metric([flights.name], stats["calls"])
+            coalesced.add_metric([flights.name], stats["coalesced"])
+        yield calls
+        yield coalesced
+
+        limit = GaugeMetricFamily(
+            "upstream_concurrency_limit", "Current adaptive concurrency limit.", labels=["upstream"]
+        )
+        waiting = GaugeMetricFamily(
+            "upstream_requests_waiting", "Upstream calls queued for a concurrency slot.", labels=["upstream"]
+        )
+        circuit = GaugeMetricFamily(
+            "upstream_circuit_state", "Circuit breaker state: 0 closed, 1 half-open, 2 open.", labels=["upstream"]
+        )
+        for name, status in upstream_status().items():
+            limit.add_metric([name], status["concurrency_limit"])
+            waiting.add_metric([name], status["waiting"])
+            circuit.add_metric([name], CIRCUIT_STATES[status["circuit"]])
+        yield limit
+        yield waiting
+        yield circuit
+
+        pool = async_engine.pool
+        if hasattr(pool, "checkedout"):
+            yield GaugeMetricFamily(
+                "db_pool_connections_in_use", "Database connections checked out of the pool.",
+                value=pool.checkedout(),
+            )
+
+
+registry.register(StatsCollector())
+
+
+def render() -> tuple[bytes, str]:
+    """Exposition body and content type for the ``/metrics`` endpoint."""
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+def route_label(scope) -> str:
+    """Path template of the matched route, e.g. ``/api/v1/speech/jobs/{job_id}``.
+
+    Routes of included routers only know their own template, so the static
+    prefix is recovered from the request path.
+    """
+    template = getattr(scope.get("route"), "path_format", None)
+    if template is None:
+        return "unmatched"
+    try:
+        suffix = template.format(**scope.get("path_params", {}))
+    except (KeyError, IndexError, ValueError):
+        return template
+    path = scope["path"]
+    return path[: len(path) - len(suffix)] + template if path.endswith(suffix) else template
+
+
+def observe_request(method: str, route: str, status: int, seconds: float) -> None:
+    HTTP_REQUESTS.labels(method, route, str(status)).inc()
+    HTTP_DURATION.labels(method, route).observe(seconds)
@@ -0,0 +1,84 @@
+"""Request middleware: security headers, request logging and metrics.
+
+Implemented as a single pure-ASGI layer rather than stacked
+``@app.middleware("http")`` functions, which wrap every response in an extra
+task and stream. Messages are passed through as they arrive, so streaming
+(SSE) responses are never buffered.
+"""
+import logging
+import random
+import time
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.core.metrics import HTTP_IN_FLIGHT, REQUEST_LOGS_SAMPLED_OUT, observe_request, route_label
+from app.core.security import SECURITY_HEADER_PAIRS
+
+logger = get_logger(__name__)
+
+SECURITY_HEADER_NAMES = {name for name, _ in SECURITY_HEADER_PAIRS}
+
+
+def should_log(status: int, elapsed_ns: int) -> bool:
+    """Sample successful request logs; errors and slow requests are always kept."""
+    rate = settings.log_request_sample_rate
+    if rate >= 1 or status >= 500 or elapsed_ns >= settings.log_slow_request_ms * 1_000_000:
+        return True
+    if random.random() < rate:
+        return True
+    REQUEST_LOGS_SAMPLED_OUT.inc()
+    return False
+
+
+class RequestMiddleware:
+    """Add security headers (production), time every HTTP request and log a sample."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        add_security_headers = settings.is_production
+        metrics_enabled = settings.metrics_enabled
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if add_security_headers:
+                    headers = [
+                        header for header in message.get("headers", ())
+                        if header[0].lower() not in SECURITY_HEADER_NAMES
+                    ]
+                    headers.extend(SECURITY_HEADER_PAIRS)
+                    message["headers"] = headers
+            await send(message)
+
+        if metrics_enabled:
+            HTTP_IN_FLIGHT.inc()
+        start = time.perf_counter_ns()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed_ns = time.perf_counter_ns() - start
+            method = scope["method"]
+            path = scope["path"]
+            if metrics_enabled:
+                HTTP_IN_FLIGHT.dec()
+                observe_request(method, route_label(scope), status, elapsed_ns / 1e9)
+            if logger.isEnabledFor(logging.INFO) and should_log(status, elapsed_ns):
+                client = scope.get("client")
+                logger.info(
+                    "%s %s", method, path,
+                    extra={
+                        "method": method,
+                        "path": path,
+                        "status_code": status,
+                        "process_time_ms": round(elapsed_ns / 1e6, 2),
+                        "client_ip": client[0] if client else "unknown",
+                    }
+                )
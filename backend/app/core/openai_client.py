@@ -0,0 +1,58 @@
+"""Shared async OpenAI client with pooled HTTP connections."""
+import httpx
+from fastapi import FastAPI, HTTPException, Request
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient, Timeout
+
+from app.core.config import settings
+
+
+def create_openai_client() -> AsyncOpenAI:
+    """Build an AsyncOpenAI client backed by a keep-alive connection pool."""
+    # openai's Timeout is the class of the HTTP library it is built on (httpx
+    # or httpx2); a timeout from the other library is not understood by it
+    timeout = Timeout(settings.openai_timeout, connect=settings.openai_connect_timeout)
+    http_client = DefaultAsyncHttpxClient(
+        limits=httpx.Limits(
+            max_connections=settings.openai_max_connections,
+            max_keepalive_connections=settings.openai_max_keepalive_connections,
+            keepalive_expiry=settings.openai_keepalive_expiry,
+        ),
+        timeout=timeout,
+    )
+    return AsyncOpenAI(
+        api_key=settings.openai_api_key,
+        timeout=timeout,
+        max_retries=settings.openai_max_retries,
+        http_client=http_client,
+    )
+
+
+async def init_openai_client(app: FastAPI) -> None:
+    """Create the app-scoped client at startup (no-op without an API key)."""
+    app.state.openai_client = create_openai_client() if settings.openai_api_key else None
+
+
+async def close_openai_client(app: FastAPI) -> None:
+    """Close the pooled connections at shutdown."""
+    client = getattr(app.state, "openai_client", None)
+    app.state.openai_client = None
+    if client is not None:
+        await client.close()
+
+
+def get_app_openai_client(app: FastAPI) -> AsyncOpenAI:
+    """Return the app-scoped client, for code running outside a request."""
+    if not settings.openai_api_key:
+        raise HTTPException(status_code=500, detail="OpenAI API key not configured")
+
+    client = getattr(app.state, "openai_client", None)
+    if client is None:
+        # Key was configured after startup; create the shared client lazily
+        client = create_openai_client()
+        app.state.openai_client = client
+    return client
+
+
+def get_openai_client(request: Request) -> AsyncOpenAI:
+    """Dependency returning the app-scoped AsyncOpenAI client."""
+    return get_app_openai_client(request.app)
@@ -0,0 +1,258 @@
+"""Cost-weighted token-bucket rate limiting, keyed by user.
+
+Each client has a bucket of ``RATE_LIMIT`` tokens (e.g. ``300/minute``)
+that refills continuously. Requests are keyed by the authenticated Firebase
+uid, falling back to the client IP, and cost tokens by endpoint: one
+``/speech/practice`` costs as much as twenty ``/users/me``, and each item of
+a ``/speech/feedback/batch`` as much as one ``/speech/feedback`` (charged with
+``charge`` once the body is parsed). Buckets live in the shared store at
+``CACHE_URL`` (``redis://...``) so the limit holds across workers, or in a
+process-local LRU when no store is configured.
+
+Responses carry ``RateLimit-Limit``, ``RateLimit-Remaining``,
+``RateLimit-Reset`` and ``RateLimit-Policy``; rejected requests get a 429
+with ``Retry-After``. If the store is unreachable, requests are let through.
+"""
+import math
+import time
+from dataclasses import dataclass
+
+from starlette.exceptions import HTTPException
+from starlette.requests import HTTPConnection
+from starlette.responses import JSONResponse
+from starlette.websockets import WebSocketClose
+
+from app.core.auth import connection_token, verify_request_token
+from app.core.cache import LRUCache
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.core.metrics import RATE_LIMITED
+from app.core.security import get_client_ip
+
+logger = get_logger(__name__)
+
+KEY_PREFIX = "ratelimit:"
+RATE_PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+# Tokens per request by (method, path below /api/v1); anything else costs 1
+ENDPOINT_COSTS = {
+    ("POST", "/speech/practice"): 20,
+    ("POST", "/speech/transcribe"): 10,
+    ("POST", "/speech/feedback"): 4,
+    ("POST", "/speech/feedback/stream"): 4,
+    ("POST", "/speech/feedback/batch"): 4,  # First item; the endpoint charges the others
+    ("GET", "/speech/practice/ws"): 20,  # WebSocket handshake
+}
+RATE_LIMIT_HEADERS = ["RateLimit-Limit", "RateLimit-Remaining", "RateLimit-Reset", "RateLimit-Policy"]
+
+
+def parse_rate(rate: str) -> tuple[int, int]:
+    """``"300/minute"`` -> ``(300, 60)``: bucket capacity and seconds to refill it."""
+    amount, _, period = rate.partition("/")
+    return int(amount), RATE_PERIODS[period.strip().lower().rstrip("s")]
+
+
+def endpoint_cost(method: str, path: str) -> int:
+    return ENDPOINT_COSTS.get((method, path.rstrip("/")), 1)
+
+
+@dataclass
+class RateLimitResult:
+    allowed: bool
+    limit: int
+    remaining: float  # Tokens left in the bucket
+    refill_rate: float  # Tokens per second
+    cost: int
+    period: int
+
+    @property
+    def reset_seconds(self) -> int:
+        """Seconds until the bucket is full again."""
+        return math.ceil((self.limit - self.remaining) / self.refill_rate)
+
+    @property
+    def retry_after(self) -> int:
+        """Seconds until this request's cost is available."""
+        return max(1, math.ceil((self.cost - self.remaining) / self.refill_rate))
+
+    def headers(self) -> dict[str, str]:
+        return {
+            "RateLimit-Limit": str(self.limit),
+            "RateLimit-Remaining": str(int(self.remaining)),
+            "RateLimit-Reset": str(self.reset_seconds),
+            "RateLimit-Policy": f"{self.limit};w={self.period}",
+        }
+
+
+class MemoryBucketStore:
+    """Process-local buckets; the stand-in when no shared store is configured."""
+
+    def __init__(self, max_entries: int):
+        self.lru = LRUCache(max_entries=max_entries)
+
+    async def take(self, key: str, cost: int, capacity: int, rate: float) -> tuple[bool, float]:
+        """Refill the bucket, then take ``cost`` tokens if available; returns (allowed, tokens left)."""
+        now = time.monotonic()
+        tokens, updated = self.lru.get(key) or (capacity, now)
+        tokens = min(capacity, tokens + (now - updated) * rate)
+        allowed = tokens >= cost
+        if allowed:
+            tokens -= cost
+        # A bucket that has refilled completely is the same as no bucket
+        self.lru.set(key, (tokens, now), ttl_seconds=max(1.0, (capacity - tokens) / rate))
+        return allowed, tokens
+
+    async def clear(self) -> None:
+        self.lru.clear()
+
+
+# Refill and take atomically on the Redis server, using its clock
+TOKEN_BUCKET_SCRIPT = """
+local cost = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local rate = tonumber(ARGV[3])
+local time = redis.call('TIME')
+local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local tokens = tonumber(state[1]) or capacity
+local updated = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - updated) * rate)
+local allowed = 0
+if tokens >= cost then
+    tokens = tokens - cost
+    allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.max(1000, math.ceil((capacity - tokens) / rate * 1000)))
+return {allowed, tostring(tokens)}
+"""
+
+
+class RedisBucketStore:
+    """Buckets shared between workers through Redis. Requires the optional ``redis`` package."""
+
+    def __init__(self, url: str):
+        import redis.asyncio as redis
+
+        self.client = redis.from_url(url)
+        self.script = self.client.register_script(TOKEN_BUCKET_SCRIPT)
+
+    async def take(self, key: str, cost: int, capacity: int, rate: float) -> tuple[bool, float]:
+        allowed, tokens = await self.script(keys=[key], args=[cost, capacity, rate])
+        return bool(allowed), float(tokens)
+
+    async def clear(self) -> None:
+        async for key in self.client.scan_iter(match=f"{KEY_PREFIX}*"):
+            await self.client.delete(key)
+
+
+def create_bucket_store(url: str | None) -> "MemoryBucketStore | RedisBucketStore":
+    """``redis://...`` for the shared store, else process-local buckets."""
+    if url and url.startswith(("redis://", "rediss://")):
+        return RedisBucketStore(url)
+    return MemoryBucketStore(max_entries=settings.rate_limit_max_keys)
+
+
+class RateLimiter:
+    def __init__(self, store):
+        self.store = store
+
+    async def take(self, key: str, cost: int) -> RateLimitResult:
+        capacity, period = parse_rate(settings.rate_limit)
+        rate = capacity / period
+        allowed, tokens = await self.store.take(KEY_PREFIX + key, cost, capacity, rate)
+        return RateLimitResult(allowed, capacity, tokens, rate, cost, period)
+
+
+rate_limiter = RateLimiter(create_bucket_store(settings.cache_url))
+
+
+async def client_key(request: HTTPConnection) -> str:
+    """``user:<uid>`` for a valid bearer token, else ``ip:<address>``."""
+    token = connection_token(request)
+    if token:
+        try:
+            uid = (await verify_request_token(request, token)).get("uid")
+        except Exception:
+            uid = None
+        if uid:
+            return f"user:{uid}"
+    return f"ip:{get_client_ip(request)}"
+
+
+async def charge(request: HTTPConnection, cost: int) -> None:
+    """Charge ``cost`` more tokens to the request's client.
+
+    For endpoints whose cost depends on the body, which the middleware
+    charges before it is read. Raises a 429 ``HTTPException`` when the
+    bucket is short.
+    """
+    if not settings.rate_limit_enabled or cost <= 0:
+        return
+    key = request.scope.get("state", {}).get("rate_limit_key") or await client_key(request)
+    try:
+        result = await rate_limiter.take(key, cost)
+    except Exception:
+        logger.warning("Rate limit store unavailable, allowing request", exc_info=True)
+        return
+    if not result.allowed:
+        RATE_LIMITED.labels(key.split(":", 1)[0]).inc()
+        raise HTTPException(
+            status_code=429,
+            detail="Rate limit exceeded",
+            headers={**result.headers(), "Retry-After": str(result.retry_after)},
+        )
+
+
+class RateLimitMiddleware:
+    """Charge each API request to its client's bucket before the body is read.
+
+    WebSockets are charged once, at the handshake; a rejected one is closed
+    with 1008 before it is accepted.
+    """
+
+    def __init__(self, app, prefix: str = "/api/v1"):
+        self.app = app
+        self.prefix = prefix
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] not in ("http", "websocket")
+            or not settings.rate_limit_enabled
+            or not scope["path"].startswith(self.prefix)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        request = HTTPConnection(scope)
+        key = await client_key(request)
+        scope.setdefault("state", {})["rate_limit_key"] = key  # For charge()
+        cost = endpoint_cost(scope.get("method", "GET"), scope["path"][len(self.prefix):])
+        try:
+            result = await rate_limiter.take(key, cost)
+        except Exception:
+            logger.warning("Rate limit store unavailable, allowing request", exc_info=True)
+            await self.app(scope, receive, send)
+            return
+
+        headers = result.headers()
+        if not result.allowed:
+            RATE_LIMITED.labels(key.split(":", 1)[0]).inc()
+            if scope["type"] == "websocket":
+                await WebSocketClose(code=1008, reason="Rate limit exceeded")(scope, receive, send)
+                return
+            response = JSONResponse(
+                {"detail": "Rate limit exceeded"},
+                status_code=429,
+                headers={**headers, "Retry-After": str(result.retry_after)},
+            )
+            await response(scope, receive, send)
+            return
+
+        header_pairs = [(name.lower().encode("latin-1"), value.encode("latin-1")) for name, value in headers.items()]
+
+        async def send_wrapper(message):
+            if message["type"] in ("http.response.start", "websocket.accept"):
+                message["headers"] = [*message.get("headers", ()), *header_pairs]
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
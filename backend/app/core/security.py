@@ -1,7 +1,5 @@
 """Security middleware and utilities."""
 from fastapi import Request
-from slowapi import Limiter
-from slowapi.util import get_remote_address
 
 from app.core.config import settings
 
@@ -20,11 +18,7 @@ def get_client_ip(request: Request) -> str:
         return real_ip
     
     # Fall back to direct connection IP
-    return get_remote_address(request)
-
-
-# Rate limiter instance
-limiter = Limiter(key_func=get_client_ip)
+    return request.client.host if request.client else "127.0.0.1"
 
 
 # Security headers for responses
@@ -36,3 +30,9 @@ SECURITY_HEADERS = {
     "Referrer-Policy": "strict-origin-when-cross-origin",
     "Permissions-Policy": "geolocation=(), microphone=(self), camera=()",
 }
+
+# Same headers as raw ASGI (name, value) pairs, for the request middleware
+SECURITY_HEADER_PAIRS = [
+    (name.lower().encode("latin-1"), value.encode("latin-1"))
+    for name, value in SECURITY_HEADERS.items()
+]
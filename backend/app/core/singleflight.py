@@ -0,0 +1,51 @@
+"""Single-flight coalescing of identical in-flight upstream calls.
+
+When a flaky client retries, the same audio or text can arrive while the
+first upstream call is still running. ``SingleFlight.do`` lets every
+concurrent caller with the same key share one call, and its result or error.
+"""
+import asyncio
+from typing import Any, Awaitable, Callable
+
+
+class SingleFlight:
+    """Per-process registry of in-flight calls keyed by content hash and model."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._tasks: dict[str, asyncio.Task] = {}
+        self.calls = 0
+        self.coalesced = 0
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Run ``fn()`` unless an identical call is in flight, then await that one.
+
+        The call runs in its own task and is shielded from each caller, so a
+        disconnecting client does not cancel the work shared with the others.
+        """
+        task = self._tasks.get(key)
+        if task is None:
+            self.calls += 1
+            task = asyncio.create_task(fn())
+            self._tasks[key] = task
+            task.add_done_callback(lambda done: self._finish(key, done))
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    def _finish(self, key: str, task: asyncio.Task) -> None:
+        if self._tasks.get(key) is task:
+            del self._tasks[key]
+        if not task.cancelled():
+            task.exception()  # Mark retrieved when every caller went away
+
+    def stats(self) -> dict:
+        return {
+            "calls": self.calls,
+            "coalesced": self.coalesced,
+            "in_flight": len(self._tasks),
+        }
+
+
+transcription_flights = SingleFlight("whisper")
+feedback_flights = SingleFlight("chat")
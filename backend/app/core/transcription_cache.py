@@ -0,0 +1,147 @@
+"""Content-addressed transcription cache.
+
+Identical uploads (same audio bytes and Whisper model) are served from a
+bounded in-memory LRU tier, falling back to the ``transcription_cache`` table
+so results survive restarts and are shared between workers.
+
+The table is read and written in short sessions of the cache's own, never on
+the request's session: a request must not hold a pooled connection open in a
+transaction while Whisper runs.
+"""
+import hashlib
+import json
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import delete, select
+
+from app.core.cache import LRUCache
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.db import models
+from app.db.session import AsyncSessionLocal
+
+logger = get_logger(__name__)
+
+# Run the table pruning pass once every N writes
+PRUNE_EVERY = 100
+
+
+def make_key(content_sha256: str, model: str | None = None) -> str:
+    """Key a recording (by the sha256 of its bytes) to the model that transcribes it."""
+    return hashlib.sha256(f"{model or settings.whisper_model}\0{content_sha256}".encode()).hexdigest()
+
+
+class TranscriptionCache:
+    """Two-tier (memory + database) cache of Whisper results."""
+
+    def __init__(self, max_entries: int, ttl_seconds: int, max_rows: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_rows = max_rows
+        self.memory = LRUCache(max_entries=max_entries, ttl_seconds=ttl_seconds)
+        self.session_factory = AsyncSessionLocal
+        self.db_hits = 0
+        self.misses = 0
+        self._writes = 0
+
+    async def get(self, key: str) -> dict | None:
+        """Look up a transcription by key, promoting database hits to memory."""
+        cached = self.memory.get(key)
+        if cached is not None:
+            return cached
+
+        now = datetime.now(timezone.utc)
+        try:
+            async with self.session_factory() as db:
+                row = (await db.execute(
+                    select(models.TranscriptionCacheEntry).where(
+                        models.TranscriptionCacheEntry.key == key,
+                        models.TranscriptionCacheEntry.expires_at > now,
+                    )
+                )).scalar_one_or_none()
+        except Exception:
+            # As in set(): a cache failure is a miss, not a failed request
+            logger.warning("Failed to read transcription cache entry", exc_info=True)
+            row = None
+        if row is None:
+            self.misses += 1
+            return None
+
+        self.db_hits += 1
+        result = {
+            "text": row.text,
+            "language": row.language,
+            "duration": row.duration,
+            "segments": json.loads(row.segments) if row.segments else None,
+        }
+        self.memory.set(key, result)
+        return result
+
+    async def set(self, key: str, result: dict, model: str | None = None) -> None:
+        """Store a transcription in both tiers."""
+        self.memory.set(key, result)
+        try:
+            async with self.session_factory() as db:
+                await db.merge(models.TranscriptionCacheEntry(
+                    key=key,
+                    model=model or settings.whisper_model,
+                    text=result["text"],
+                    language=result.get("language"),
+                    duration=result.get("duration"),
+                    segments=json.dumps(result["segments"]) if result.get("segments") else None,
+                    expires_at=datetime.now(timezone.utc) + timedelta(seconds=self.ttl_seconds),
+                ))
+                await db.commit()
+        except Exception:
+            # The cache is an optimization; never fail the request over it
+            logger.warning("Failed to persist transcription cache entry", exc_info=True)
+            return
+
+        self._writes += 1
+        if self._writes % PRUNE_EVERY == 0:
+            await self.prune()
+
+    async def prune(self) -> int:
+        """Delete expired rows and trim the table to ``max_rows`` (oldest first)."""
+        table = models.TranscriptionCacheEntry
+        async with self.session_factory() as db:
+            removed = (await db.execute(
+                delete(table).where(table.expires_at <= datetime.now(timezone.utc))
+            )).rowcount or 0
+
+            overflow_cutoff = (await db.execute(
+                select(table.expires_at)
+                .order_by(table.expires_at.desc())
+                .offset(self.max_rows)
+                .limit(1)
+            )).scalar_one_or_none()
+            if overflow_cutoff is not None:
+                removed += (await db.execute(
+                    delete(table).where(table.expires_at <= overflow_cutoff)
+                )).rowcount or 0
+
+            await db.commit()
+        return removed
+
+    async def clear(self, persistent: bool = False) -> None:
+        self.memory.clear()
+        if persistent:
+            async with self.session_factory() as db:
+                await db.execute(delete(models.TranscriptionCacheEntry))
+                await db.commit()
+
+    def stats(self) -> dict:
+        memory = self.memory.stats()
+        return {
+            "memory_entries": memory["entries"],
+            "memory_hits": memory["hits"],
+            "db_hits": self.db_hits,
+            "misses": self.misses,
+            "evictions": memory["evictions"],
+        }
+
+
+transcription_cache = TranscriptionCache(
+    max_entries=settings.transcription_cache_max_entries,
+    ttl_seconds=settings.transcription_cache_ttl_seconds,
+    max_rows=settings.transcription_cache_max_rows,
+)
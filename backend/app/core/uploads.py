@@ -0,0 +1,171 @@
+"""Size-capped, streaming ingestion of audio uploads.
+
+Uploads are kept in spooled temporary files (memory up to
+``UPLOAD_SPOOL_MAX_MEMORY`` bytes, disk beyond) and handed to the OpenAI
+client as file handles, so a recording is never held in memory as a single
+``bytes`` object. The content hash used for caching is computed while
+streaming.
+"""
+import hashlib
+from tempfile import SpooledTemporaryFile
+
+from fastapi import HTTPException, Request, UploadFile
+from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute
+from starlette.datastructures import Headers
+
+from app.core.config import settings
+
+CHUNK_SIZE = 64 * 1024
+# Allowance for multipart boundaries and part headers on top of the audio
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+
+# File extension Whisper uses to detect the format of a raw request body
+AUDIO_EXTENSIONS = {
+    "audio/mpeg": "mp3",
+    "audio/wav": "wav",
+    "audio/x-wav": "wav",
+    "audio/webm": "webm",
+    "audio/mp4": "mp4",
+    "audio/m4a": "m4a",
+    "audio/x-m4a": "m4a",
+    "audio/ogg": "ogg",
+}
+
+
+def _too_large() -> HTTPException:
+    return HTTPException(
+        status_code=413,
+        detail=f"Audio file too large (max {settings.max_upload_bytes} bytes)"
+    )
+
+
+class AudioUpload:
+    """An uploaded recording: spooled file handle, size and content hash."""
+
+    def __init__(self, upload: UploadFile, size: int, sha256: str):
+        self.upload = upload
+        self.size = size
+        self.sha256 = sha256
+
+    @property
+    def filename(self) -> str:
+        return self.upload.filename
+
+    @property
+    def content_type(self) -> str | None:
+        return self.upload.content_type
+
+    @property
+    def file(self):
+        """Underlying file object, rewound for a fresh read."""
+        self.upload.file.seek(0)
+        return self.upload.file
+
+    async def read(self) -> bytes:
+        """Whole content as bytes (only for callers that must persist it)."""
+        await self.upload.seek(0)
+        data = await self.upload.read()
+        await self.upload.seek(0)
+        return data
+
+    async def close(self) -> None:
+        await self.upload.close()
+
+    @classmethod
+    async def from_upload_file(cls, upload: UploadFile) -> "AudioUpload":
+        """Wrap a multipart file (already spooled by the form parser)."""
+        digest = hashlib.sha256()
+        size = 0
+        await upload.seek(0)
+        while chunk := await upload.read(CHUNK_SIZE):
+            size += len(chunk)
+            if size > settings.max_upload_bytes:
+                raise _too_large()
+            digest.update(chunk)
+        await upload.seek(0)
+        return cls(upload, size, digest.hexdigest())
+
+    @classmethod
+    async def from_request(cls, request: Request, filename: str | None = None) -> "AudioUpload":
+        """Stream a raw ``audio/*`` request body into a spooled file."""
+        content_type = request.headers.get("content-type", "").split(";")[0].strip()
+        if not filename:
+            filename = f"audio.{AUDIO_EXTENSIONS.get(content_type, 'bin')}"
+
+        upload = UploadFile(
+            file=SpooledTemporaryFile(max_size=settings.upload_spool_max_memory),
+            filename=filename,
+            headers=Headers({"content-type": content_type}),
+        )
+        digest = hashlib.sha256()
+        size = 0
+        try:
+            async for chunk in request.stream():
+                size += len(chunk)
+                if size > settings.max_upload_bytes:
+                    raise _too_large()
+                digest.update(chunk)
+                await upload.write(chunk)
+        except BaseException:
+            await upload.close()
+            raise
+        await upload.seek(0)
+        return cls(upload, size, digest.hexdigest())
+
+    @classmethod
+    async def from_bytes(cls, filename: str, data: bytes) -> "AudioUpload":
+        upload = UploadFile(
+            file=SpooledTemporaryFile(max_size=settings.upload_spool_max_memory),
+            filename=filename,
+        )
+        await upload.write(data)
+        await upload.seek(0)
+        return cls(upload, len(data), hashlib.sha256(data).hexdigest())
+
+
+async def receive_audio(request: Request, file: UploadFile | None) -> AudioUpload:
+    """Accept either a multipart ``file`` field or a raw ``audio/*`` body."""
+    if file is not None:
+        if not file.filename:
+            raise HTTPException(status_code=400, detail="No file uploaded")
+        return await AudioUpload.from_upload_file(file)
+
+    if request.headers.get("content-type", "").startswith("audio/"):
+        return await AudioUpload.from_request(request, request.query_params.get("filename"))
+
+    raise HTTPException(status_code=400, detail="No file uploaded")
+
+
+class UploadLimitRoute(APIRoute):
+    """Route class rejecting bodies over the upload cap before they are read.
+
+    A declared ``Content-Length`` over the cap is refused outright; without
+    one (chunked uploads), the body stream itself is counted, so the form
+    parser stops spooling as soon as the cap is passed.
+    """
+
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+
+        async def limited_handler(request: Request):
+            limit = settings.max_upload_bytes + MULTIPART_OVERHEAD_BYTES
+            length = request.headers.get("content-length")
+            if length and length.isdigit() and int(length) > limit:
+                exc = _too_large()
+                return JSONResponse(status_code=exc.status_code, content={"detail": exc.detail})
+
+            received = 0
+
+            async def limited_receive():
+                nonlocal received
+                message = await request.receive()
+                if message["type"] == "http.request":
+                    received += len(message.get("body", b""))
+                    if received > limit:
+                        raise _too_large()
+                return message
+
+            return await handler(Request(request.scope, limited_receive, request._send))
+
+        return limited_handler
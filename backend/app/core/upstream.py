@@ -0,0 +1,181 @@
+"""Deadlines, jittered retries and hedging for upstream AI calls.
+
+Each request gets a time budget (``REQUEST_DEADLINE_SECONDS``) carried in a
+context variable; multi-step flows hand a share of it to each step. Within
+the budget, ``call_upstream`` retries retryable OpenAI errors with
+full-jitter exponential backoff and, when ``HEDGING_ENABLED`` is set, fires a
+second identical request once the first has been running longer than the
+observed p95 latency, keeping whichever answers first. Every attempt holds
+a slot of the upstream's adaptive concurrency limit and passes its circuit
+breaker (``app.core.concurrency``).
+"""
+import asyncio
+import random
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Iterator
+
+from openai import APIConnectionError, InternalServerError, RateLimitError
+
+from app.core.concurrency import get_breaker, get_limiter
+from app.core.config import settings
+from app.core.metrics import UPSTREAM_DEADLINE_EXCEEDED, UPSTREAM_HEDGES, UPSTREAM_RETRIES
+
+# Upstream errors worth another attempt (APITimeoutError is an APIConnectionError)
+RETRYABLE_ERRORS = (APIConnectionError, RateLimitError, InternalServerError)
+# Recent successful latencies kept per upstream for the hedging threshold
+LATENCY_WINDOW = 200
+
+_deadline: ContextVar[float | None] = ContextVar("upstream_deadline", default=None)
+
+
+class DeadlineExceeded(Exception):
+    """The request's time budget for upstream calls ran out."""
+
+
+@contextmanager
+def deadline(seconds: float | None = None, share: float = 1.0) -> Iterator[None]:
+    """Bound upstream calls in this block.
+
+    The budget is ``share`` of the time left on the enclosing deadline, or of
+    ``seconds`` (default ``REQUEST_DEADLINE_SECONDS``) when there is none; it
+    never extends an enclosing deadline.
+    """
+    now = time.monotonic()
+    parent = _deadline.get()
+    if parent is not None:
+        budget = parent - now
+        if seconds is not None:
+            budget = min(budget, seconds)
+    else:
+        budget = seconds if seconds is not None else settings.request_deadline_seconds
+    token = _deadline.set(now + max(0.0, budget) * share)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining() -> float:
+    """Seconds left on the current deadline (a full request budget if none is set)."""
+    end = _deadline.get()
+    if end is None:
+        return settings.request_deadline_seconds
+    return end - time.monotonic()
+
+
+class LatencyTracker:
+    """Sliding window of successful call latencies, for the hedging threshold."""
+
+    def __init__(self, size: int = LATENCY_WINDOW):
+        self.samples: deque[float] = deque(maxlen=size)
+
+    def observe(self, seconds: float) -> None:
+        self.samples.append(seconds)
+
+    def quantile(self, q: float) -> float | None:
+        if len(self.samples) < settings.hedge_min_samples:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+latencies: dict[str, LatencyTracker] = {}
+
+
+async def _guarded(upstream: str, call: Callable[[], Awaitable[Any]], scope: asyncio.Timeout) -> Any:
+    """One upstream request, through the circuit breaker and concurrency limiter.
+
+    ``scope`` is the deadline's timeout: a call it cuts off counts as a
+    failure, like an ``APITimeoutError``. Other cancellations (a losing
+    hedge, a client that went away) say nothing about the upstream.
+    """
+    breaker = get_breaker(upstream)
+    probe = breaker.allow()
+    ok = None
+    try:
+        async with get_limiter(upstream).slot() as outcome:
+            try:
+                result = await call()
+            except RETRYABLE_ERRORS:
+                outcome.overloaded = True
+                ok = False
+                raise
+            except asyncio.CancelledError:
+                if scope.expired():
+                    outcome.overloaded = True
+                    ok = False
+                raise
+            except Exception:
+                ok = True  # Upstream answered; the request itself was bad
+                raise
+            outcome.ok = ok = True
+            return result
+    finally:
+        breaker.record(ok, probe)
+
+
+async def _attempt(upstream: str, call: Callable[[], Awaitable[Any]], hedge: bool, scope: asyncio.Timeout) -> Any:
+    tracker = latencies.setdefault(upstream, LatencyTracker())
+    hedge_after = tracker.quantile(settings.hedge_quantile) if hedge and settings.hedging_enabled else None
+    start = time.monotonic()
+
+    if hedge_after is None:
+        result = await _guarded(upstream, call, scope)
+        tracker.observe(time.monotonic() - start)
+        return result
+
+    primary = asyncio.ensure_future(_guarded(upstream, call, scope))
+    tasks = [primary]
+    try:
+        done, _ = await asyncio.wait(tasks, timeout=hedge_after)
+        if not done:
+            UPSTREAM_HEDGES.labels(upstream, "fired").inc()
+            tasks.append(asyncio.ensure_future(_guarded(upstream, call, scope)))
+
+        pending = set(tasks)
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    if task is not primary:
+                        UPSTREAM_HEDGES.labels(upstream, "won").inc()
+                    tracker.observe(time.monotonic() - start)
+                    return task.result()
+        raise primary.exception()
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+async def call_upstream(upstream: str, call: Callable[[], Awaitable[Any]], *, hedge: bool = True) -> Any:
+    """Run ``call`` (one upstream request per invocation) within the current deadline.
+
+    Retryable errors are retried up to ``UPSTREAM_MAX_RETRIES`` times with
+    full-jitter backoff, as long as the budget allows. ``call`` must be safe
+    to run concurrently with itself when ``hedge`` is set. Raises
+    ``DeadlineExceeded`` when the budget runs out (waiting for a concurrency
+    slot included) and ``UpstreamUnavailable`` while the circuit is open.
+    """
+    end = time.monotonic() + remaining()
+    attempt = 0
+    while True:
+        budget = end - time.monotonic()
+        try:
+            if budget <= 0:
+                raise TimeoutError
+            async with asyncio.timeout(budget) as scope:
+                return await _attempt(upstream, call, hedge, scope)
+        except TimeoutError:
+            UPSTREAM_DEADLINE_EXCEEDED.labels(upstream).inc()
+            raise DeadlineExceeded(f"{upstream} call exceeded the request deadline") from None
+        except RETRYABLE_ERRORS:
+            backoff = min(settings.upstream_retry_max_delay, settings.upstream_retry_base_delay * 2 ** attempt)
+            delay = random.uniform(0, backoff)
+            if attempt >= settings.upstream_max_retries or time.monotonic() + delay >= end:
+                raise
+            attempt += 1
+            UPSTREAM_RETRIES.labels(upstream).inc()
+            await asyncio.sleep(delay)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, Float, Index, LargeBinary
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.db.session import Base
@@ -15,6 +15,7 @@ class User(Base):
     
     # Relationships
     practice_sessions = relationship("PracticeSession", back_populates="user")
+    stats = relationship("UserStats", back_populates="user", uselist=False)
 
 
 class PracticeSession(Base):
@@ -30,3 +31,57 @@ class PracticeSession(Base):
     
     # Relationships
     user = relationship("User", back_populates="practice_sessions")
+
+
+# Backs keyset pagination of a user's history (newest first)
+Index(
+    "ix_practice_sessions_user_created_id",
+    PracticeSession.user_id,
+    PracticeSession.created_at.desc(),
+    PracticeSession.id.desc(),
+)
+
+
+class UserStats(Base):
+    """Per-user rollup of practice sessions, maintained on every insert."""
+    __tablename__ = "user_stats"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    total_sessions = Column(Integer, nullable=False, default=0)
+    scored_sessions = Column(Integer, nullable=False, default=0)  # AVG ignores NULL scores
+    score_sum = Column(Integer, nullable=False, default=0)
+    best_score = Column(Integer, nullable=True)
+    first_session = Column(DateTime(timezone=True), nullable=True)
+    last_session = Column(DateTime(timezone=True), nullable=True)
+
+    # Relationships
+    user = relationship("User", back_populates="stats")
+
+
+class TranscriptionCacheEntry(Base):
+    """Persistent tier of the content-addressed transcription cache."""
+    __tablename__ = "transcription_cache"
+
+    key = Column(String(64), primary_key=True)  # sha256 of model + audio bytes
+    model = Column(String, nullable=False)
+    text = Column(Text, nullable=False)
+    language = Column(String, nullable=True)
+    duration = Column(Float, nullable=True)
+    segments = Column(Text, nullable=True)  # JSON-encoded list of {start, end, text}
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    expires_at = Column(DateTime(timezone=True), index=True, nullable=False)
+
+
+class PracticeJob(Base):
+    """A /speech/practice request accepted for background processing."""
+    __tablename__ = "practice_jobs"
+
+    id = Column(String(32), primary_key=True)  # uuid4 hex
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=True, index=True)
+    status = Column(String(16), nullable=False, index=True)  # pending | running | succeeded | failed
+    filename = Column(String, nullable=False)
+    audio = Column(LargeBinary, nullable=True)  # Cleared once the job finishes
+    result = Column(Text, nullable=True)  # JSON-encoded PracticeResponse
+    error = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -0,0 +1,40 @@
+"""Keyset (cursor) pagination over ``(created_at, id)``, newest first."""
+import base64
+import json
+from datetime import datetime
+
+from sqlalchemy import DateTime, and_, bindparam, func, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(created_at: datetime, id_: int) -> str:
+    """Opaque, URL-safe token for the position after ``(created_at, id)``."""
+    payload = json.dumps([created_at.isoformat(), id_]).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, id_ = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(created_at), int(id_)
+    except Exception as e:
+        raise InvalidCursor("Invalid pagination cursor") from e
+
+
+def before_cursor(db: AsyncSession, created_at_col, id_col, cursor: str):
+    """Condition selecting rows strictly after ``cursor`` in (created_at DESC, id DESC) order."""
+    created_at, id_ = decode_cursor(cursor)
+    value = bindparam("cursor_created_at", created_at, type_=DateTime(timezone=True))
+    if db.get_bind().dialect.name == "sqlite":
+        # SQLite keeps timestamps as text with and without microseconds;
+        # compare them as Julian days so equal instants compare equal
+        created_at_col, value = func.julianday(created_at_col), func.julianday(value)
+    return or_(
+        created_at_col < value,
+        and_(created_at_col == value, id_col < id_),
+    )
@@ -1,6 +1,10 @@
 from sqlalchemy import create_engine
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from app.core.config import settings
+from app.core.metrics import DB_POOL_WAIT, instrument_engine
 
 
 # Get the correct database URL (handles postgres:// -> postgresql://)
@@ -11,7 +15,7 @@ connect_args = {}
 if database_url.startswith("sqlite"):
     connect_args = {"check_same_thread": False}
 
-# Create engine with appropriate settings
+# Synchronous engine, kept for Alembic migrations and maintenance scripts
 engine = create_engine(
     database_url, 
     connect_args=connect_args,
@@ -22,10 +26,52 @@ engine = create_engine(
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
 Base = declarative_base()
 
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """Queue pool recording how long each checkout waits for a connection."""
 
-def get_db():
-    db = SessionLocal()
-    try:
+    _sqla_logger_namespace = "sqlalchemy.pool.impl.AsyncAdaptedQueuePool"  # Keep SQLAlchemy's log levels
+
+    def _do_get(self):
+        with DB_POOL_WAIT.time():
+            return super()._do_get()
+
+
+# Async engine used by the API (asyncpg for PostgreSQL, aiosqlite for SQLite)
+async_engine = create_async_engine(
+    settings.async_database_url,
+    poolclass=InstrumentedPool,
+    pool_pre_ping=True,
+    pool_recycle=300,
+)
+instrument_engine(async_engine.sync_engine)
+
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False,  # Objects stay readable after commit without a reload
+)
+
+
+async def get_db():
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
+
+
+def get_session_factory() -> async_sessionmaker[AsyncSession]:
+    """Dependency for endpoints that outlive a request-scoped session (streams, WebSockets).
+
+    They open a short session per unit of work instead of holding ``get_db``'s
+    connection for as long as the client stays connected.
+    """
+    return AsyncSessionLocal
+
+
+def dialect_insert(db: AsyncSession):
+    """Dialect-specific ``insert()`` supporting ``ON CONFLICT`` clauses."""
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        return postgresql.insert
+    if dialect == "sqlite":
+        return sqlite.insert
+    raise NotImplementedError(f"Upserts are not supported on {dialect}")
@@ -0,0 +1,166 @@
+"""Incrementally maintained per-user statistics (the ``user_stats`` table).
+
+``record_session`` (``record_sessions`` for a batch) is called in the same
+transaction as each practice session insert, so reading a user's stats is a
+primary-key lookup. A user's row is seeded from their existing history the
+first time it is written, so sessions saved before the rollup existed count.
+``rebuild_user_stats`` recomputes rows from ``practice_sessions``; run it as
+a backfill with ``python -m app.db.stats [--user-id N]``.
+"""
+import argparse
+import asyncio
+
+from sqlalchemy import case, delete, func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db import models
+from app.db.session import dialect_insert
+
+
+async def record_session(db: AsyncSession, user_id: int, score: int | None) -> None:
+    """Fold one new practice session into the user's rollup row (no commit)."""
+    await record_sessions(db, [(user_id, score)])
+
+
+async def record_sessions(db: AsyncSession, sessions: list[tuple[int, int | None]]) -> None:
+    """Fold new ``(user_id, score)`` sessions into their users' rollup rows (no commit).
+
+    One multi-row upsert per call, with one row per user. Call it before the
+    sessions themselves are inserted: users without a row are first seeded
+    from ``practice_sessions``, which must not include the new sessions yet.
+    """
+    rollups: dict[int, dict] = {}
+    for user_id, score in sessions:
+        rollup = rollups.setdefault(user_id, {
+            "user_id": user_id,
+            "total_sessions": 0,
+            "scored_sessions": 0,
+            "score_sum": 0,
+            "best_score": None,
+            "first_session": func.now(),
+            "last_session": func.now(),
+        })
+        rollup["total_sessions"] += 1
+        if score is not None:
+            rollup["scored_sessions"] += 1
+            rollup["score_sum"] += score
+            if rollup["best_score"] is None or score > rollup["best_score"]:
+                rollup["best_score"] = score
+    if not rollups:
+        return
+    await seed_user_stats(db, list(rollups))
+
+    table = models.UserStats.__table__
+    stmt = dialect_insert(db)(table).values(list(rollups.values()))
+    new = stmt.excluded
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.user_id],
+        set_={
+            "total_sessions": table.c.total_sessions + new.total_sessions,
+            "scored_sessions": table.c.scored_sessions + new.scored_sessions,
+            "score_sum": table.c.score_sum + new.score_sum,
+            # Written as CASE so NULLs behave the same on every backend
+            "best_score": case(
+                (table.c.best_score.is_(None), new.best_score),
+                (new.best_score > table.c.best_score, new.best_score),
+                else_=table.c.best_score,
+            ),
+            "first_session": func.coalesce(table.c.first_session, new.first_session),
+            "last_session": new.last_session,
+        },
+    )
+    await db.execute(stmt)
+
+
+def _aggregate_sessions():
+    sessions = models.PracticeSession
+    return (
+        select(
+            sessions.user_id,
+            func.count(sessions.id),
+            func.count(sessions.score),
+            func.coalesce(func.sum(sessions.score), 0),
+            func.max(sessions.score),
+            func.min(sessions.created_at),
+            func.max(sessions.created_at),
+        )
+        .where(sessions.user_id.is_not(None))
+        .group_by(sessions.user_id)
+    )
+
+
+STATS_COLUMNS = [
+    "user_id",
+    "total_sessions",
+    "scored_sessions",
+    "score_sum",
+    "best_score",
+    "first_session",
+    "last_session",
+]
+
+
+async def seed_user_stats(db: AsyncSession, user_ids: list[int]) -> None:
+    """Create missing rollup rows from the users' existing sessions (no commit).
+
+    Rows that already exist are left alone, so concurrent seeds of the same
+    user are harmless.
+    """
+    table = models.UserStats.__table__
+    aggregate = _aggregate_sessions().where(
+        models.PracticeSession.user_id.in_(user_ids),
+        models.PracticeSession.user_id.not_in(
+            select(table.c.user_id).where(table.c.user_id.in_(user_ids))
+        ),
+    )
+    await db.execute(
+        dialect_insert(db)(table)
+        .from_select(STATS_COLUMNS, aggregate)
+        .on_conflict_do_nothing(index_elements=["user_id"])
+    )
+
+
+async def rebuild_user_stats(db: AsyncSession, user_id: int | None = None) -> None:
+    """Recompute rollup rows from ``practice_sessions`` (one user, or all)."""
+    aggregate = _aggregate_sessions()
+    clear = delete(models.UserStats)
+    if user_id is not None:
+        aggregate = aggregate.where(models.PracticeSession.user_id == user_id)
+        clear = clear.where(models.UserStats.user_id == user_id)
+
+    await db.execute(clear)
+    await db.execute(
+        insert(models.UserStats).from_select(STATS_COLUMNS, aggregate)
+    )
+
+
+async def get_or_rebuild_user_stats(db: AsyncSession, user_id: int) -> models.UserStats:
+    """Primary-key lookup; users without a rollup row are rebuilt once."""
+    stats = await db.get(models.UserStats, user_id)
+    if stats is None:
+        await rebuild_user_stats(db, user_id)
+        # Users without sessions get an empty row so this runs only once
+        await db.execute(
+            dialect_insert(db)(models.UserStats.__table__)
+            .values(user_id=user_id, total_sessions=0, scored_sessions=0, score_sum=0)
+            .on_conflict_do_nothing(index_elements=["user_id"])
+        )
+        await db.commit()
+        stats = await db.get(models.UserStats, user_id)
+    return stats
+
+
+async def _main(user_id: int | None) -> None:
+    from app.db.session import AsyncSessionLocal, async_engine
+
+    async with AsyncSessionLocal() as db:
+        await rebuild_user_stats(db, user_id)
+        await db.commit()
+    await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild the user_stats rollup table.")
+    parser.add_argument("--user-id", type=int, default=None, help="Only rebuild this user")
+    args = parser.parse_args()
+    asyncio.run(_main(args.user_id))
@@ -0,0 +1,84 @@
+"""User resolution: atomic upsert plus a per-process uid -> user cache.
+
+Most authenticated requests are answered from the cache and never touch the
+``users`` table. On a miss, a single ``INSERT ... ON CONFLICT ... RETURNING``
+statement both creates first-time users and fetches existing ones, which
+also makes concurrent first requests for the same uid safe.
+"""
+from sqlalchemy import func, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import LRUCache
+from app.core.config import settings
+from app.db import models
+from app.db.session import dialect_insert
+
+# uid -> (id, uid, email, name)
+user_cache = LRUCache(max_entries=settings.user_cache_max_entries)
+
+_USER_COLUMNS = (models.User.id, models.User.uid, models.User.email, models.User.name)
+
+
+def _to_user(row) -> models.User:
+    """Build a detached User from cached column values."""
+    id_, uid, email, name = row
+    return models.User(id=id_, uid=uid, email=email, name=name)
+
+
+def _profile_changed(cached, email: str | None, name: str | None) -> bool:
+    _, _, cached_email, cached_name = cached
+    return (email is not None and email != cached_email) or (name is not None and name != cached_name)
+
+
+async def upsert_user(db: AsyncSession, uid: str, email: str | None, name: str | None) -> tuple:
+    """Create or fetch the user row in one round trip, refreshing profile fields."""
+    table = models.User.__table__
+    insert = dialect_insert(db)
+    stmt = insert(table).values(uid=uid, email=email, name=name)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.uid],
+        set_={
+            "email": func.coalesce(stmt.excluded.email, table.c.email),
+            "name": func.coalesce(stmt.excluded.name, table.c.name),
+        },
+    ).returning(*[table.c[col.key] for col in _USER_COLUMNS])
+
+    try:
+        row = (await db.execute(stmt)).one()
+        await db.commit()
+    except IntegrityError:
+        # Email already taken by another account: keep the stored profile
+        await db.rollback()
+        stmt = insert(table).values(uid=uid).on_conflict_do_update(
+            index_elements=[table.c.uid],
+            set_={"uid": table.c.uid},
+        ).returning(*[table.c[col.key] for col in _USER_COLUMNS])
+        row = (await db.execute(stmt)).one()
+        await db.commit()
+    return tuple(row)
+
+
+async def resolve_user(db: AsyncSession, uid: str, email: str | None = None, name: str | None = None) -> models.User:
+    """Return the user for ``uid``, creating it on first sight."""
+    cached = user_cache.get(uid)
+    if cached is not None and not _profile_changed(cached, email, name):
+        return _to_user(cached)
+
+    row = await upsert_user(db, uid, email, name)
+    user_cache.set(uid, row)
+    return _to_user(row)
+
+
+async def find_user(db: AsyncSession, uid: str) -> models.User | None:
+    """Return the user for ``uid`` if it exists, without creating it."""
+    cached = user_cache.get(uid)
+    if cached is not None:
+        return _to_user(cached)
+
+    row = (await db.execute(select(*_USER_COLUMNS).where(models.User.uid == uid))).first()
+    if row is None:
+        return None
+    row = tuple(row)
+    user_cache.set(uid, row)
+    return _to_user(row)
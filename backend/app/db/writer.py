@@ -0,0 +1,116 @@
+"""Write-behind batching of practice session inserts.
+
+With ``SESSION_WRITE_BEHIND_ENABLED``, requests hand their ``PracticeSession``
+row to ``session_writer`` instead of committing it themselves. A single task
+collects rows from a bounded queue and writes up to
+``SESSION_WRITE_BATCH_SIZE`` of them (or whatever arrived within
+``SESSION_WRITE_FLUSH_MS``) with one multi-row ``INSERT ... RETURNING``, the
+matching ``user_stats`` upsert and one commit. Each caller gets its row's id
+back once the batch is committed.
+"""
+import asyncio
+
+from sqlalchemy import insert
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.core.metrics import DB_WRITE_BATCH_SIZE
+from app.db import models
+from app.db.session import AsyncSessionLocal
+from app.db.stats import record_sessions
+
+logger = get_logger(__name__)
+
+
+class SessionWriter:
+    def __init__(self, batch_size: int, flush_interval: float, max_pending: int):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.session_factory = AsyncSessionLocal
+        self._queue: asyncio.Queue | None = None
+        self._task: asyncio.Task | None = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    async def start(self) -> None:
+        self._queue = asyncio.Queue(maxsize=self.max_pending)
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Flush every row queued so far, then stop."""
+        if self._task is None:
+            return
+        await self._queue.put(None)
+        await self._task
+        self._task = None
+        self._queue = None
+
+    async def insert(self, values: dict) -> int:
+        """Queue a ``practice_sessions`` row and return its id once committed.
+
+        Waits for room when ``SESSION_WRITE_MAX_PENDING`` rows are queued.
+        """
+        if self._queue is None:
+            raise RuntimeError("Session writer is not running")
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((values, future))
+        # Shielded: a caller going away does not un-queue its row
+        return await asyncio.shield(future)
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            item = await self._queue.get()
+            if item is None:
+                break
+            batch = [item]
+            flush_at = loop.time() + self.flush_interval
+            while len(batch) < self.batch_size:
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), max(0.0, flush_at - loop.time()))
+                except TimeoutError:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+            await self._flush(batch)
+
+    async def _flush(self, batch: list[tuple[dict, asyncio.Future]]) -> None:
+        rows = [values for values, _ in batch]
+        table = models.PracticeSession.__table__
+        DB_WRITE_BATCH_SIZE.observe(len(rows))
+        try:
+            async with self.session_factory() as db:
+                # Before the insert, so first rollup rows are seeded from older sessions only
+                await record_sessions(
+                    db, [(row["user_id"], row["score"]) for row in rows if row["user_id"] is not None]
+                )
+                # One multi-row statement on PostgreSQL; SQLite runs it row by
+                # row (still in this one transaction) to keep ids in row order
+                result = await db.execute(
+                    insert(table).returning(table.c.id, sort_by_parameter_order=True), rows
+                )
+                ids = result.scalars().all()
+                await db.commit()
+        except Exception as e:
+            logger.exception(f"Failed to write {len(rows)} practice sessions")
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), session_id in zip(batch, ids):
+            if not future.done():
+                future.set_result(session_id)
+
+
+session_writer = SessionWriter(
+    batch_size=settings.session_write_batch_size,
+    flush_interval=settings.session_write_flush_ms / 1000,
+    max_pending=settings.session_write_max_pending,
+)
@@ -4,14 +4,19 @@ import logging
 from fastapi import FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
-from slowapi import _rate_limit_exceeded_handler
-from slowapi.errors import RateLimitExceeded
 
 from app.api.v1 import api_router
-from app.db.session import engine, Base
+from app.api.v1.routers.speech import practice_jobs
+from app.db.session import async_engine, Base
+from app.db.writer import session_writer
 from app.core.config import settings
 from app.core.logging import setup_logging, get_logger
-from app.core.security import limiter, SECURITY_HEADERS
+from app.core.openai_client import init_openai_client, close_openai_client
+from app.core.auth import start_certificate_refresher, stop_certificate_refresher
+from app.core.concurrency import upstream_status
+from app.core.metrics import render as render_metrics
+from app.core.middleware import RequestMiddleware
+from app.core.ratelimit import RATE_LIMIT_HEADERS, RateLimitMiddleware
 
 # Initialize Sentry for error tracking (production)
 if settings.sentry_dsn:
@@ -32,11 +37,22 @@ logger = get_logger(__name__)
 async def lifespan(app: FastAPI):
     # Startup
     logger.info(f"Starting FluentMind API in {settings.environment} mode")
-    Base.metadata.create_all(bind=engine)
+    async with async_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
     logger.info("Database tables initialized")
+    await init_openai_client(app)
+    cert_refresher = start_certificate_refresher()
+    if settings.session_write_behind_enabled:
+        await session_writer.start()
+    await practice_jobs.start(app)
     yield
     # Shutdown
     logger.info("Shutting down FluentMind API")
+    await practice_jobs.stop()
+    await session_writer.stop()  # Flush queued sessions before the engine goes away
+    await stop_certificate_refresher(cert_refresher)
+    await close_openai_client(app)
+    await async_engine.dispose()
 
 
 app = FastAPI(
@@ -48,9 +64,8 @@ app = FastAPI(
     redoc_url="/redoc" if not settings.is_production else None,
 )
 
-# Rate limiting
-app.state.limiter = limiter
-app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
+# Rate limiting (inside CORS, so 429s still carry CORS headers)
+app.add_middleware(RateLimitMiddleware, prefix="/api/v1")
 
 # CORS middleware
 app.add_middleware(
@@ -59,43 +74,11 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[*RATE_LIMIT_HEADERS, "Retry-After"],
 )
 
-
-@app.middleware("http")
-async def add_security_headers(request: Request, call_next):
-    """Add security headers to all responses."""
-    response: Response = await call_next(request)
-    
-    # Add security headers in production
-    if settings.is_production:
-        for header, value in SECURITY_HEADERS.items():
-            response.headers[header] = value
-    
-    return response
-
-
-@app.middleware("http")
-async def log_requests(request: Request, call_next):
-    """Log all incoming requests."""
-    import time
-    start_time = time.time()
-    
-    response = await call_next(request)
-    
-    process_time = time.time() - start_time
-    logger.info(
-        f"{request.method} {request.url.path}",
-        extra={
-            "method": request.method,
-            "path": request.url.path,
-            "status_code": response.status_code,
-            "process_time_ms": round(process_time * 1000, 2),
-            "client_ip": request.client.host if request.client else "unknown",
-        }
-    )
-    
-    return response
+# Security headers, request logging and metrics (outermost, so it times everything below)
+app.add_middleware(RequestMiddleware)
 
 
 @app.exception_handler(Exception)
@@ -130,10 +113,22 @@ async def root():
     }
 
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus scrape endpoint."""
+    if not settings.metrics_enabled:
+        return JSONResponse(status_code=404, content={"detail": "Not Found"})
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
+
+
 @app.get("/health")
 async def health():
     """Health check endpoint for load balancers and monitoring."""
+    upstreams = upstream_status()
+    degraded = any(status["circuit"] != "closed" for status in upstreams.values())
     return {
-        "status": "healthy",
+        "status": "degraded" if degraded else "healthy",
         "environment": settings.environment,
+        "upstreams": upstreams,
     }
@@ -23,6 +23,11 @@ class PracticeSessionRead(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
+class PracticeSessionPage(BaseModel):
+    items: list[PracticeSessionRead]
+    next_cursor: str | None  # None on the last page
+
+
 class UserStatsRead(BaseModel):
     total_sessions: int
     average_score: int
@@ -0,0 +1,97 @@
+"""Local OpenAI-compatible stand-in for benchmarks.
+
+Serves the two endpoints the API uses, ``/v1/audio/transcriptions`` and
+``/v1/chat/completions`` (plain and streamed), with configurable latency and
+jitter, so load tests exercise the real client, connection pool and
+serialization without calling OpenAI.
+"""
+import asyncio
+import json
+import random
+import time
+import uuid
+from dataclasses import dataclass
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+FEEDBACK = {
+    "corrected_text": "I went to the store yesterday.",
+    "feedback": "Good sentence; watch the past tense of 'go'.",
+    "pronunciation_tips": ["Stress the first syllable of 'yesterday'"],
+    "grammar_notes": ["'goed' -> 'went'"],
+    "score": 82,
+}
+
+
+@dataclass
+class Latency:
+    mean_ms: float
+    jitter_ms: float = 0.0
+
+    async def wait(self) -> None:
+        delay = random.gauss(self.mean_ms, self.jitter_ms) if self.jitter_ms else self.mean_ms
+        await asyncio.sleep(max(0.0, delay) / 1000)
+
+
+def create_app(whisper: Latency, chat: Latency) -> FastAPI:
+    app = FastAPI()
+    app.state.calls = {"whisper": 0, "chat": 0}
+
+    @app.post("/v1/audio/transcriptions")
+    async def transcriptions(request: Request):
+        form = await request.form()
+        audio = await form["file"].read()
+        app.state.calls["whisper"] += 1
+        call = app.state.calls["whisper"]
+        await whisper.wait()
+        return {
+            # Distinct text per call, so feedback for it is never a cache hit
+            "text": f"I goed to the store yesterday ({call}).",
+            "language": "english",
+            "duration": round(len(audio) / 16000, 2),
+            "segments": [],
+        }
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        app.state.calls["chat"] += 1
+        await chat.wait()
+        content = json.dumps(FEEDBACK)
+        completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+        created = int(time.time())
+        usage = {"prompt_tokens": 250, "completion_tokens": 90, "total_tokens": 340}
+
+        if body.get("stream"):
+            async def events():
+                for i in range(0, len(content), 16):
+                    chunk = {
+                        "id": completion_id, "object": "chat.completion.chunk", "created": created,
+                        "model": body["model"],
+                        "choices": [{"index": 0, "delta": {"content": content[i:i + 16]}, "finish_reason": None}],
+                    }
+                    yield f"data: {json.dumps(chunk)}\n\n"
+                final = {
+                    "id": completion_id, "object": "chat.completion.chunk", "created": created,
+                    "model": body["model"], "choices": [], "usage": usage,
+                }
+                yield f"data: {json.dumps(final)}\n\n"
+                yield "data: [DONE]\n\n"
+
+            return StreamingResponse(events(), media_type="text/event-stream")
+
+        return JSONResponse({
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": created,
+            "model": body["model"],
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+            }],
+            "usage": usage,
+        })
+
+    return app
@@ -0,0 +1,208 @@
+"""End-to-end load benchmark against local OpenAI and Firebase stand-ins.
+
+Starts the API and a fake OpenAI server (``benchmarks.fake_openai``) with
+uvicorn on loopback ports, replaces Firebase token verification with a fake
+verifier, then drives ``/speech/practice``, ``/speech/feedback``,
+``/users/me/stats`` and ``/users/me/sessions`` at a fixed concurrency and
+prints throughput and p50/p95/p99 latency per endpoint as JSON.
+
+Run from ``backend/``::
+
+    python -m benchmarks.load --requests 200 --concurrency 20 --whisper-latency-ms 800
+
+Everything shares one event loop, so absolute numbers are pessimistic;
+compare runs on the same machine. ``--fail-p95-ms`` exits non-zero when any
+scenario's p95 exceeds the budget, for use in CI.
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import socket
+import sys
+import tempfile
+import time
+from unittest.mock import patch
+
+import httpx
+import uvicorn
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def percentile(sorted_values: list[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    index = max(0, math.ceil(fraction * len(sorted_values)) - 1)
+    return sorted_values[index]
+
+
+def fake_verify_id_token(latency_ms: float):
+    """Firebase stand-in: ``bench-<uid>`` tokens are valid for an hour."""
+    def verify_id_token(token: str, check_revoked: bool = False) -> dict:
+        if not token.startswith("bench-"):
+            raise ValueError("Invalid token")
+        time.sleep(latency_ms / 1000)  # Runs in a worker thread, like the real verifier
+        uid = token.removeprefix("bench-")
+        return {"uid": uid, "email": f"{uid}@bench.local", "exp": time.time() + 3600}
+    return verify_id_token
+
+
+async def serve(app, port: int) -> tuple[uvicorn.Server, asyncio.Task]:
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    task = asyncio.create_task(server.serve())
+    while not server.started:
+        if task.done():
+            task.result()  # Surface startup errors
+        await asyncio.sleep(0.01)
+    return server, task
+
+
+async def run_scenario(client: httpx.AsyncClient, name: str, make_request, requests: int, concurrency: int) -> dict:
+    latencies: list[float] = []
+    errors = 0
+    counter = iter(range(requests))
+
+    async def worker():
+        nonlocal errors
+        for i in counter:
+            start = time.perf_counter()
+            try:
+                response = await make_request(client, i)
+                ok = response.status_code < 400
+            except httpx.HTTPError:
+                ok = False
+            latencies.append((time.perf_counter() - start) * 1000)
+            errors += not ok
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "requests": requests,
+        "errors": errors,
+        "throughput_rps": round(requests / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 0.50), 1),
+        "p95_ms": round(percentile(latencies, 0.95), 1),
+        "p99_ms": round(percentile(latencies, 0.99), 1),
+    }
+
+
+async def run(args: argparse.Namespace) -> dict:
+    from benchmarks.fake_openai import Latency, create_app as create_fake_openai
+
+    openai_port = free_port()
+    os.environ["OPENAI_BASE_URL"] = f"http://127.0.0.1:{openai_port}/v1"
+    fake_openai, fake_task = await serve(
+        create_fake_openai(
+            whisper=Latency(args.whisper_latency_ms, args.jitter_ms),
+            chat=Latency(args.chat_latency_ms, args.jitter_ms),
+        ),
+        openai_port,
+    )
+
+    # Imported only now: settings are read from the environment prepared in main()
+    from app.main import app
+
+    api_port = free_port()
+    with patch("app.core.auth.firebase_auth.verify_id_token", fake_verify_id_token(args.verify_latency_ms)):
+        api, api_task = await serve(app, api_port)
+        limits = httpx.Limits(max_connections=args.concurrency)
+        async with httpx.AsyncClient(
+            base_url=f"http://127.0.0.1:{api_port}/api/v1", limits=limits, timeout=120
+        ) as client:
+            def auth(i: int) -> dict:
+                return {"Authorization": f"Bearer bench-user{i % args.users}"}
+
+            # Create the users up front, as the app does on first sign-in
+            for i in range(args.users):
+                (await client.get("/users/me", headers=auth(i))).raise_for_status()
+
+            audio = os.urandom(args.audio_bytes)
+
+            async def practice(client, i):
+                # Unique content per request, so the transcription cache never hits
+                files = {"file": ("bench.mp3", i.to_bytes(8, "big") + audio, "audio/mpeg")}
+                return await client.post("/speech/practice", files=files, headers=auth(i))
+
+            async def feedback(client, i):
+                payload = {"text": f"I goed to the store yesterday ({i}).", "target_language": "en"}
+                return await client.post("/speech/feedback", json=payload)
+
+            async def stats(client, i):
+                return await client.get("/users/me/stats", headers=auth(i))
+
+            async def sessions(client, i):
+                return await client.get("/users/me/sessions", params={"cursor": ""}, headers=auth(i))
+
+            scenarios = {"practice": practice, "feedback": feedback, "stats": stats, "sessions": sessions}
+            results = {}
+            for name in args.scenarios:
+                results[name] = await run_scenario(
+                    client, name, scenarios[name], args.requests, args.concurrency
+                )
+
+        api.should_exit = True
+        await api_task
+
+    upstream_calls = dict(fake_openai.config.app.state.calls)
+    fake_openai.should_exit = True
+    await fake_task
+
+    return {
+        "config": {
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "users": args.users,
+            "whisper_latency_ms": args.whisper_latency_ms,
+            "chat_latency_ms": args.chat_latency_ms,
+            "jitter_ms": args.jitter_ms,
+            "verify_latency_ms": args.verify_latency_ms,
+        },
+        "upstream_calls": upstream_calls,
+        "scenarios": results,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200, help="Requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--scenarios", nargs="+", default=["practice", "feedback", "stats", "sessions"],
+                        choices=["practice", "feedback", "stats", "sessions"])
+    parser.add_argument("--whisper-latency-ms", type=float, default=800)
+    parser.add_argument("--chat-latency-ms", type=float, default=600)
+    parser.add_argument("--jitter-ms", type=float, default=150, help="Standard deviation of upstream latency")
+    parser.add_argument("--verify-latency-ms", type=float, default=5, help="Fake Firebase verification time")
+    parser.add_argument("--audio-bytes", type=int, default=64000)
+    parser.add_argument("--database-url", default=None, help="Defaults to a fresh temporary SQLite file")
+    parser.add_argument("--fail-p95-ms", type=float, default=None, help="Exit 1 if any scenario's p95 is above this")
+    args = parser.parse_args()
+
+    os.environ["DATABASE_URL"] = args.database_url or f"sqlite:///{tempfile.mkdtemp()}/bench.db"
+    os.environ["OPENAI_API_KEY"] = "bench"
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    # A handful of users at full speed would just measure 429s
+    os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+
+    report = asyncio.run(run(args))
+    print(json.dumps(report, indent=2))
+
+    if args.fail_p95_ms is not None:
+        slow = [name for name, result in report["scenarios"].items() if result["p95_ms"] > args.fail_p95_ms]
+        if slow:
+            print(f"p95 above {args.fail_p95_ms}ms: {', '.join(slow)}", file=sys.stderr)
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,29 +1,53 @@
+import os
+import tempfile
+
+# Temporary SQLite file shared by the sync engine (test fixtures) and the
+# async engine (the app), since in-memory databases are per-connection. Set
+# before the app is imported, so its own engine (lifespan create_all) never
+# touches the tracked dev.db.
+SQLALCHEMY_DATABASE_PATH = os.path.join(tempfile.mkdtemp(), "test.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{SQLALCHEMY_DATABASE_PATH}"
+
 import pytest
+from unittest.mock import AsyncMock, patch
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import StaticPool
+from sqlalchemy.pool import NullPool
 
 from app.main import app
-from app.db.session import Base, get_db
+from app.db.session import Base, get_db, get_session_factory
+from app.core.openai_client import get_openai_client
+from app.core.transcription_cache import transcription_cache
+from app.core.feedback_cache import feedback_cache
+from app.core.auth import claims_cache
+from app.core.concurrency import breakers, limiters
+from app.core.ratelimit import rate_limiter
+from app.db.users import user_cache
+from app.api.v1.routers.speech import practice_jobs
+from app.db.writer import session_writer
 
 
-# Create in-memory SQLite database for testing
-SQLALCHEMY_DATABASE_URL = "sqlite:///:memory:"
 engine = create_engine(
-    SQLALCHEMY_DATABASE_URL,
+    f"sqlite:///{SQLALCHEMY_DATABASE_PATH}",
     connect_args={"check_same_thread": False},
-    poolclass=StaticPool,
 )
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# NullPool: each TestClient runs its own event loop, so never reuse connections
+async_engine = create_async_engine(
+    f"sqlite+aiosqlite:///{SQLALCHEMY_DATABASE_PATH}",
+    poolclass=NullPool,
+)
+TestingAsyncSessionLocal = async_sessionmaker(
+    bind=async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+)
 
-def override_get_db():
-    try:
-        db = TestingSessionLocal()
+
+async def override_get_db():
+    async with TestingAsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
 
 
 @pytest.fixture(scope="function")
@@ -38,14 +62,43 @@ def db():
         Base.metadata.drop_all(bind=engine)
 
 
+@pytest.fixture(scope="function")
+async def async_db(db):
+    """Provide an AsyncSession on the test database."""
+    async with TestingAsyncSessionLocal() as session:
+        yield session
+
+
 @pytest.fixture(scope="function")
 def client(db):
     """Provide a test client with database dependency override."""
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_session_factory] = lambda: TestingAsyncSessionLocal
+    practice_jobs.session_factory = TestingAsyncSessionLocal
+    session_writer.session_factory = TestingAsyncSessionLocal
+    transcription_cache.session_factory = TestingAsyncSessionLocal
     Base.metadata.create_all(bind=engine)
+    transcription_cache.memory.clear()
+    feedback_cache.backend.lru.clear()
+    claims_cache.clear()
+    user_cache.clear()
+    breakers.clear()
+    limiters.clear()
+    rate_limiter.store.lru.clear()
     
     with TestClient(app) as test_client:
         yield test_client
     
     app.dependency_overrides.clear()
     Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture(scope="function")
+def mock_openai(client):
+    """Replace the shared AsyncOpenAI client with an async mock."""
+    mock_client = AsyncMock()
+    app.dependency_overrides[get_openai_client] = lambda: mock_client
+    # Background workers resolve the client from app state instead
+    app.state.openai_client = mock_client
+    with patch("app.core.config.settings.openai_api_key", "test-key"):
+        yield mock_client
@@ -0,0 +1,113 @@
+"""Tests for the audio pre-processing stage."""
+import io
+import wave
+from unittest.mock import patch
+
+import numpy as np
+
+from app.core.audio import UtteranceSegmenter, decode_wav, encode_wav, preprocess_wav, split_wav
+
+
+def make_wav_pattern(parts: list[tuple[bool, float]], rate: int = 44100, channels: int = 2) -> bytes:
+    """16-bit WAV of alternating (is_tone, seconds) parts; tones are 440 Hz."""
+    pieces = []
+    for is_tone, seconds in parts:
+        t = np.arange(int(rate * seconds)) / rate
+        pieces.append(0.5 * np.sin(2 * np.pi * 440 * t) if is_tone else np.zeros(len(t)))
+    mono = np.concatenate(pieces)
+    pcm = (np.repeat(mono[:, None], channels, axis=1) * 32767).astype("<i2")
+
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(channels)
+        wav.setsampwidth(2)
+        wav.setframerate(rate)
+        wav.writeframes(pcm.tobytes())
+    return buffer.getvalue()
+
+
+def make_wav(seconds_silence: float, seconds_tone: float, rate: int = 44100, channels: int = 2) -> bytes:
+    """Stereo 16-bit WAV: silence, a 440 Hz tone, then silence again."""
+    parts = [(False, seconds_silence), (True, seconds_tone), (False, seconds_silence)]
+    return make_wav_pattern(parts, rate, channels)
+
+
+def test_preprocess_trims_downmixes_and_resamples():
+    """Test silence is trimmed and the result is 16 kHz mono."""
+    data = make_wav(seconds_silence=1.0, seconds_tone=1.0)
+    result = preprocess_wav(data)
+
+    assert result is not None
+    samples, rate = decode_wav(result.data)
+    assert rate == 16000
+    assert samples.shape[1] == 1
+    # 1s of tone plus the default 200ms of padding on both sides
+    assert abs(result.processed_seconds - 1.4) < 0.05
+    assert abs(result.seconds_saved - 1.6) < 0.05
+    assert abs(result.trimmed_start_seconds - 0.8) < 0.05
+    assert result.bytes_saved == len(data) - len(result.data)
+    assert result.bytes_saved > 0
+
+
+def test_preprocess_skips_unsupported_input():
+    """Test non-WAV, silent and already-minimal audio pass through."""
+    assert preprocess_wav(b"not a wav file") is None
+    assert preprocess_wav(make_wav(seconds_silence=1.0, seconds_tone=0.0)) is None
+
+    minimal = encode_wav(np.full(16000, 0.5, dtype=np.float32), 16000)
+    assert preprocess_wav(minimal) is None
+
+
+def test_split_wav_cuts_at_silences():
+    """Test long recordings are split inside pauses, not mid-word."""
+    data = make_wav_pattern([(True, 1.5), (False, 0.5)] * 4, rate=16000, channels=1)
+    with patch("app.core.config.settings.transcription_chunk_min_seconds", 3.0), \
+            patch("app.core.config.settings.transcription_chunk_seconds", 2.0):
+        chunks = split_wav(data)
+
+    assert len(chunks) == 4
+    assert chunks[0].offset_seconds == 0.0
+    for chunk in chunks[1:]:
+        # Every cut falls in a 0.5s pause following a 1.5s tone
+        assert 1.5 <= chunk.offset_seconds % 2.0 <= 2.0
+    assert abs(sum(chunk.duration_seconds for chunk in chunks) - 8.0) < 1e-6
+
+    with patch("app.core.config.settings.transcription_chunk_min_seconds", 60.0):
+        assert split_wav(data) is None
+
+
+def test_utterance_segmenter_cuts_live_stream_at_pauses():
+    """Test an utterance is released once its pause has streamed in, not at the end."""
+    data = make_wav_pattern([(False, 0.5), (True, 1.0), (False, 1.0), (True, 1.0)], rate=16000, channels=1)
+    pcm = data[44:]  # Raw PCM after the header
+    segmenter = UtteranceSegmenter(16000)
+
+    released = []
+    for start in range(0, len(pcm), 3201):  # Odd sizes split samples across messages
+        chunks = segmenter.feed(pcm[start:start + 3201])
+        if chunks:
+            released.append((start / 32000, chunks))
+
+    assert len(released) == 1
+    seconds_in, (first,) = released[0]
+    assert 2.0 < seconds_in < 2.5  # Cut during the pause
+    (last,) = segmenter.flush()
+    # 200ms of padding before each tone
+    assert abs(first.offset_seconds - 0.3) < 0.05
+    assert abs(last.offset_seconds - 2.3) < 0.05
+    assert decode_wav(last.data)[1] == 16000
+    assert segmenter.received_bytes == len(pcm)
+    assert segmenter.received_seconds == 3.5
+
+
+def test_utterance_segmenter_ignores_room_noise():
+    """Test steady low-level noise alone is never sent for transcription."""
+    rng = np.random.default_rng(0)
+    noise = rng.normal(0.0, 0.001, 16000 * 40)  # About -60 dBFS
+    pcm = (noise * 32767).astype("<i2").tobytes()
+    segmenter = UtteranceSegmenter(16000)
+
+    chunks = [chunk for start in range(0, len(pcm), 3200) for chunk in segmenter.feed(pcm[start:start + 3200])]
+    assert chunks == []
+    assert segmenter.flush() == []
+    assert preprocess_wav(encode_wav(noise.astype(np.float32), 16000)) is None
@@ -0,0 +1,76 @@
+"""Tests keeping the benchmark stand-ins compatible with the OpenAI client."""
+import httpx
+from openai import AsyncOpenAI
+
+from benchmarks.fake_openai import Latency, create_app
+from benchmarks.load import free_port, percentile, serve
+
+
+def fake_client() -> AsyncOpenAI:
+    app = create_app(whisper=Latency(0), chat=Latency(0))
+    return AsyncOpenAI(
+        api_key="bench",
+        base_url="http://fake-openai/v1",
+        http_client=httpx.AsyncClient(transport=httpx.ASGITransport(app=app)),
+    )
+
+
+async def test_fake_openai_speaks_the_client_protocol():
+    """Test transcription, chat and streamed chat responses parse with the real client."""
+    client = fake_client()
+
+    transcription = await client.audio.transcriptions.create(
+        model="whisper-1", file=("a.mp3", b"\0" * 32000), response_format="verbose_json"
+    )
+    assert transcription.text.startswith("I goed")
+    assert transcription.duration == 2.0
+
+    messages = [{"role": "user", "content": "hi"}]
+    completion = await client.chat.completions.create(model="gpt-4o-mini", messages=messages)
+    assert '"score": 82' in completion.choices[0].message.content
+    assert completion.usage.total_tokens == 340
+
+    stream = await client.chat.completions.create(model="gpt-4o-mini", messages=messages, stream=True)
+    content = "".join([chunk.choices[0].delta.content async for chunk in stream if chunk.choices])
+    assert content == completion.choices[0].message.content
+
+
+def test_percentile_nearest_rank():
+    values = [float(i) for i in range(1, 101)]
+    assert percentile(values, 0.50) == 50.0
+    assert percentile(values, 0.95) == 95.0
+    assert percentile(values, 0.99) == 99.0
+    assert percentile([], 0.5) == 0.0
+
+
+async def test_shared_client_works_against_the_fake_server(monkeypatch):
+    """Test the real pooled client from create_openai_client completes calls over a socket.
+
+    In-process transports ignore the timeout, so the fake is served on loopback.
+    """
+    from unittest.mock import patch
+
+    from app.core.openai_client import create_openai_client
+
+    app = create_app(whisper=Latency(0), chat=Latency(0))
+    port = free_port()
+    server, task = await serve(app, port)
+    monkeypatch.setenv("OPENAI_BASE_URL", f"http://127.0.0.1:{port}/v1")
+    with patch("app.core.config.settings.openai_api_key", "bench"):
+        client = create_openai_client()
+
+    try:
+        transcription = await client.audio.transcriptions.create(
+            model="whisper-1", file=("a.mp3", b"\0" * 32000), response_format="verbose_json"
+        )
+        completion = await client.chat.completions.create(
+            model="gpt-4o-mini", messages=[{"role": "user", "content": "hi"}]
+        )
+    finally:
+        await client.close()
+        server.should_exit = True
+        await task
+
+    assert transcription.duration == 2.0
+    assert '"score": 82' in completion.choices[0].message.content
+    assert app.state.calls == {"whisper": 1, "chat": 1}
@@ -0,0 +1,30 @@
+"""Tests for the in-process cache primitives."""
+from unittest.mock import patch
+
+from app.core.cache import LRUCache
+
+
+def test_lru_evicts_least_recently_used():
+    """Test the cache stays bounded and evicts the oldest untouched entry."""
+    cache = LRUCache(max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1  # "b" is now least recently used
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+
+def test_lru_expires_entries_after_ttl():
+    """Test entries are dropped once their TTL has passed."""
+    cache = LRUCache(max_entries=10, ttl_seconds=5)
+    with patch("app.core.cache.time.monotonic", return_value=100.0):
+        cache.set("key", "value")
+    with patch("app.core.cache.time.monotonic", return_value=104.0):
+        assert cache.get("key") == "value"
+    with patch("app.core.cache.time.monotonic", return_value=106.0):
+        assert cache.get("key") is None
+    assert cache.stats() == {"entries": 0, "hits": 1, "misses": 1, "evictions": 1}
@@ -0,0 +1,78 @@
+"""Tests for the adaptive upstream concurrency limiter and circuit breaker."""
+import asyncio
+from unittest.mock import patch
+
+import pytest
+
+from app.core.concurrency import AdaptiveLimiter, CircuitBreaker, UpstreamUnavailable
+from app.core.config import settings
+
+
+async def test_limiter_grows_on_success_and_backs_off_on_overload():
+    """Test additive increase per successful call and one multiplicative decrease per round trip."""
+    limiter = AdaptiveLimiter("test")
+    initial = limiter.limit
+
+    for _ in range(10):
+        async with limiter.slot() as outcome:
+            outcome.ok = True
+    grown = limiter.limit
+    assert initial < grown < initial + 1
+
+    # Concurrent overloads that started together count as one decrease
+    async def overloaded():
+        async with limiter.slot() as outcome:
+            await asyncio.sleep(0.01)
+            outcome.overloaded = True
+
+    await asyncio.gather(*(overloaded() for _ in range(5)))
+    assert limiter.limit == pytest.approx(grown * 0.9)
+
+
+async def test_slow_whisper_calls_do_not_shrink_the_limit():
+    """Test a long recording's slow transcription is not read as overload, unlike a slow chat call."""
+    for name, shrinks in (("chat", True), ("whisper", False)):
+        limiter = AdaptiveLimiter(name)
+        for delay in (0.001, 0.05):
+            async with limiter.slot() as outcome:
+                await asyncio.sleep(delay)
+                outcome.ok = True
+        assert (limiter.limit < settings.upstream_concurrency_initial) is shrinks
+
+
+async def test_calls_over_the_limit_wait_for_a_slot():
+    with patch("app.core.config.settings.upstream_concurrency_initial", 2):
+        limiter = AdaptiveLimiter("test")
+    peak = 0
+
+    async def call():
+        nonlocal peak
+        async with limiter.slot() as outcome:
+            peak = max(peak, limiter.in_flight)
+            await asyncio.sleep(0.01)
+            outcome.ok = True
+
+    await asyncio.gather(*(call() for _ in range(6)))
+    assert peak == 2
+    assert limiter.in_flight == 0
+
+
+def test_breaker_opens_after_consecutive_failures_and_probes_to_close():
+    breaker = CircuitBreaker("test")
+    with patch("app.core.config.settings.circuit_failure_threshold", 3), \
+         patch("app.core.config.settings.circuit_open_seconds", 30):
+        for _ in range(3):
+            breaker.record(False, breaker.allow())
+        assert breaker.state == "open"
+        with pytest.raises(UpstreamUnavailable) as exc:
+            breaker.allow()
+        assert 1 <= exc.value.retry_after <= 30
+
+    with patch("app.core.config.settings.circuit_open_seconds", 0):
+        assert breaker.state == "half_open"
+        probe = breaker.allow()
+        assert probe
+        with pytest.raises(UpstreamUnavailable):
+            breaker.allow()  # One probe at a time
+        breaker.record(True, probe)
+    assert breaker.state == "closed"
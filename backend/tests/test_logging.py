@@ -0,0 +1,48 @@
+"""Tests for queue-based logging and request-log sampling."""
+import io
+import logging
+import queue
+from unittest.mock import patch
+
+from app.core.logging import BoundedQueueHandler, setup_logging, stop_logging
+from app.core.middleware import should_log
+
+
+def test_records_are_written_by_the_listener_thread():
+    """Test log records go through the queue and reach the stream once flushed."""
+    stream = io.StringIO()
+    setup_logging(stream)
+    try:
+        logging.getLogger("tests.logging").warning("queued %s", "message")
+        stop_logging()  # Drains the queue
+        assert "queued message" in stream.getvalue()
+    finally:
+        setup_logging()
+
+
+def test_full_queue_drops_and_counts_records():
+    """Test a full queue never blocks the caller; the record is dropped and counted."""
+    handler = BoundedQueueHandler(queue.Queue(maxsize=1))
+    logger = logging.getLogger("tests.logging.bounded")
+    logger.propagate = False
+    logger.addHandler(handler)
+    try:
+        logger.warning("first")
+        logger.warning("second")
+    finally:
+        logger.removeHandler(handler)
+
+    assert handler.queue.qsize() == 1
+    assert handler.dropped == 1
+
+
+def test_request_log_sampling_keeps_errors_and_slow_requests():
+    """Test sampled-out requests are only fast successes."""
+    with patch("app.core.config.settings.log_request_sample_rate", 0.0), \
+            patch("app.core.config.settings.log_slow_request_ms", 500):
+        assert not should_log(200, 10_000_000)
+        assert should_log(503, 10_000_000)
+        assert should_log(200, 600_000_000)
+
+    with patch("app.core.config.settings.log_request_sample_rate", 1.0):
+        assert should_log(200, 10_000_000)
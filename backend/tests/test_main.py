@@ -16,3 +16,45 @@ def test_health_endpoint(client):
     assert response.status_code == 200
     data = response.json()
     assert data["status"] == "healthy"
+
+
+def test_metrics_endpoint(mock_openai, client):
+    """Test /metrics exposes route, upstream and DB metrics with templated labels."""
+    from io import BytesIO
+    from unittest.mock import MagicMock
+
+    mock_openai.audio.transcriptions.create.return_value = MagicMock(
+        text="Hello", language="english", duration=2.5
+    )
+    files = {"file": ("test.mp3", BytesIO(b"metrics audio"), "audio/mpeg")}
+    assert client.post("/api/v1/speech/transcribe", files=files).status_code == 200
+    client.get("/api/v1/speech/jobs/abc123")
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    body = response.text
+    assert 'http_requests_total{method="POST",route="/api/v1/speech/transcribe",status="200"}' in body
+    assert 'route="/api/v1/speech/jobs/{job_id}"' in body
+    assert "abc123" not in body
+    assert 'upstream_request_duration_seconds_count{outcome="ok",upstream="whisper"}' in body
+    assert "whisper_audio_seconds_total" in body
+    assert "db_query_duration_seconds_bucket" in body
+    assert 'singleflight_coalesced_total{upstream="whisper"}' in body
+    assert 'cache_misses_total{cache="transcription"}' in body
+    assert 'cache_hits_total{cache="transcription",tier="db"}' in body
+    assert 'cache_hits_total{cache="feedback",tier="memory"}' in body
+    assert 'cache_evictions_total{cache="feedback"}' in body
+
+
+def test_security_headers_only_in_production(client):
+    """Test security headers are added in production and left out otherwise."""
+    from unittest.mock import patch
+
+    assert "x-frame-options" not in client.get("/health").headers
+
+    with patch("app.core.config.settings.environment", "production"):
+        response = client.get("/health")
+    assert response.headers["x-frame-options"] == "DENY"
+    assert response.headers["x-content-type-options"] == "nosniff"
+    assert response.headers["content-type"] == "application/json"
@@ -0,0 +1,29 @@
+"""Tests for the prompt registry and token budgets."""
+from app.core.prompts import FEEDBACK, PromptTemplate, estimate_tokens, feedback_prompt, trim_to_token_budget
+
+
+def test_prompts_share_a_static_prefix_and_vary_only_at_the_end():
+    english = feedback_prompt("en", None)
+    spanish = feedback_prompt("es", "business   meeting")
+
+    assert english.system.startswith(FEEDBACK.instructions)
+    assert spanish.system.startswith(FEEDBACK.instructions)
+    assert spanish.system.endswith("Target language: es\nContext: business meeting")
+    assert english.version == spanish.version
+    assert feedback_prompt("es", "business meeting") is spanish  # Compiled once
+
+
+def test_version_tracks_template_text():
+    first = PromptTemplate("test", 1, "Be brief.", "Language: {target_language}")
+    edited = PromptTemplate("test", 1, "Be very brief.", "Language: {target_language}")
+    assert first.version.startswith("test/1-")
+    assert first.version != edited.version
+
+
+def test_learner_text_is_trimmed_to_the_token_budget():
+    text = "word " * 1000
+    trimmed = trim_to_token_budget(text, max_tokens=100)
+    assert estimate_tokens(trimmed) <= 100
+    assert trimmed.endswith("word") and text.startswith(trimmed)
+    assert trim_to_token_budget("short text", max_tokens=100) == "short text"
+    assert trim_to_token_budget(text, max_tokens=0) == text
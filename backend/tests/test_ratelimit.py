@@ -0,0 +1,81 @@
+"""Tests for cost-weighted, per-user rate limiting."""
+from io import BytesIO
+from unittest.mock import patch
+
+import pytest
+from starlette.websockets import WebSocketDisconnect
+
+from app.core.ratelimit import MemoryBucketStore, endpoint_cost, parse_rate
+
+
+def test_parse_rate_and_costs():
+    assert parse_rate("300/minute") == (300, 60)
+    assert parse_rate("10/seconds") == (10, 1)
+    assert endpoint_cost("POST", "/speech/practice") > endpoint_cost("GET", "/users/me") == 1
+
+
+async def test_memory_bucket_refills_over_time():
+    store = MemoryBucketStore(max_entries=10)
+    assert await store.take("k", 8, capacity=10, rate=1000.0) == (True, 2)
+    allowed, tokens = await store.take("k", 8, capacity=10, rate=0.001)
+    assert not allowed and tokens < 8
+
+
+def test_requests_are_charged_by_cost_with_ratelimit_headers(client):
+    """Test /practice drains the bucket faster than cheap calls, then 429s with Retry-After."""
+    with patch("app.core.config.settings.rate_limit", "30/minute"):
+        response = client.get("/api/v1/users/me")
+        assert response.status_code == 401  # Limited requests still reach the endpoint
+        assert response.headers["ratelimit-limit"] == "30"
+        assert response.headers["ratelimit-remaining"] == "29"
+        assert response.headers["ratelimit-policy"] == "30;w=60"
+
+        files = {"file": ("test.txt", BytesIO(b"not audio"), "text/plain")}
+        response = client.post("/api/v1/speech/practice", files=files)
+        assert response.headers["ratelimit-remaining"] == "9"
+
+        response = client.post("/api/v1/speech/practice", files=files)
+        assert response.status_code == 429
+        assert int(response.headers["retry-after"]) >= 20
+        assert client.get("/health").status_code == 200  # Outside the API prefix
+
+
+@patch("app.core.auth.firebase_auth")
+def test_signed_in_users_get_their_own_bucket(mock_firebase_auth, client):
+    """Test buckets are keyed by uid, so users behind one IP do not share a limit."""
+    mock_firebase_auth.verify_id_token.side_effect = lambda token, check_revoked=False: {
+        "uid": token, "exp": 0,
+    }
+
+    with patch("app.core.config.settings.rate_limit", "2/minute"):
+        for token in ("alice", "alice", "bob"):
+            response = client.get("/api/v1/users/me", headers={"Authorization": f"Bearer {token}"})
+            assert response.status_code == 200
+        response = client.get("/api/v1/users/me", headers={"Authorization": "Bearer alice"})
+        assert response.status_code == 429
+        assert client.get("/api/v1/users/me").status_code == 401  # Anonymous IP bucket untouched
+
+
+def test_websocket_handshake_is_charged(client):
+    """Test a live practice socket costs as much as /practice and is refused when over the limit."""
+    with patch("app.core.config.settings.rate_limit", "30/minute"):
+        with client.websocket_connect("/api/v1/speech/practice/ws") as websocket:
+            websocket.close()
+        with pytest.raises(WebSocketDisconnect) as refused:
+            with client.websocket_connect("/api/v1/speech/practice/ws"):
+                pass
+    assert refused.value.code == 1008
+
+
+def test_feedback_batch_is_charged_per_item(mock_openai, client):
+    """Test a batch costs as much as the same items sent to /feedback one by one."""
+    with patch("app.core.config.settings.rate_limit", "30/minute"):
+        batch = {"items": [{"text": f"Sentence {i}"} for i in range(8)]}
+        response = client.post("/api/v1/speech/feedback/batch", json=batch)
+        assert response.status_code == 429  # 8 items x 4 tokens > 30
+        assert int(response.headers["retry-after"]) >= 1
+        mock_openai.chat.completions.create.assert_not_awaited()
+
+        # The first item's tokens were taken up front, the other seven refused
+        response = client.get("/api/v1/users/me")
+        assert response.headers["ratelimit-remaining"] == "25"
@@ -0,0 +1,67 @@
+"""Tests for single-flight request coalescing."""
+import asyncio
+
+import pytest
+
+from app.core.singleflight import SingleFlight
+
+
+async def test_concurrent_identical_calls_share_one_result():
+    """Test callers with the same key share one call; other keys run separately."""
+    flights = SingleFlight("test")
+    started = 0
+
+    async def call(value):
+        nonlocal started
+        started += 1
+        await asyncio.sleep(0.01)
+        return value
+
+    results = await asyncio.gather(
+        flights.do("a", lambda: call(1)),
+        flights.do("a", lambda: call(2)),
+        flights.do("b", lambda: call(3)),
+    )
+
+    assert results == [1, 1, 3]
+    assert started == 2
+    assert flights.stats() == {"calls": 2, "coalesced": 1, "in_flight": 0}
+
+
+async def test_errors_are_shared_and_not_cached():
+    """Test a failing call fails every waiter, and the next call runs afresh."""
+    flights = SingleFlight("test")
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise ValueError("upstream down")
+
+    results = await asyncio.gather(
+        flights.do("a", fail), flights.do("a", fail), return_exceptions=True
+    )
+    assert all(isinstance(result, ValueError) for result in results)
+
+    async def succeed():
+        return "ok"
+
+    assert await flights.do("a", succeed) == "ok"
+    assert flights.stats()["calls"] == 2
+
+
+async def test_cancelled_caller_does_not_cancel_shared_call():
+    """Test the remaining callers still get the result when the first one goes away."""
+    flights = SingleFlight("test")
+
+    async def call():
+        await asyncio.sleep(0.02)
+        return "done"
+
+    first = asyncio.create_task(flights.do("a", call))
+    await asyncio.sleep(0)
+    second = asyncio.create_task(flights.do("a", call))
+    await asyncio.sleep(0)
+    first.cancel()
+
+    assert await second == "done"
+    with pytest.raises(asyncio.CancelledError):
+        await first
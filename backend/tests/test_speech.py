@@ -1,6 +1,6 @@
 """Tests for speech endpoints."""
 import pytest
-from unittest.mock import Mock, patch, MagicMock
+from unittest.mock import Mock, patch, MagicMock, AsyncMock
 from io import BytesIO
 
 
@@ -34,13 +34,8 @@ def test_feedback_without_api_key(client):
         assert "OpenAI API key not configured" in response.json()["detail"]
 
 
-@patch("app.api.v1.routers.speech.OpenAI")
-def test_feedback_success(mock_openai_class, client):
+def test_feedback_success(mock_openai, client):
     """Test feedback endpoint with mocked OpenAI response."""
-    # Setup mock
-    mock_client = MagicMock()
-    mock_openai_class.return_value = mock_client
-    
     mock_response = MagicMock()
     mock_response.choices = [MagicMock()]
     mock_response.choices[0].message.content = '''{
@@ -50,16 +45,634 @@ def test_feedback_success(mock_openai_class, client):
         "grammar_notes": [],
         "score": 95
     }'''
-    mock_client.chat.completions.create.return_value = mock_response
+    mock_openai.chat.completions.create.return_value = mock_response
+    
+    response = client.post(
+        "/api/v1/speech/feedback",
+        json={"text": "Hello, how are you?", "target_language": "en"}
+    )
     
+    assert response.status_code == 200
+    data = response.json()
+    assert data["original_text"] == "Hello, how are you?"
+    assert data["score"] == 95
+    assert len(data["pronunciation_tips"]) > 0
+
+
+def test_practice_success(mock_openai, client):
+    """Test practice endpoint awaits both async OpenAI calls."""
+    mock_openai.audio.transcriptions.create.return_value = MagicMock(
+        text="I has a dog", language="english", duration=2.0
+    )
+    mock_response = MagicMock()
+    mock_response.choices = [MagicMock()]
+    mock_response.choices[0].message.content = '{"corrected_text": "I have a dog", "feedback": "Nice!", "score": 80}'
+    mock_openai.chat.completions.create.return_value = mock_response
+
+    files = {"file": ("test.mp3", BytesIO(b"fake audio content"), "audio/mpeg")}
+    response = client.post("/api/v1/speech/practice", files=files)
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["transcription"] == "I has a dog"
+    assert data["corrected_text"] == "I have a dog"
+    assert data["score"] == 80
+    mock_openai.audio.transcriptions.create.assert_awaited_once()
+    mock_openai.chat.completions.create.assert_awaited_once()
+
+
+def test_openai_client_is_shared(client):
+    """Test the pooled client is created once and reused across requests."""
+    from app.main import app
+    from app.core.openai_client import get_openai_client
+
     with patch("app.core.config.settings.openai_api_key", "test-key"):
+        request = MagicMock()
+        request.app = app
+        first = get_openai_client(request)
+        second = get_openai_client(request)
+    assert first is second
+
+
+def test_transcribe_repeated_upload_is_cached(mock_openai, client, db):
+    """Test a re-uploaded recording is served from cache without calling Whisper."""
+    from app.core.transcription_cache import transcription_cache
+
+    segment = MagicMock(start=0.0, end=1.5, text=" Hello there")
+    mock_openai.audio.transcriptions.create.return_value = MagicMock(
+        text="Hello there", language="english", duration=1.5, segments=[segment]
+    )
+
+    def upload():
+        files = {"file": ("test.mp3", BytesIO(b"same audio bytes"), "audio/mpeg")}
+        return client.post("/api/v1/speech/transcribe", files=files)
+
+    first = upload()
+    second = upload()
+    assert first.status_code == 200
+    assert first.json()["segments"] == [{"start": 0.0, "end": 1.5, "text": "Hello there"}]
+    assert second.json() == first.json()
+    assert mock_openai.audio.transcriptions.create.await_count == 1
+
+    # Memory tier gone (e.g. worker restart): the database tier still answers
+    transcription_cache.memory.clear()
+    third = upload()
+    assert third.json() == first.json()
+    assert mock_openai.audio.transcriptions.create.await_count == 1
+    assert transcription_cache.stats()["db_hits"] >= 1
+
+
+def test_transcribe_survives_a_failing_cache_table(mock_openai, client):
+    """Test a database tier error is treated as a cache miss, not a failed request."""
+    from app.core.transcription_cache import transcription_cache
+
+    mock_openai.audio.transcriptions.create.return_value = MagicMock(
+        text="Hello there", language="english", duration=1.5, segments=None
+    )
+    files = {"file": ("test.mp3", BytesIO(b"audio while the db is down"), "audio/mpeg")}
+    with patch.object(transcription_cache, "session_factory", side_effect=RuntimeError("database down")):
+        response = client.post("/api/v1/speech/transcribe", files=files)
+    assert response.status_code == 200
+    assert response.json()["text"] == "Hello there"
+
+
+def test_feedback_cache_normalizes_text(mock_openai, client):
+    """Test identical phrases (modulo whitespace) share one chat completion."""
+    mock_response = MagicMock()
+    mock_response.choices = [MagicMock()]
+    mock_response.choices[0].message.content = '{"corrected_text": "Hello, how are you?", "score": 90}'
+    mock_openai.chat.completions.create.return_value = mock_response
+
+    first = client.post("/api/v1/speech/feedback", json={"text": "Hello, how are you?"})
+    second = client.post("/api/v1/speech/feedback", json={"text": "  Hello,   how are you? "})
+    assert first.status_code == second.status_code == 200
+    assert second.json()["score"] == 90
+    assert second.json()["original_text"] == "  Hello,   how are you? "
+    assert mock_openai.chat.completions.create.await_count == 1
+
+    # A different context is a different prompt, so it is not served from cache
+    client.post("/api/v1/speech/feedback", json={"text": "Hello, how are you?", "context": "job interview"})
+    assert mock_openai.chat.completions.create.await_count == 2
+
+
+async def test_feedback_cache_invalidate():
+    """Test invalidate() drops cached entries."""
+    from app.core.cache import MemoryCacheBackend
+    from app.core.feedback_cache import FeedbackCache, make_key
+
+    cache = FeedbackCache(MemoryCacheBackend(max_entries=10))
+    key = make_key("Hi", "en", None, "prompt")
+    await cache.set(key, {"score": 70})
+    assert await cache.get(key) == {"score": 70}
+    assert make_key("Hi", "en", None, "prompt", model="other-model") != key
+
+    await cache.invalidate()
+    assert await cache.get(key) is None
+
+
+def _stream_chunks(content: str, size: int = 7):
+    """Async iterator imitating a streamed chat completion."""
+    async def iterator():
+        for i in range(0, len(content), size):
+            delta = MagicMock(content=content[i:i + size])
+            yield MagicMock(choices=[MagicMock(delta=delta)])
+    return iterator()
+
+
+def _parse_sse(body: str) -> list[tuple[str, dict]]:
+    import json
+
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.split("\n"))
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+def test_feedback_stream_emits_fields_before_done(mock_openai, client):
+    """Test the SSE endpoint sends completed fields early and a valid final event."""
+    from app.api.v1.routers.speech import FeedbackResponse
+
+    content = (
+        '{"corrected_text": "I have a \\"dog\\"", "feedback": "Well done!", '
+        '"pronunciation_tips": [], "grammar_notes": ["has -> have"], "score": 77}'
+    )
+    mock_openai.chat.completions.create.return_value = _stream_chunks(content)
+
+    response = client.post("/api/v1/speech/feedback/stream", json={"text": "I has a \"dog\""})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+
+    events = _parse_sse(response.text)
+    names = [name for name, _ in events]
+    assert names.index("corrected_text") < names.index("feedback") < names.index("done")
+    assert names[-1] == "done"
+    assert dict(events)["corrected_text"] == {"corrected_text": 'I have a "dog"'}
+
+    final = FeedbackResponse.model_validate(events[-1][1])
+    assert final.score == 77
+    assert final.grammar_notes == ["has -> have"]
+    assert mock_openai.chat.completions.create.call_args.kwargs["stream"] is True
+
+
+def test_feedback_batch_dedupes_and_reports_per_item_errors(mock_openai, client):
+    """Test batch feedback keeps order, dedupes items and isolates failures."""
+    import json
+
+    async def fake_completion(**kwargs):
+        text = kwargs["messages"][-1]["content"]
+        if text == "boom":
+            raise RuntimeError("upstream error")
+        response = MagicMock()
+        response.choices = [MagicMock()]
+        response.choices[0].message.content = json.dumps({"corrected_text": text.upper(), "score": 60})
+        return response
+
+    mock_openai.chat.completions.create.side_effect = fake_completion
+
+    items = [{"text": "one"}, {"text": "boom"}, {"text": "two"}, {"text": " one "}]
+    response = client.post("/api/v1/speech/feedback/batch", json={"items": items})
+
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [r["status"] for r in results] == ["ok", "error", "ok", "ok"]
+    assert results[0]["result"]["corrected_text"] == "ONE"
+    assert results[2]["result"]["corrected_text"] == "TWO"
+    assert results[3]["result"]["original_text"] == " one "
+    assert "upstream error" in results[1]["error"]
+    assert mock_openai.chat.completions.create.await_count == 3
+
+
+def test_feedback_batch_rejects_oversized_batches(mock_openai, client):
+    """Test batches above the configured limit are rejected."""
+    with patch("app.core.config.settings.feedback_batch_max_items", 2):
         response = client.post(
-            "/api/v1/speech/feedback",
-            json={"text": "Hello, how are you?", "target_language": "en"}
+            "/api/v1/speech/feedback/batch",
+            json={"items": [{"text": "a"}, {"text": "b"}, {"text": "c"}]},
+        )
+    assert response.status_code == 400
+
+
+def _mock_practice(mock_openai, text="I has a dog", score=80):
+    mock_openai.audio.transcriptions.create.return_value = MagicMock(
+        text=text, language="english", duration=2.0
+    )
+    mock_response = MagicMock()
+    mock_response.choices = [MagicMock()]
+    mock_response.choices[0].message.content = f'{{"corrected_text": "fixed", "score": {score}}}'
+    mock_openai.chat.completions.create.return_value = mock_response
+
+
+def _wait_for_job(client, job_id, timeout=5.0):
+    import time
+
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = client.get(f"/api/v1/speech/jobs/{job_id}").json()
+        if job["status"] in ("succeeded", "failed"):
+            return job
+        time.sleep(0.02)
+    raise AssertionError(f"Job {job_id} did not finish")
+
+
+def test_practice_async_returns_job_and_result(mock_openai, client):
+    """Test ?async=1 answers 202 immediately and the job completes in the background."""
+    _mock_practice(mock_openai)
+    files = {"file": ("test.mp3", BytesIO(b"async audio"), "audio/mpeg")}
+
+    response = client.post("/api/v1/speech/practice?async=1", files=files)
+    assert response.status_code == 202
+    body = response.json()
+    assert body["status"] in ("pending", "running", "succeeded")
+    assert response.headers["location"].endswith(f"/api/v1/speech/jobs/{body['job_id']}")
+
+    job = _wait_for_job(client, body["job_id"])
+    assert job["status"] == "succeeded"
+    assert job["result"]["transcription"] == "I has a dog"
+    assert job["result"]["score"] == 80
+
+    events = _parse_sse(client.get(f"/api/v1/speech/jobs/{body['job_id']}/events").text)
+    assert events[-1][0] == "status"
+    assert events[-1][1]["status"] == "succeeded"
+
+
+def test_practice_async_failure_is_reported(mock_openai, client):
+    """Test a failing pipeline marks the job failed with an error message."""
+    mock_openai.audio.transcriptions.create.side_effect = RuntimeError("whisper down")
+    files = {"file": ("test.mp3", BytesIO(b"failing audio"), "audio/mpeg")}
+
+    job_id = client.post("/api/v1/speech/practice?async=1", files=files).json()["job_id"]
+    job = _wait_for_job(client, job_id)
+    assert job["status"] == "failed"
+    assert "whisper down" in job["error"]
+
+
+def test_pending_jobs_resume_after_restart(mock_openai, client, db):
+    """Test jobs persisted as pending are picked up when the worker pool starts."""
+    from app.main import app
+    from app.api.v1.routers.speech import practice_jobs
+    from app.db import models
+
+    _mock_practice(mock_openai, text="Recovered")
+    db.add(models.PracticeJob(id="a" * 32, status="pending", filename="test.mp3", audio=b"left over"))
+    db.commit()
+
+    client.portal.call(practice_jobs.stop)
+    client.portal.call(practice_jobs.start, app)
+
+    job = _wait_for_job(client, "a" * 32)
+    assert job["status"] == "succeeded"
+    assert job["result"]["transcription"] == "Recovered"
+
+
+async def test_concurrent_submits_never_overflow_the_job_queue(async_db):
+    """Test the last free slot goes to one submission; the other gets QueueFull and no job row."""
+    import asyncio
+    from sqlalchemy import func, select
+    from app.core.jobs import JobQueue, QueueFull
+    from app.db import models
+    from tests.conftest import TestingAsyncSessionLocal
+
+    queue = JobQueue(handler=AsyncMock(), workers=0, max_pending=1)
+    queue.session_factory = TestingAsyncSessionLocal
+    await queue.start(None)
+
+    async def submit(name):
+        async with TestingAsyncSessionLocal() as session:
+            return await queue.submit(session, None, name, b"audio")
+
+    results = await asyncio.gather(submit("a.mp3"), submit("b.mp3"), return_exceptions=True)
+    await queue.stop()
+
+    assert sum(isinstance(result, models.PracticeJob) for result in results) == 1
+    assert sum(isinstance(result, QueueFull) for result in results) == 1
+    assert await async_db.scalar(select(func.count()).select_from(models.PracticeJob)) == 1
+
+
+def test_unknown_job_returns_404(client):
+    """Test polling a job id that does not exist."""
+    assert client.get("/api/v1/speech/jobs/does-not-exist").status_code == 404
+
+
+def test_transcribe_accepts_raw_audio_body(mock_openai, client):
+    """Test a raw audio/* body is streamed to Whisper as a file handle."""
+    mock_openai.audio.transcriptions.create.return_value = MagicMock(
+        text="Raw body", language="english", duration=1.0
+    )
+
+    response = client.post(
+        "/api/v1/speech/transcribe?filename=clip.wav",
+        content=b"RIFF raw audio bytes",
+        headers={"Content-Type": "audio/wav"},
+    )
+
+    assert response.status_code == 200
+    assert response.json()["text"] == "Raw body"
+    filename, handle = mock_openai.audio.transcriptions.create.call_args.kwargs["file"]
+    assert filename == "clip.wav"
+    assert not isinstance(handle, bytes)
+
+
+def test_upload_over_limit_is_rejected_with_413(mock_openai, client):
+    """Test oversized uploads are refused by Content-Length and while streaming."""
+    with patch("app.core.config.settings.max_upload_bytes", 10):
+        # Declared length over the cap: rejected before the body is read
+        big = b"x" * (70 * 1024)
+        files = {"file": ("test.mp3", BytesIO(big), "audio/mpeg")}
+        assert client.post("/api/v1/speech/practice", files=files).status_code == 413
+
+        # Small enough to pass the header check, caught while streaming
+        response = client.post(
+            "/api/v1/speech/transcribe",
+            content=b"x" * 100,
+            headers={"Content-Type": "audio/mpeg"},
+        )
+        assert response.status_code == 413
+
+        # Chunked multipart (no Content-Length): stopped before the form is parsed
+        body = (
+            b'--cut\r\nContent-Disposition: form-data; name="file"; filename="test.mp3"\r\n'
+            b"Content-Type: audio/mpeg\r\n\r\n" + big + b"\r\n--cut--\r\n"
         )
-        
-        assert response.status_code == 200
-        data = response.json()
-        assert data["original_text"] == "Hello, how are you?"
-        assert data["score"] == 95
-        assert len(data["pronunciation_tips"]) > 0
+        with patch("app.core.uploads.AudioUpload.from_upload_file") as from_upload_file:
+            response = client.post(
+                "/api/v1/speech/transcribe",
+                content=iter([body]),
+                headers={"Content-Type": "multipart/form-data; boundary=cut"},
+            )
+        assert response.status_code == 413
+        from_upload_file.assert_not_called()
+    mock_openai.audio.transcriptions.create.assert_not_awaited()
+
+
+def test_transcribe_preprocesses_wav(mock_openai, client):
+    """Test WAV uploads are trimmed and resampled before Whisper, reporting savings."""
+    from tests.test_audio import make_wav
+    from app.core.audio import decode_wav
+
+    sent = {}
+
+    async def transcribe(model, file, response_format):
+        sent["filename"], handle = file
+        sent["data"] = handle.read()
+        return MagicMock(text="Hello", language="english", duration=1.4)
+
+    mock_openai.audio.transcriptions.create.side_effect = transcribe
+    data = make_wav(seconds_silence=1.0, seconds_tone=1.0)
+    files = {"file": ("take.wav", BytesIO(data), "audio/wav")}
+    response = client.post("/api/v1/speech/transcribe", files=files)
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["bytes_saved"] == len(data) - len(sent["data"])
+    assert body["seconds_saved"] > 1.5
+    samples, rate = decode_wav(sent["data"])
+    assert (rate, samples.shape[1]) == (16000, 1)
+
+    with patch("app.core.config.settings.audio_preprocessing_enabled", False):
+        files = {"file": ("other.wav", BytesIO(make_wav(0.5, 1.0)), "audio/wav")}
+        response = client.post("/api/v1/speech/transcribe", files=files)
+    assert response.json()["bytes_saved"] is None
+
+
+def test_transcribe_long_recording_in_parallel_chunks(mock_openai, client):
+    """Test long WAV uploads are chunked, retried per chunk and stitched in order."""
+    import httpx
+    from openai import APIConnectionError
+    from tests.test_audio import make_wav_pattern
+
+    calls = []
+
+    async def transcribe(model, file, response_format):
+        filename, _ = file
+        calls.append(filename)
+        index = int(filename.split("-")[1].split(".")[0])
+        if filename == "chunk-1.wav" and calls.count(filename) == 1:
+            raise APIConnectionError(request=httpx.Request("POST", "https://api.openai.com"))
+        segment = MagicMock(start=0.0, end=1.0, text=f" part {index}")
+        return MagicMock(text=f"part {index}", language="english", segments=[segment])
+
+    mock_openai.audio.transcriptions.create.side_effect = transcribe
+    data = make_wav_pattern([(False, 0.5)] + [(True, 1.5), (False, 0.5)] * 4)
+    files = {"file": ("long.wav", BytesIO(data), "audio/wav")}
+    with patch("app.core.config.settings.transcription_chunk_min_seconds", 3.0), \
+            patch("app.core.config.settings.transcription_chunk_seconds", 2.0):
+        response = client.post("/api/v1/speech/transcribe", files=files)
+
+    assert response.status_code == 200
+    body = response.json()
+    chunks = len(set(calls))
+    assert chunks > 1
+    assert len(calls) == chunks + 1  # Only the failed chunk was retried
+    assert body["text"] == " ".join(f"part {i}" for i in range(chunks))
+    starts = [segment["start"] for segment in body["segments"]]
+    assert starts == sorted(starts)
+    # Offsets include the 0.3s of leading silence trimmed by pre-processing
+    assert abs(starts[0] - 0.3) < 0.05
+
+
+async def test_identical_in_flight_feedback_is_coalesced():
+    """Test concurrent identical feedback requests share one chat completion."""
+    import asyncio
+    from app.api.v1.routers.speech import generate_feedback
+    from app.core.singleflight import feedback_flights
+
+    async def complete(**kwargs):
+        await asyncio.sleep(0.01)
+        response = MagicMock()
+        response.choices = [MagicMock()]
+        response.choices[0].message.content = '{"feedback": "Good", "score": 80}'
+        return response
+
+    client = AsyncMock()
+    client.chat.completions.create.side_effect = complete
+    coalesced = feedback_flights.coalesced
+
+    with patch("app.core.config.settings.feedback_cache_enabled", False):
+        results = await asyncio.gather(*[
+            generate_feedback(client, "Hello there", "en") for _ in range(3)
+        ])
+
+    assert results == [{"feedback": "Good", "score": 80}] * 3
+    assert client.chat.completions.create.await_count == 1
+    assert feedback_flights.coalesced - coalesced == 2
+
+
+def test_practice_past_deadline_returns_504(mock_openai, client):
+    """Test a stuck feedback call is abandoned when the practice budget runs out."""
+    import asyncio
+
+    mock_openai.audio.transcriptions.create.return_value = MagicMock(
+        text="This call will hang", language="english", duration=2.0
+    )
+
+    async def hang(**kwargs):
+        await asyncio.sleep(10)
+
+    mock_openai.chat.completions.create.side_effect = hang
+
+    files = {"file": ("test.mp3", BytesIO(b"audio that hangs"), "audio/mpeg")}
+    with patch("app.core.config.settings.request_deadline_seconds", 0.2):
+        response = client.post("/api/v1/speech/practice", files=files)
+
+    assert response.status_code == 504
+    assert "deadline" in response.json()["detail"]
+
+
+def test_open_circuit_fails_fast_with_503(mock_openai, client):
+    """Test repeated upstream failures open the circuit: 503 with Retry-After, no more calls."""
+    import httpx
+    from openai import RateLimitError
+
+    response = httpx.Response(429, request=httpx.Request("POST", "https://api.openai.com"))
+    mock_openai.chat.completions.create.side_effect = RateLimitError("slow down", response=response, body=None)
+
+    with patch("app.core.config.settings.upstream_max_retries", 0), \
+         patch("app.core.config.settings.circuit_failure_threshold", 2):
+        for i in range(2):
+            response = client.post("/api/v1/speech/feedback", json={"text": f"Overloaded {i}"})
+            assert response.status_code == 500
+        response = client.post("/api/v1/speech/feedback", json={"text": "Overloaded 3"})
+
+    assert response.status_code == 503
+    assert int(response.headers["retry-after"]) >= 1
+    assert mock_openai.chat.completions.create.await_count == 2
+    assert client.get("/health").json()["upstreams"]["chat"]["circuit"] == "open"
+
+
+def test_practice_websocket_transcribes_while_streaming(mock_openai, client, db):
+    """Test utterances are transcribed before "end", and the result matches /practice."""
+    from app.db import models
+    from tests.test_audio import make_wav_pattern
+
+    mock_openai.audio.transcriptions.create.side_effect = [
+        MagicMock(text=" I has a dog.", language="english", duration=1.4, segments=None),
+        MagicMock(text=" It is big.", language="english", duration=1.4, segments=None),
+    ]
+    mock_response = MagicMock()
+    mock_response.choices = [MagicMock()]
+    mock_response.choices[0].message.content = '{"corrected_text": "I have a dog. It is big.", "feedback": "Nice!", "score": 85}'
+    mock_openai.chat.completions.create.return_value = mock_response
+
+    recording = make_wav_pattern([(True, 1.0), (False, 1.0), (True, 1.0)], rate=16000, channels=1)
+    pcm = recording[44:]
+    with client.websocket_connect("/api/v1/speech/practice/ws?sample_rate=16000") as websocket:
+        websocket.send_bytes(pcm[:64000])  # First utterance and its pause
+        assert websocket.receive_json() == {"type": "transcript", "index": 0, "text": "I has a dog."}
+        websocket.send_bytes(pcm[64000:])
+        websocket.send_json({"type": "end"})
+        assert websocket.receive_json()["index"] == 1
+        message = websocket.receive_json()
+
+    assert message["type"] == "result"
+    result = message["result"]
+    assert result["transcription"] == "I has a dog. It is big."
+    assert result["corrected_text"] == "I have a dog. It is big."
+    assert result["score"] == 85
+    assert result["audio_seconds_saved"] > 0
+    assert mock_openai.audio.transcriptions.create.await_count == 2
+    session = db.get(models.PracticeSession, result["session_id"])
+    assert (session.transcription, session.score) == ("I has a dog. It is big.", 85)
+
+
+def test_practice_websocket_reports_upstream_errors(mock_openai, client):
+    """Test failures are sent as an error message with the HTTP-equivalent status."""
+    from tests.test_audio import make_wav_pattern
+
+    mock_openai.audio.transcriptions.create.side_effect = Exception("Whisper is down")
+    recording = make_wav_pattern([(True, 1.0)], rate=16000, channels=1)
+    with client.websocket_connect("/api/v1/speech/practice/ws") as websocket:
+        websocket.send_bytes(recording[44:])
+        websocket.send_json({"type": "end"})
+        message = websocket.receive_json()
+
+    assert message["type"] == "error"
+    assert message["status"] == 500
+    assert "Whisper is down" in message["detail"]
+
+    with client.websocket_connect("/api/v1/speech/practice/ws") as websocket:
+        websocket.send_bytes(bytes(32000))  # One second of digital silence
+        websocket.send_json({"type": "end"})
+        assert websocket.receive_json() == {"type": "error", "status": 400, "detail": "No speech detected"}
+
+    import numpy as np
+
+    noise = np.random.default_rng(0).normal(0.0, 0.001, 16000 * 5)  # Room noise, about -60 dBFS
+    with client.websocket_connect("/api/v1/speech/practice/ws") as websocket:
+        websocket.send_bytes((noise * 32767).astype("<i2").tobytes())
+        websocket.send_json({"type": "end"})
+        assert websocket.receive_json()["detail"] == "No speech detected"
+    assert mock_openai.audio.transcriptions.create.await_count == 1  # Only the failed first attempt
+
+    with patch("app.core.config.settings.openai_api_key", None):
+        with client.websocket_connect("/api/v1/speech/practice/ws") as websocket:
+            message = websocket.receive_json()
+    assert message == {"type": "error", "status": 500, "detail": "OpenAI API key not configured"}
+
+
+@patch("app.core.auth.firebase_auth")
+def test_practice_holds_no_transaction_during_upstream_calls(mock_firebase_auth, mock_openai, client, db):
+    """Test the request's session is not left idle in a transaction while OpenAI runs."""
+    from app.main import app
+    from app.db import models
+    from app.db.session import get_db
+    from tests.conftest import TestingAsyncSessionLocal
+
+    db.add(models.User(uid="test-uid-pool", email="pool@example.com"))
+    db.commit()
+    mock_firebase_auth.verify_id_token.return_value = {"uid": "test-uid-pool"}
+
+    sessions = []
+
+    async def recording_get_db():
+        async with TestingAsyncSessionLocal() as session:
+            sessions.append(session)
+            yield session
+
+    app.dependency_overrides[get_db] = recording_get_db
+    in_transaction = []
+
+    async def transcribe(**kwargs):
+        in_transaction.extend(session.in_transaction() for session in sessions)
+        return MagicMock(text="Pool check", language="english", duration=1.0)
+
+    mock_openai.audio.transcriptions.create.side_effect = transcribe
+    mock_response = MagicMock()
+    mock_response.choices = [MagicMock()]
+    mock_response.choices[0].message.content = '{"corrected_text": "Pool check", "score": 80}'
+    mock_openai.chat.completions.create.return_value = mock_response
+
+    files = {"file": ("test.mp3", BytesIO(b"pool check audio"), "audio/mpeg")}
+    response = client.post(
+        "/api/v1/speech/practice", files=files, headers={"Authorization": "Bearer valid-token"}
+    )
+
+    assert response.status_code == 200
+    assert in_transaction == [False]
+
+
+def test_practice_transcription_budget_grows_with_upload_size(mock_openai, client):
+    """Test a long (large) compressed upload gets extra transcription time instead of a 504."""
+    import asyncio
+
+    async def slow_transcription(**kwargs):
+        await asyncio.sleep(0.3)
+        return MagicMock(text="A long story", language="english", duration=600.0)
+
+    mock_openai.audio.transcriptions.create.side_effect = slow_transcription
+    mock_response = MagicMock()
+    mock_response.choices = [MagicMock()]
+    mock_response.choices[0].message.content = '{"corrected_text": "A long story", "score": 75}'
+    mock_openai.chat.completions.create.return_value = mock_response
+
+    def upload(name):
+        files = {"file": (name, BytesIO(name.encode() + b"\0" * 2_000_000), "audio/mpeg")}
+        return client.post("/api/v1/speech/practice", files=files)
+
+    with patch("app.core.config.settings.request_deadline_seconds", 0.2):
+        with patch("app.core.config.settings.transcription_deadline_seconds_per_mb", 0.0):
+            assert upload("short-budget.mp3").status_code == 504
+        with patch("app.core.config.settings.transcription_deadline_seconds_per_mb", 0.5):
+            response = upload("long-budget.mp3")
+    assert response.status_code == 200
+    assert response.json()["transcription"] == "A long story"
@@ -0,0 +1,115 @@
+"""Tests for upstream deadlines, retries and hedging."""
+import asyncio
+import time
+from unittest.mock import patch
+
+import httpx
+import pytest
+from openai import APIConnectionError
+
+from app.core.concurrency import UpstreamUnavailable, breakers
+from app.core.upstream import DeadlineExceeded, call_upstream, deadline, latencies, remaining
+
+
+def connection_error() -> APIConnectionError:
+    return APIConnectionError(request=httpx.Request("POST", "https://api.openai.com"))
+
+
+async def test_retryable_errors_are_retried_with_backoff():
+    """Test a transient error is retried, and gives up after UPSTREAM_MAX_RETRIES."""
+    calls = 0
+
+    async def flaky():
+        nonlocal calls
+        calls += 1
+        if calls < 3:
+            raise connection_error()
+        return "ok"
+
+    with patch("app.core.config.settings.upstream_retry_base_delay", 0.001):
+        assert await call_upstream("test-retry", flaky) == "ok"
+        assert calls == 3
+
+        calls = -10
+        with patch("app.core.config.settings.upstream_max_retries", 1):
+            with pytest.raises(APIConnectionError):
+                await call_upstream("test-retry", flaky)
+        assert calls == -8
+
+
+async def test_other_errors_are_not_retried():
+    calls = 0
+
+    async def broken():
+        nonlocal calls
+        calls += 1
+        raise ValueError("bad response")
+
+    with pytest.raises(ValueError):
+        await call_upstream("test-no-retry", broken)
+    assert calls == 1
+
+
+async def test_deadline_is_shared_and_enforced():
+    """Test nested deadlines take a share of the parent and stuck calls raise DeadlineExceeded."""
+    with deadline(1.0):
+        with deadline(share=0.5):
+            assert 0.45 < remaining() <= 0.5
+        assert 0.95 < remaining() <= 1.0
+
+    async def stuck():
+        await asyncio.sleep(10)
+
+    start = time.monotonic()
+    with deadline(0.05):
+        with pytest.raises(DeadlineExceeded):
+            await call_upstream("test-deadline", stuck)
+    assert time.monotonic() - start < 1
+
+
+async def test_calls_cut_off_by_the_deadline_open_the_circuit():
+    """Test a hanging upstream trips the breaker even though every call ends in DeadlineExceeded."""
+    upstream = "test-hang"
+    breakers.pop(upstream, None)
+
+    async def hang():
+        await asyncio.sleep(10)
+
+    with patch("app.core.config.settings.circuit_failure_threshold", 2):
+        for _ in range(2):
+            with deadline(0.02):
+                with pytest.raises(DeadlineExceeded):
+                    await call_upstream(upstream, hang)
+        with pytest.raises(UpstreamUnavailable):
+            await call_upstream(upstream, hang)
+    assert breakers[upstream].state == "open"
+
+
+async def test_hedge_fires_after_observed_quantile_and_first_response_wins():
+    """Test a slow call is hedged once latency history exists, and the loser is cancelled."""
+    upstream = "test-hedge"
+    latencies.pop(upstream, None)
+    delays = iter([0.001] * 5 + [5.0, 0.001])
+    cancelled = 0
+
+    async def call():
+        nonlocal cancelled
+        delay = next(delays)
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            cancelled += 1
+            raise
+        return delay
+
+    with patch("app.core.config.settings.hedging_enabled", True), \
+         patch("app.core.config.settings.hedge_min_samples", 5):
+        for _ in range(5):
+            await call_upstream(upstream, call)
+        start = time.monotonic()
+        assert await call_upstream(upstream, call) == 0.001
+
+    assert time.monotonic() - start < 1
+    await asyncio.sleep(0)  # Let the losing attempt handle its cancellation
+    assert cancelled == 1
+    assert breakers[upstream].failures == 0  # A losing hedge is not a failure
@@ -1,6 +1,7 @@
 """Tests for user endpoints and authentication."""
 import pytest
 from unittest.mock import patch, MagicMock
+import time
 from datetime import datetime
 
 from app.db import models
@@ -23,7 +24,7 @@ def test_get_current_user_invalid_header_format(client):
     assert "Invalid Authorization header format" in response.json()["detail"]
 
 
-@patch("app.api.v1.routers.users.firebase_auth")
+@patch("app.core.auth.firebase_auth")
 def test_get_current_user_invalid_token(mock_firebase_auth, client):
     """Test /users/me with invalid Firebase token."""
     mock_firebase_auth.verify_id_token.side_effect = Exception("Invalid token")
@@ -36,7 +37,7 @@ def test_get_current_user_invalid_token(mock_firebase_auth, client):
     assert "Invalid token" in response.json()["detail"]
 
 
-@patch("app.api.v1.routers.users.firebase_auth")
+@patch("app.core.auth.firebase_auth")
 def test_get_current_user_creates_new_user(mock_firebase_auth, client, db):
     """Test /users/me creates a new user if not exists."""
     mock_firebase_auth.verify_id_token.return_value = {
@@ -57,7 +58,7 @@ def test_get_current_user_creates_new_user(mock_firebase_auth, client, db):
     assert data["name"] == "Test User"
 
 
-@patch("app.api.v1.routers.users.firebase_auth")
+@patch("app.core.auth.firebase_auth")
 def test_get_user_sessions_empty(mock_firebase_auth, client, db):
     """Test /users/me/sessions returns empty list for new user."""
     mock_firebase_auth.verify_id_token.return_value = {
@@ -75,7 +76,7 @@ def test_get_user_sessions_empty(mock_firebase_auth, client, db):
     assert response.json() == []
 
 
-@patch("app.api.v1.routers.users.firebase_auth")
+@patch("app.core.auth.firebase_auth")
 def test_get_user_sessions_with_data(mock_firebase_auth, client, db):
     """Test /users/me/sessions returns user's practice sessions."""
     # Create a user
@@ -122,7 +123,7 @@ def test_get_user_sessions_with_data(mock_firebase_auth, client, db):
     assert 90 in scores
 
 
-@patch("app.api.v1.routers.users.firebase_auth")
+@patch("app.core.auth.firebase_auth")
 def test_get_user_stats_empty(mock_firebase_auth, client, db):
     """Test /users/me/stats returns zeros for new user."""
     mock_firebase_auth.verify_id_token.return_value = {
@@ -143,7 +144,7 @@ def test_get_user_stats_empty(mock_firebase_auth, client, db):
     assert stats["best_score"] == 0
 
 
-@patch("app.api.v1.routers.users.firebase_auth")
+@patch("app.core.auth.firebase_auth")
 def test_get_user_stats_with_data(mock_firebase_auth, client, db):
     """Test /users/me/stats returns correct aggregated stats."""
     # Create a user
@@ -177,3 +178,216 @@ def test_get_user_stats_with_data(mock_firebase_auth, client, db):
     assert stats["total_sessions"] == 3
     assert stats["average_score"] == 90  # (80 + 90 + 100) / 3 = 90
     assert stats["best_score"] == 100
+
+
+@patch("app.core.auth.firebase_auth")
+def test_verified_token_is_cached_until_expiry(mock_firebase_auth, client, db):
+    """Test back-to-back requests with one token verify its signature only once."""
+    mock_firebase_auth.verify_id_token.return_value = {
+        "uid": "test-uid-cached",
+        "email": "cached@example.com",
+        "exp": time.time() + 3600,
+    }
+    headers = {"Authorization": "Bearer cached-token"}
+
+    for path in ("/api/v1/users/me", "/api/v1/users/me/stats", "/api/v1/users/me/sessions"):
+        assert client.get(path, headers=headers).status_code == 200
+
+    assert mock_firebase_auth.verify_id_token.call_count == 1
+
+
+@patch("app.core.auth.firebase_auth")
+def test_expired_or_revocation_checked_tokens_are_reverified(mock_firebase_auth, client, db):
+    """Test tokens past exp are not cached and 'always' policy skips the cache."""
+    mock_firebase_auth.verify_id_token.return_value = {
+        "uid": "test-uid-expired",
+        "exp": time.time() - 1,
+    }
+    headers = {"Authorization": "Bearer expired-token"}
+    client.get("/api/v1/users/me", headers=headers)
+    client.get("/api/v1/users/me", headers=headers)
+    assert mock_firebase_auth.verify_id_token.call_count == 2
+
+    mock_firebase_auth.verify_id_token.return_value["exp"] = time.time() + 3600
+    with patch("app.core.config.settings.auth_revocation_check", "always"):
+        client.get("/api/v1/users/me", headers=headers)
+        client.get("/api/v1/users/me", headers=headers)
+    assert mock_firebase_auth.verify_id_token.call_count == 4
+    mock_firebase_auth.verify_id_token.assert_called_with("expired-token", check_revoked=True)
+
+
+async def test_resolve_user_upserts_and_caches(async_db, db):
+    """Test user resolution creates once, then serves from the uid cache."""
+    from sqlalchemy import event
+    from app.db.users import resolve_user, user_cache
+
+    user_cache.clear()
+    statements = []
+    listener = lambda *args: statements.append(args[2])
+    sync_engine = async_db.get_bind()
+    event.listen(sync_engine, "before_cursor_execute", listener)
+    try:
+        first = await resolve_user(async_db, "uid-upsert", "upsert@example.com", "Upsert")
+        assert len(statements) == 1  # a single INSERT ... ON CONFLICT ... RETURNING
+        second = await resolve_user(async_db, "uid-upsert", "upsert@example.com", "Upsert")
+        assert len(statements) == 1  # cache hit, no query
+    finally:
+        event.remove(sync_engine, "before_cursor_execute", listener)
+
+    assert first.id == second.id
+    assert db.query(models.User).filter(models.User.uid == "uid-upsert").count() == 1
+
+    # Cold cache for an existing user still resolves to the same row
+    user_cache.clear()
+    assert (await resolve_user(async_db, "uid-upsert")).id == first.id
+
+
+async def test_resolve_user_refreshes_changed_profile(async_db, db):
+    """Test a changed name in the token claims updates the row and the cache."""
+    from app.db.users import resolve_user
+
+    user = await resolve_user(async_db, "uid-profile", "profile@example.com", "Old Name")
+    renamed = await resolve_user(async_db, "uid-profile", "profile@example.com", "New Name")
+
+    assert renamed.id == user.id
+    assert renamed.name == "New Name"
+    db.expire_all()
+    assert db.query(models.User).filter(models.User.uid == "uid-profile").one().name == "New Name"
+
+
+@patch("app.core.auth.firebase_auth")
+def test_get_user_sessions_cursor_pagination(mock_firebase_auth, client, db):
+    """Test keyset pagination walks the full history once, newest first."""
+    user = models.User(uid="test-uid-cursor", email="cursor@example.com", name="Cursor")
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+
+    # Several sessions share a timestamp so the id tiebreak is exercised
+    same_time = datetime(2026, 1, 1, 12, 0, 0)
+    db.add_all([
+        models.PracticeSession(user_id=user.id, transcription=f"Test {i}", score=i,
+                               created_at=same_time if i % 2 else datetime(2026, 1, 1, 12, 0, i))
+        for i in range(7)
+    ])
+    db.commit()
+
+    mock_firebase_auth.verify_id_token.return_value = {"uid": "test-uid-cursor"}
+    headers = {"Authorization": "Bearer valid-token"}
+
+    seen = []
+    cursor = ""
+    while cursor is not None:
+        response = client.get(
+            "/api/v1/users/me/sessions",
+            params={"limit": 3, "cursor": cursor},
+            headers=headers,
+        )
+        assert response.status_code == 200
+        page = response.json()
+        seen.extend(page["items"])
+        cursor = page["next_cursor"]
+
+    ids = [s["id"] for s in seen]
+    assert len(ids) == 7 and len(set(ids)) == 7
+    keys = [(s["created_at"], s["id"]) for s in seen]
+    assert keys == sorted(keys, reverse=True)
+
+    # Legacy offset mode still returns a plain list
+    legacy = client.get("/api/v1/users/me/sessions", params={"limit": 3}, headers=headers)
+    assert [s["id"] for s in legacy.json()] == ids[:3]
+
+
+@patch("app.core.auth.firebase_auth")
+def test_get_user_sessions_invalid_cursor(mock_firebase_auth, client, db):
+    """Test a malformed cursor is rejected with 400, and a non-positive limit with 422."""
+    mock_firebase_auth.verify_id_token.return_value = {"uid": "test-uid-bad-cursor"}
+    headers = {"Authorization": "Bearer valid-token"}
+    response = client.get("/api/v1/users/me/sessions", params={"cursor": "not-a-cursor"}, headers=headers)
+    assert response.status_code == 400
+
+    # LIMIT -1 is unlimited on SQLite: it would scan the whole history
+    for limit in (0, -1):
+        response = client.get("/api/v1/users/me/sessions", params={"limit": limit}, headers=headers)
+        assert response.status_code == 422
+
+
+@patch("app.core.auth.firebase_auth")
+def test_user_stats_rollup_is_maintained_by_practice(mock_firebase_auth, mock_openai, client, db):
+    """Test /practice updates the rollup row that /me/stats reads."""
+    from io import BytesIO
+
+    mock_firebase_auth.verify_id_token.return_value = {"uid": "test-uid-rollup"}
+    headers = {"Authorization": "Bearer valid-token"}
+    # Creates the user and an empty rollup row
+    assert client.get("/api/v1/users/me/stats", headers=headers).json()["total_sessions"] == 0
+
+    for i, score in enumerate([70, 95, 80]):
+        transcription = MagicMock(text=f"Attempt {i}", language="english", duration=1.0)
+        mock_openai.audio.transcriptions.create.return_value = transcription
+        mock_response = MagicMock()
+        mock_response.choices = [MagicMock()]
+        mock_response.choices[0].message.content = f'{{"corrected_text": "Attempt {i}", "score": {score}}}'
+        mock_openai.chat.completions.create.return_value = mock_response
+        files = {"file": ("test.mp3", BytesIO(f"audio {i}".encode()), "audio/mpeg")}
+        assert client.post("/api/v1/speech/practice", files=files, headers=headers).status_code == 200
+
+    stats = client.get("/api/v1/users/me/stats", headers=headers).json()
+    assert stats["total_sessions"] == 3
+    assert stats["average_score"] == 82  # round(245 / 3)
+    assert stats["best_score"] == 95
+    assert stats["first_session"] is not None
+    assert stats["last_session"] is not None
+
+
+@patch("app.core.auth.firebase_auth")
+def test_user_stats_rollup_includes_history_before_the_rollup(mock_firebase_auth, mock_openai, client, db):
+    """Test a user's first rollup write counts sessions saved before user_stats existed."""
+    from io import BytesIO
+
+    user = models.User(uid="test-uid-legacy", email="legacy@example.com")
+    db.add(user)
+    db.commit()
+    db.add_all([
+        models.PracticeSession(user_id=user.id, transcription=f"Old {i}", score=60)
+        for i in range(5)
+    ])
+    db.commit()
+
+    mock_firebase_auth.verify_id_token.return_value = {"uid": "test-uid-legacy"}
+    headers = {"Authorization": "Bearer valid-token"}
+    mock_openai.audio.transcriptions.create.return_value = MagicMock(
+        text="New attempt", language="english", duration=1.0
+    )
+    mock_response = MagicMock()
+    mock_response.choices = [MagicMock()]
+    mock_response.choices[0].message.content = '{"corrected_text": "New attempt", "score": 90}'
+    mock_openai.chat.completions.create.return_value = mock_response
+    files = {"file": ("test.mp3", BytesIO(b"new audio"), "audio/mpeg")}
+    assert client.post("/api/v1/speech/practice", files=files, headers=headers).status_code == 200
+
+    stats = client.get("/api/v1/users/me/stats", headers=headers).json()
+    assert stats["total_sessions"] == 6
+    assert stats["average_score"] == 65  # (5 * 60 + 90) / 6
+    assert stats["best_score"] == 90
+
+
+async def test_rebuild_user_stats(async_db, db):
+    """Test the backfill recomputes rollups from practice_sessions."""
+    from app.db.stats import rebuild_user_stats
+
+    user = models.User(uid="test-uid-rebuild")
+    db.add(user)
+    db.commit()
+    db.add_all([
+        models.PracticeSession(user_id=user.id, transcription="a", score=60),
+        models.PracticeSession(user_id=user.id, transcription="b", score=None),
+        models.PracticeSession(user_id=user.id, transcription="c", score=90),
+    ])
+    db.commit()
+
+    await rebuild_user_stats(async_db)
+    await async_db.commit()
+
+    stats = await async_db.get(models.UserStats, user.id)
+    assert (stats.total_sessions, stats.scored_sessions, stats.score_sum, stats.best_score) == (3, 2, 150, 90)
@@ -0,0 +1,90 @@
+"""Tests for write-behind batching of practice sessions."""
+import asyncio
+from io import BytesIO
+from unittest.mock import MagicMock, patch
+
+from sqlalchemy import event
+
+from app.db import models
+from app.db.writer import SessionWriter, session_writer
+from tests.conftest import TestingAsyncSessionLocal, engine
+
+
+def session_values(user_id, score):
+    return {
+        "user_id": user_id,
+        "transcription": f"Sentence scored {score}",
+        "corrected_text": None,
+        "feedback": "Nice",
+        "score": score,
+    }
+
+
+async def test_concurrent_sessions_share_one_commit(db):
+    """Test queued rows are written in one transaction and each gets its own id back."""
+    user = models.User(uid="writer-uid", email="writer@example.com")
+    db.add(user)
+    db.commit()
+
+    writer = SessionWriter(batch_size=10, flush_interval=0.05, max_pending=100)
+    writer.session_factory = TestingAsyncSessionLocal
+    commits = []
+    listener = lambda conn: commits.append(conn)
+    sync_engine = TestingAsyncSessionLocal.kw["bind"].sync_engine
+    event.listen(sync_engine, "commit", listener)
+    await writer.start()
+    try:
+        ids = await asyncio.gather(*(
+            writer.insert(session_values(user.id if score % 2 else None, score)) for score in range(1, 6)
+        ))
+    finally:
+        await writer.stop()
+        event.remove(sync_engine, "commit", listener)
+
+    assert len(set(ids)) == 5
+    assert len(commits) == 1
+    scores = dict(db.query(models.PracticeSession.id, models.PracticeSession.score).all())
+    assert [scores[session_id] for session_id in ids] == [1, 2, 3, 4, 5]
+
+    stats = db.get(models.UserStats, user.id)
+    assert (stats.total_sessions, stats.score_sum, stats.best_score) == (3, 9, 5)
+
+
+async def test_stop_flushes_queued_rows(db):
+    writer = SessionWriter(batch_size=100, flush_interval=60, max_pending=100)
+    writer.session_factory = TestingAsyncSessionLocal
+    await writer.start()
+    pending = asyncio.create_task(writer.insert(session_values(None, 70)))
+    await asyncio.sleep(0.01)
+    assert not pending.done()  # Waiting for the batch to fill
+
+    await writer.stop()
+    assert db.get(models.PracticeSession, await pending).score == 70
+
+
+def test_practice_with_write_behind(mock_openai, client):
+    """Test /practice returns the id assigned by the batched insert."""
+    mock_openai.audio.transcriptions.create.return_value = MagicMock(
+        text="Write behind", language="english", duration=1.0
+    )
+    response = MagicMock()
+    response.choices = [MagicMock()]
+    response.choices[0].message.content = '{"corrected_text": "Write behind", "score": 90}'
+    mock_openai.chat.completions.create.return_value = response
+
+    with patch("app.core.config.settings.session_write_behind_enabled", True):
+        client.portal.call(session_writer.start)
+        try:
+            files = {"file": ("test.mp3", BytesIO(b"write behind audio"), "audio/mpeg")}
+            result = client.post("/api/v1/speech/practice", files=files)
+        finally:
+            client.portal.call(session_writer.stop)
+
+    assert result.status_code == 200
+    with engine.connect() as conn:
+        session = conn.execute(
+            models.PracticeSession.__table__.select().where(
+                models.PracticeSession.id == result.json()["session_id"]
+            )
+        ).one()
+    assert session.score == 90